@@ -57,7 +57,7 @@ if [[ "${HAS_RESTART}" == true ]]; then
   echo "$(date -u +"%Y-%m-%d %H:%M:%SZ") - [setup][services] Done."
 else
   echo "$(date -u +"%Y-%m-%d %H:%M:%SZ") - [setup] Restarting backend"
-  sudo systemctl restart backend huey
+  sudo systemctl restart backend huey huey-critical huey-batch
 fi
 
 echo "$(date -u +"%Y-%m-%d %H:%M:%SZ") - [setup] done."
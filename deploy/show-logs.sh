@@ -2,6 +2,8 @@ journalctl --follow -o cat  -u backend.service \
                             -u bot.service \
                             -u quiz.service \
                             -u huey.service \
+                            -u huey-critical.service \
+                            -u huey-batch.service \
                             -u nginx \
                             -u ngrok.service \
                             -u redis.service \
@@ -346,31 +346,59 @@ describe('DeleteApi, ListApi and UpdateApi', () => {
     expect(errors.handleErrors).toHaveBeenCalled();
   });
 
-  test('UploadApi.upload dispatches and shows toast', async () => {
+  test('UploadApi.upload waits for the job, then refetches the list', async () => {
     const axios = require('../index').default;
-    axios.post.mockResolvedValueOnce({ data: { id: 11 } });
-    const { UploadApi } = require('../shared');
+    axios.post.mockResolvedValueOnce({ data: { job_id: 'abc' } });
+    axios.get
+      .mockResolvedValueOnce({ data: { history: [{ status: 'complete' }] } })
+      .mockResolvedValueOnce({ data: { results: [{ id: 11 }] } });
+    const { ListApi, UploadApi } = require('../shared');
     const methods = {
       set: (p) => ({ type: 'set', payload: p }),
       setLoading: () => ({ type: 'ld' }),
       setErrors: () => ({ type: 'err' }),
     };
-    class Api extends mix(UploadApi, TokenMixin) {}
+    class Api extends mix(ListApi, UploadApi, TokenMixin) {}
     Api.baseUrl = 'files/uploads';
     Api.methods = methods;
 
     const instance = new Api('t');
-    const dispatch = jest.fn();
+    const dispatch = jest.fn((action) =>
+      typeof action === 'function' ? action(dispatch) : action
+    );
 
     instance.upload(new FormData())(dispatch);
-    await Promise.resolve();
-    await Promise.resolve();
+    await new Promise((resolve) => setTimeout(resolve, 0));
 
     const { toast } = require('react-toastify');
-    expect(dispatch).toHaveBeenCalledWith(methods.set({ id: 11 }));
+    expect(axios.get.mock.calls[0][0]).toBe('finance/uploads/abc/');
+    expect(dispatch).toHaveBeenCalledWith(methods.set({ results: [{ id: 11 }] }));
     expect(toast.success).toHaveBeenCalled();
   });
 
+  test('UploadApi.upload sets the errors of failed jobs', async () => {
+    const axios = require('../index').default;
+    axios.post.mockResolvedValueOnce({ data: { job_id: 'abc' } });
+    axios.get.mockResolvedValueOnce({
+      data: { errors: [{ msg: 'Invalid file' }], history: [{ status: 'error' }] },
+    });
+    const { ListApi, UploadApi } = require('../shared');
+    const methods = {
+      set: (p) => ({ type: 'set', payload: p }),
+      setLoading: () => ({ type: 'ld' }),
+      setErrors: (p) => ({ type: 'err', payload: p }),
+    };
+    class Api extends mix(ListApi, UploadApi, TokenMixin) {}
+    Api.baseUrl = 'files/uploads';
+    Api.methods = methods;
+
+    const dispatch = jest.fn();
+    new Api('t').upload(new FormData())(dispatch);
+    await new Promise((resolve) => setTimeout(resolve, 0));
+
+    expect(dispatch).toHaveBeenCalledWith(methods.setErrors(['Invalid file']));
+  });
+
   test('RunApi.run uses ngrokAxios and shows toast on success', async () => {
     const pkg = require('../index');
     pkg.ngrokAxios.put = jest.fn().mockResolvedValueOnce({});
@@ -252,10 +252,11 @@ export class PredictionApi {
       .then(response => dispatch(setTask({type: "predict", data: response.data})))
       .catch(err => handleErrors(err, dispatch, setPredictionErrors, setLoadingTask))
   }
-  static train = token => dispatch => {
+  // incremental by default, {mode: "full"} retrains on every confirmed transaction
+  static train = (token, data = {}) => dispatch => {
     dispatch(setLoadingTask({type: "train", loading: true}))
     axios
-      .put(`${base}/prediction/start-training/`, {}, {headers: {Authorization: token}})
+      .put(`${base}/prediction/start-training/`, data, {headers: {Authorization: token}})
       .then(response => dispatch(setTask({type: "train", data: response.data})))
       .catch(err => handleErrors(err, dispatch, setPredictionErrors, setLoadingTask))
   }
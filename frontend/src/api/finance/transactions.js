@@ -2,7 +2,7 @@ import axios from '../index';
 import { handleErrors } from '../errors';
 import { toast } from 'react-toastify';
 import { toastParams } from '../auth';
-import { createSearchParams, DeleteApi, DetailApi, ListApi, mix, TokenMixin } from '../shared';
+import { createSearchParams, DeleteApi, DetailApi, ListApi, mix, TokenMixin, waitForUpload } from '../shared';
 
 import {
   deleteItem,
@@ -29,7 +29,7 @@ export class TransactionsApi extends mix(DeleteApi, DetailApi, ListApi, TokenMix
   static bulkUpdateTransactions = (token, data, kwargs) => dispatch => {
     dispatch(setLoading(true))
     axios
-      .put(`${base}/bulk-update/?${createSearchParams(kwargs)}`,
+      .put(`${base}/bulk-update/?${createSearchParams({ ...kwargs, list: true })}`,
         data,
         { headers: { Authorization: token } })
       .then((response) => dispatch(set(response.data)))
@@ -79,12 +79,16 @@ export class TransactionsApi extends mix(DeleteApi, DetailApi, ListApi, TokenMix
       data,
       {headers: {Authorization: token, 'Content-Type': 'multipart/form-data'}}
     )
-    .then((response) => {
-      dispatch(set(response.data));
-      toast.success("Payments uploaded successfully!", toastParams)
-
+    .then((response) => waitForUpload(token, response.data.job_id))
+    .then((job) => {
+      dispatch(new TransactionsApi(token).getList(kwargs));
+      if (job.level === "warning") toast.warning(job.message, toastParams)
+      else toast.success(job.message, toastParams)
     })
-    .catch((err) => handleErrors(err, dispatch, setErrors, setLoading));
+    .catch((err) => {
+      if (err.response) return handleErrors(err, dispatch, setErrors, setLoading)
+      dispatch(setErrors([err.message]))
+    });
   }
 }
 let base = "finance/transactions";
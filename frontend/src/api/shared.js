@@ -276,6 +276,27 @@ export const UpdateApi = (Base) =>
     };
   };
 
+const UPLOAD_POLL_INTERVAL = 2000;
+
+// Uploads are imported in the background, poll the job until it's done
+export const waitForUpload = (token, jobId) =>
+  new Promise((resolve, reject) => {
+    const poll = () =>
+      axios
+        .get(`finance/uploads/${jobId}/`, {
+          headers: { Authorization: token },
+        })
+        .then((response) => {
+          const latest = response.data.history[0];
+          if (latest?.status === 'complete') resolve(latest);
+          else if (latest?.status === 'error')
+            reject(new Error(response.data.errors[0]?.msg || 'Upload failed'));
+          else setTimeout(poll, UPLOAD_POLL_INTERVAL);
+        })
+        .catch(reject);
+    poll();
+  });
+
 export const UploadApi = (Base) =>
   class extends Base {
     upload = (data) => (dispatch) => {
@@ -287,20 +308,23 @@ export const UploadApi = (Base) =>
             'Content-Type': 'multipart/form-data',
           },
         })
-        .then((response) => {
-          dispatch(this.constructor.methods.set(response.data));
+        .then((response) => waitForUpload(this.token, response.data.job_id))
+        .then(() => {
+          dispatch(this.getList());
           toast.success(
             `${getResource(this.constructor.baseUrl)} uploaded successfully!`,
             toastParams
           );
         })
-        .catch((err) =>
-          handleErrors(
-            err,
-            dispatch,
-            this.constructor.methods.setErrors,
-            this.constructor.methods.setLoading
-          )
-        );
+        .catch((err) => {
+          if (err.response)
+            return handleErrors(
+              err,
+              dispatch,
+              this.constructor.methods.setErrors,
+              this.constructor.methods.setLoading
+            );
+          dispatch(this.constructor.methods.setErrors([err.message]));
+        });
     };
   };
@@ -90,8 +90,8 @@ const Tasks = () =>  {
                                     {task.history[0].status ? capitalize(task.history[0].status) : "-"}
                                   </td>
                                   <td>{new Date(task.history?.[0]?.timestamp).toLocaleString()}</td>
-                                  <td>{task.history.length}</td>
-                                  <td>{task.errors?.length}</td>
+                                  <td>{task.count}</td>
+                                  <td>{task.errors_count}</td>
                                 </>
                                 : <td colSpan={4} className="text-center">Didn&apos;t run</td>
                             }
@@ -928,7 +928,10 @@ const Categorize = () => {
         </Modal.Header>
         <Modal.Body>
           <p className='mb-0'>This will train the machine learning model on</p>
-          <p className='text-danger'>all the ML confirmed categories</p>
+          <p className='text-danger'>
+            the ML confirmed categories since the last training
+          </p>
+          <p>or all of them, with a full retrain</p>
           <p className='mb-0'>Make sure you don't have any dirty data</p>
           <p>
             e.g. descriptions that might not always belong to the same category
@@ -939,6 +942,15 @@ const Categorize = () => {
           <Button variant='success' onClick={() => setTrainingModalOpen(false)}>
             No, go back
           </Button>
+          <Button
+            variant='warning'
+            onClick={() => {
+              dispatch(PredictionApi.train(token, { mode: 'full' }));
+              setTrainingModalOpen(false);
+            }}
+          >
+            Full retrain
+          </Button>
           <Button
             variant='danger'
             onClick={() => {
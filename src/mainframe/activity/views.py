@@ -3,9 +3,11 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from mainframe.activity.serializers import ActionSerializer
+from mainframe.core.pagination import KeysetPagination
 
 
 class ActionViewSet(ReadOnlyModelViewSet):
+    pagination_class = KeysetPagination
     queryset = Action.objects.all().order_by("-timestamp").prefetch_related("actor")
     permission_classes = (IsAdminUser,)
     serializer_class = ActionSerializer
@@ -1,4 +1,4 @@
-import json
+import functools
 from importlib import import_module
 from typing import Literal
 
@@ -10,7 +10,18 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAdminUser
 
-from mainframe.core.tasks import get_redis_client
+from mainframe.core.metrics import WINDOW_HOURS, get_metrics
+from mainframe.core.pagination import get_page_params
+from mainframe.core.tasks import (
+    HISTORY_SIZE,
+    clear_status,
+    get_redis_client,
+    get_status,
+    parse_summary,
+    queue_summary,
+)
+
+SUMMARY_COMMANDS = 3  # the number of commands queue_summary adds to a pipeline
 
 
 def is_revoked(task):
@@ -22,6 +33,42 @@ def is_revoked(task):
         return str(e)
 
 
+def is_revoked_value(value) -> bool:
+    """Same as huey's revoked check (peeking), on the raw stored value"""
+    if value is None:
+        return False
+    revoke_until, revoke_once = HUEY.serializer.deserialize(value)
+    return bool(
+        revoke_once or revoke_until is None or revoke_until > HUEY._get_timestamp()
+    )
+
+
+@functools.cache
+def get_registered_tasks() -> tuple[dict, ...]:
+    """The registered tasks, introspected once per process"""
+    autodiscover_modules("tasks")
+    periodic_tasks = {str(t).split()[0][:-1] for t in HUEY._registry.periodic_tasks}
+    return tuple(
+        {
+            "app": t.split(".")[1],
+            "name": t.split(".")[-1],
+            "path": t,
+            "is_periodic": t in periodic_tasks,
+            "revoke_key": f"rt:{t}",
+        }
+        for t in HUEY._registry._registry
+    )
+
+
+def task_details(task) -> dict:
+    return {
+        "app": task["app"],
+        "name": task["name"],
+        "id": f"{task['app']}.{task['name']}",
+        "is_periodic": task["is_periodic"],
+    }
+
+
 def task_sorter(item):
     return (
         -bool(item.get("history", [])),
@@ -35,7 +82,7 @@ class TasksViewSet(viewsets.ViewSet):
 
     @action(methods=["delete"], detail=True, url_path="delete-history")
     def delete_history(self, request, *args, **kwargs):
-        results = get_redis_client().delete(f"tasks.{kwargs['pk']}")
+        results = clear_status(kwargs["pk"])
         if results:
             return self.list(request)
         return JsonResponse(
@@ -44,52 +91,67 @@ class TasksViewSet(viewsets.ViewSet):
 
     @staticmethod
     def list(request):
-        client = get_redis_client()
-        autodiscover_modules("tasks")
-        periodic_tasks = [str(t).split()[0][:-1] for t in HUEY._registry.periodic_tasks]
-        return JsonResponse(
-            data={
-                "results": sorted(
-                    [
-                        {
-                            "app": t.split(".")[1],
-                            "name": t.split(".")[-1],
-                            "id": f"{t.split('.')[1]}.{t.split('.')[-1]}",
-                            "is_periodic": t in periodic_tasks,
-                            "is_revoked": is_revoked(t),
-                            **json.loads(
-                                client.get(f"tasks.{t.split('.')[-1]}") or "{}"
-                            ),
-                        }
-                        for t in HUEY._registry._registry
-                    ],
-                    key=task_sorter,
-                ),
-            }
-        )
+        """Summary of all the tasks, read in a single round trip
+
+        The full history of a task is paginated by the detail endpoint.
+        """
+        if not (tasks := get_registered_tasks()):
+            return JsonResponse(data={"results": []})
+
+        with get_redis_client().pipeline(transaction=False) as pipe:
+            for task in tasks:
+                queue_summary(pipe, task["name"])
+            pipe.hmget(HUEY.storage.result_key, [task["revoke_key"] for task in tasks])
+            *summaries, revoked = pipe.execute()
+
+        results = []
+        for i, task in enumerate(tasks):
+            summary = summaries[i * SUMMARY_COMMANDS : (i + 1) * SUMMARY_COMMANDS]
+            results.append(
+                {
+                    **task_details(task),
+                    "is_revoked": is_revoked_value(revoked[i]),
+                    **parse_summary(*summary),
+                }
+            )
+        return JsonResponse(data={"results": sorted(results, key=task_sorter)})
 
     @staticmethod
-    def retrieve(*args, **kwargs):
+    def retrieve(request, *args, **kwargs):
         name = kwargs["pk"]
-        client = get_redis_client()
-        autodiscover_modules("tasks")
-        periodic_tasks = [str(t).split()[0][:-1] for t in HUEY._registry.periodic_tasks]
-        for t in HUEY._registry._registry:
-            app, task_name = t.split(".")[1], t.split(".")[-1]
-            if task_name == name:
+        page, page_size = get_page_params(request, HISTORY_SIZE, HISTORY_SIZE)
+        for task in get_registered_tasks():
+            if task["name"] == name:
                 return JsonResponse(
                     data={
-                        "app": app,
-                        "name": name,
-                        "id": f"{app}.{name}",
-                        "is_periodic": t in periodic_tasks,
-                        "is_revoked": is_revoked(t),
-                        **json.loads(client.get(f"tasks.{name}") or "{}"),
+                        **task_details(task),
+                        "is_revoked": is_revoked(task["path"]),
+                        **get_status(name, page, page_size),
                     },
                     safe=True,
                 )
         raise NotFound()
 
+    @action(methods=["get"], detail=False)
+    def metrics(self, request, *args, **kwargs):
+        """Counters and duration / queue wait percentiles per task
+
+        ?hours=N (at most WINDOW_HOURS) for the time window, ?name=... to filter
+        """
+        try:
+            hours = int(request.query_params.get("hours", WINDOW_HOURS))
+        except ValueError:
+            hours = 0
+        if not 1 <= hours <= WINDOW_HOURS:
+            return JsonResponse(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={"detail": f"hours must be between 1 and {WINDOW_HOURS}"},
+            )
+        names = request.query_params.getlist("name")
+        return JsonResponse(
+            data={"results": get_metrics(get_redis_client(), hours, names)}
+        )
+
     @action(methods=["put"], detail=True)
     def revoke(self, request, *args, **kwargs):
         task = kwargs["pk"]
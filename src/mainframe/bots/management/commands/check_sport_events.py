@@ -5,14 +5,13 @@ from datetime import datetime
 from unicodedata import normalize
 from zoneinfo import ZoneInfo
 
-import aiohttp
 import environ
 import structlog
 from bs4 import BeautifulSoup
 from django.conf import settings
-from django.core.management import BaseCommand, CommandError
-from rest_framework import status
+from django.core.management import BaseCommand
 
+from mainframe.clients import scraper
 from mainframe.clients.chat import send_telegram_message
 
 logger = structlog.get_logger(__name__)
@@ -71,19 +70,6 @@ def callback(args):
         return parse_flash_score(response, categories)
 
 
-async def fetch(session, sem, url, categories):
-    async with sem:
-        try:
-            async with session.get(url) as response:
-                if response.status != status.HTTP_200_OK:
-                    err = f"Unexpected status for {url} ({response.status})"
-                    raise CommandError(err)
-                return await response.text(), url, categories
-        except aiohttp.client_exceptions.ClientConnectorError:
-            logger.exception("Error fetching URL", url=url)
-            return "", url, []
-
-
 def fetch_all(categories):
     events = "".join(
         asyncio.run(
@@ -106,14 +92,13 @@ def fetch_all(categories):
 
 
 async def fetch_many(urls, categories):
-    sem = asyncio.Semaphore(1000)
-    async with aiohttp.ClientSession() as session:
-        return map(
-            callback,
-            await asyncio.gather(
-                *[fetch(session, sem, url, categories) for url in urls]
-            ),
-        )
+    responses = await scraper.fetch_many(urls, soup=False)
+    results = []
+    for url, (response, error) in zip(urls, responses, strict=True):
+        if error:
+            logger.error("Error fetching URL", error=str(error), url=url)
+        results.append(callback((response.text if response else "", url, categories)))
+    return results
 
 
 def get_match(contents):
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bots", "0007_remove_bot_is_active_remove_bot_webhook_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["-date", "-id"], name="message_date_id_idx"),
+        ),
+    ]
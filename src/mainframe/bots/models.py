@@ -62,6 +62,7 @@ class Message(TimeStampedModel):
     text = models.CharField(blank=True, max_length=255)
 
     class Meta:
+        indexes = (models.Index(fields=["-date", "-id"], name="message_date_id_idx"),)
         ordering = ["-date"]
 
     def __str__(self):
@@ -3,9 +3,10 @@ from huey import crontab
 from huey.contrib.djhuey import HUEY, periodic_task
 
 from mainframe.clients import healthchecks
+from mainframe.core.queues import QUEUE_CRITICAL
 
 
-@periodic_task(crontab(minute="*/5"))
+@periodic_task(crontab(minute="*/5"), queue=QUEUE_CRITICAL)
 @HUEY.lock_task("healthcheck-lock")
 def healthcheck():
     if settings.ENV != "rpi":
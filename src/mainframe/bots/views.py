@@ -3,6 +3,7 @@ from rest_framework.permissions import AllowAny, IsAdminUser
 
 from mainframe.bots.models import Bot, Message
 from mainframe.bots.serializers import BotSerializer, MessageSerializer
+from mainframe.core.pagination import KeysetPagination
 
 
 class BotViewSet(viewsets.ModelViewSet):
@@ -17,6 +18,7 @@ class BotViewSet(viewsets.ModelViewSet):
 
 
 class MessageViewSet(viewsets.ModelViewSet):
+    pagination_class = KeysetPagination
     queryset = Message.objects.order_by("-date")
     serializer_class = MessageSerializer
     permission_classes = (IsAdminUser,)
@@ -1,10 +1,8 @@
-import asyncio
 import csv
 import re
 from datetime import datetime
 from typing import List, Optional
 
-import aiohttp
 from asgiref.sync import sync_to_async
 from rest_framework import status
 
@@ -141,37 +139,28 @@ class CTPClient:
             self.logger.info("Schedules created!", count=len(schedules))
         return schedules
 
-    async def request(self, session, sem, schedule):
-        line, occ, url = schedule
-        async with sem:
-            headers = {"Referer": "https://ctpcj.ro/"}
-            try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status not in [
-                        status.HTTP_200_OK,
-                        status.HTTP_404_NOT_FOUND,
-                    ]:
-                        msg = f"Unexpected status for {url}. Status: {response.status}"
-                        raise ValueError(msg)
-                    return await response.text(), line, occ, url
-            except aiohttp.client_exceptions.ClientConnectorError:
-                self.logger.exception(
+    async def request_many(self, schedules):
+        responses = await scraper.fetch_many(
+            [url for *_, url in schedules],
+            soup=False,
+            headers={"Referer": "https://ctpcj.ro/"},
+            retries=1,
+        )
+        results = []
+        for (line, occ, url), (response, error) in zip(
+            schedules, responses, strict=True
+        ):
+            if error and getattr(error, "status", None) != status.HTTP_404_NOT_FOUND:
+                self.logger.error(
                     "Failed to fetch transit line schedule",
+                    error=str(error),
                     line=line,
                     occurrence=occ,
                     url=url,
                 )
-                return "", url
-
-    async def request_many(self, schedules):
-        sem = asyncio.Semaphore(1000)
-        async with aiohttp.ClientSession() as session:
-            return map(
-                self.parse_schedule,
-                await asyncio.gather(
-                    *[self.request(session, sem, schedule) for schedule in schedules]
-                ),
-            )
+            text = response.text if response else ""
+            results.append(self.parse_schedule((text, line, occ, url)))
+        return results
 
     def parse_schedule(self, args) -> Optional[Schedule]:  # noqa: C901
         response, line, occ, url = args
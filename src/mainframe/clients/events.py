@@ -3,10 +3,10 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import structlog
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from django.conf import settings
 
-from mainframe.clients.scraper import fetch
+from mainframe.clients.scraper import fetch, make_soup
 from mainframe.events.constants import (
     CATEGORY_NAME_BY_ID,
     get_category,
@@ -32,6 +32,8 @@ def parse_datetime(date_str):
 
 
 class EventsClient:
+    parse_only: SoupStrainer | None = None
+
     def __init__(self, source: Source):
         self.source = source
 
@@ -58,6 +60,7 @@ class EventsClient:
             headers=headers,
             params=params,
             soup=soup,
+            parse_only=self.parse_only,
             **request_kwargs,
         )
         if error:
@@ -154,12 +157,10 @@ class IBClient(EventsClient):
             logger.error("Error in IB response", error=data["error"])
             return []
 
-        soup = BeautifulSoup(data["html"], features="html.parser")
-        event_tags = [
-            t
-            for t in soup.select("script")
-            if t.attrs.get("type") == "application/ld+json"
-        ]
+        soup = make_soup(
+            data["html"], SoupStrainer("script", type="application/ld+json")
+        )
+        event_tags = soup.find_all("script")
         return [self.parse_event(tag) for tag in event_tags if tag.text.strip()]
 
     def parse_event(self, tag):
@@ -193,6 +194,8 @@ class IBClient(EventsClient):
 
 
 class ZnClient(EventsClient):
+    parse_only = SoupStrainer("section")
+
     def parse_data(self, soup) -> list[Event]:
         events = []
         marker = soup.find(string=self.source.config["soup"]["string"])
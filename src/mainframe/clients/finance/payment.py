@@ -1,11 +1,13 @@
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from decimal import Decimal
 from functools import cached_property
+from itertools import accumulate
 
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from pypdf import PdfReader
 
+from mainframe.clients.finance.pdf import extract_pages_text, read_content
 from mainframe.finance.models import Payment, Timetable
 from mainframe.finance.tasks import backup_finance_model
 
@@ -75,20 +77,41 @@ def parse_interest(rows):
     )
 
 
+def get_cumulative_sums(amortization_table) -> tuple[list, list]:
+    """The principal and interest + insurance paid after each row, from 0"""
+    principal = accumulate(
+        (Decimal(row["principal"]) for row in amortization_table), initial=Decimal(0)
+    )
+    saved = accumulate(
+        (
+            Decimal(row["interest"]) + Decimal(row["insurance"])
+            for row in amortization_table
+        ),
+        initial=Decimal(0),
+    )
+    return list(principal), list(saved)
+
+
 class PaymentsImporter:
     def __init__(self, file, logger):
         self.file = file
         self.logger = logger
+        self.cumulative_sums = {}  # by timetable id, computed on first use
 
     @cached_property
     def timetables(self):
-        return Timetable.objects.all()
+        # oldest first, the latest created last among those on the same date
+        return list(Timetable.objects.order_by("date", "created_at"))
+
+    @cached_property
+    def timetable_dates(self):
+        return [timetable.date for timetable in self.timetables]
 
     def extract_payments(self, pages):
         payments = []
-        for page in pages:
+        for text in pages:
             header = "BalantaDebit CreditDetalii tranzactieData"
-            contents = page.extract_text().split(header)[1].strip().split("\n \n")[0]
+            contents = text.split(header)[1].strip().split("\n \n")[0]
             rows = [
                 r for r in contents.split("\n")[:-1] if "Alocare fonduri" not in r and r
             ]
@@ -96,9 +119,9 @@ class PaymentsImporter:
         return payments
 
     def run(self):
-        reader = PdfReader(self.file)
+        pages = extract_pages_text(read_content(self.file))
         try:
-            payments = self.extract_payments(reader.pages)
+            payments = self.extract_payments(pages)
         except (IndexError, ValueError) as e:
             raise PaymentImportError("Could not extract payments") from e
         try:
@@ -146,23 +169,20 @@ class PaymentsImporter:
         return payments
 
     def parse_saved(self, date, principal):
-        timetable = None
-        for t in self.timetables:  # timetables ordered by date descending
-            if t.date < date:  # first timetable before this payment
-                timetable = t
-                break
-        if not timetable:
-            return 0
+        """The interest and insurance of the rows the prepayment fully covers
 
-        amount, saved = Decimal(0), Decimal(0)
-        for _, payment in enumerate(timetable.amortization_table):
-            payment_principal = Decimal(payment["principal"])
-            if amount + payment_principal > principal:
-                break
-            amount += payment_principal
-            saved += Decimal(payment["interest"]) + Decimal(payment["insurance"])
-
-        return saved
+        Looked up in the latest timetable before the payment, the rows being
+        covered while their cumulative principal doesn't exceed the prepayment.
+        """
+        if not (index := bisect_left(self.timetable_dates, date)):
+            return 0
+        timetable = self.timetables[index - 1]
+        if timetable.id not in self.cumulative_sums:
+            self.cumulative_sums[timetable.id] = get_cumulative_sums(
+                timetable.amortization_table
+            )
+        principals, saved = self.cumulative_sums[timetable.id]
+        return saved[bisect_right(principals, principal) - 1]
 
 
 def validate_starts_with(row, payment_type, expected_field, line_no):
@@ -0,0 +1,51 @@
+import io
+import os
+from itertools import chain, repeat
+from math import ceil
+from pathlib import Path
+
+from pypdf import PdfReader
+
+from mainframe.core.pools import pool_map
+
+# No django imports in here: extract_text runs in spawned worker processes
+
+PDF_POOL = "pdf"
+PDF_WORKERS = 2
+PARALLEL_MIN_PAGES = 8  # below this, spawning the workers costs more than it saves
+
+
+def read_content(file) -> bytes:
+    """The bytes of a PDF path or (uploaded) file, to be sent to the workers"""
+    if isinstance(file, str):
+        return Path(file).read_bytes()
+    return file.read()
+
+
+def extract_text(content: bytes, start, stop) -> list[str]:
+    """The text of the pages in [start, stop), each worker parsing its own copy"""
+    reader = PdfReader(io.BytesIO(content))
+    return [page.extract_text() for page in reader.pages[start:stop]]
+
+
+def extract_pages_text(content: bytes, max_workers=PDF_WORKERS) -> list[str]:
+    """The text of every page, in order, extracted in chunks over a process pool
+
+    pypdf's text extraction is CPU bound, so each worker gets one contiguous
+    range of pages. Short documents, or a single CPU, stay in this process.
+    """
+    count = len(PdfReader(io.BytesIO(content)).pages)
+    max_workers = min(max_workers, os.cpu_count() or 1)
+    if count < PARALLEL_MIN_PAGES or max_workers <= 1:
+        max_workers = 0
+    size = ceil(count / (max_workers or 1)) or 1
+    starts = range(0, count, size)
+    chunks = pool_map(
+        PDF_POOL,
+        extract_text,
+        repeat(content),
+        starts,
+        [start + size for start in starts],
+        max_workers=max_workers,
+    )
+    return list(chain.from_iterable(chunks))
@@ -1,17 +1,56 @@
 import csv
+import hashlib
 import io
+import re
+from collections import Counter
 from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import islice
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.files import File
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.db import IntegrityError
+from django.db.transaction import atomic
+from openpyxl import load_workbook
 
 from mainframe.bots.management.commands.inlines.shared import chunks
-from mainframe.finance.models import Account, Transaction
+from mainframe.finance.models import (
+    Account,
+    StatementImport,
+    Transaction,
+    deferred_rollups,
+)
+from mainframe.finance.rules import rules
 from mainframe.finance.tasks import backup_finance_model
 
+IMPORT_BATCH_SIZE = 1000
+IMPORT_KEY = "account_id", "started_at", "amount", "description", "balance"
+
+
+def keywords(*keys) -> re.Pattern:
+    """One regex matching any of the keys, as substrings"""
+    return re.compile("|".join(map(re.escape, keys)))
+
+
+# Raiffeisen transaction types, by the keywords in the description
+ATM_WORD = re.compile(r"(?<!\S)atm(?!\S)", re.IGNORECASE)
+FEE_KEYS = keywords("comision", "dobanda", "taxa")
+REVOLUT_KEYS = keywords(
+    "PLATA LUNA ",
+    "revolut  revolutie Dublin ",
+    "www.revolutieinternal Dublin",
+    "Revolut ",
+    "Revolut*",
+    "REVOLUT**",
+    "|REVOLUT |",
+    "| SENT FROM REVOLUT",
+)
+TOPUP_KEYS = keywords("telemunca", "salar", "plata automata dob", "diurna")
+TRANSFER_KEYS = keywords("depozit", "transfer", "trz ib conturi proprii")
+
 
 class StatementImportError(Exception): ...
 
@@ -26,6 +65,21 @@ class StatementParser:
 
 
 class RaiffeisenParser(StatementParser):
+    HEADER = [
+        "Data inregistrare",
+        "Data tranzactiei",
+        "Suma debit",
+        "Suma credit",
+        "Nr. OP",
+        "Cod fiscal beneficiar",
+        "Ordonator final",
+        "Beneficiar final",
+        "Nume/Denumire \n ordonator/beneficiar",
+        "Denumire Banca \nordonator/ beneficiar",
+        "Nr. cont in/din care se \n efectueaza tranzactiile",
+        "Descrierea tranzactiei",
+    ]
+
     @staticmethod
     def detect_started_at(description, default):
         started_at_title = "Data utilizarii cardului "
@@ -37,37 +91,28 @@ class RaiffeisenParser(StatementParser):
         return datetime.strptime(started_at, "%d/%m/%Y").replace(tzinfo=timezone.utc)
 
     @staticmethod
-    def detect_transaction_type(description, is_credit=False):  # noqa: C901, PLR0911
-        last_part = description.split("|")[-1].lower()
-        if "atm" in [item.lower() for item in description.split()]:
+    def detect_transaction_type(description, is_credit=False):  # noqa: PLR0911
+        """The type by the keywords in the description, the first group matching
+
+        Each group of keywords is a precompiled regex, so a description is
+        lowercased and split once instead of once per keyword.
+        """
+        if ATM_WORD.search(description):
             return Transaction.TYPE_ATM
-        for key in (
-            "PLATA LUNA ",
-            "revolut  revolutie Dublin ",
-            "www.revolutieinternal Dublin",
-            "Revolut ",
-            "Revolut*",
-            "REVOLUT**",
-            "|REVOLUT |",
-            "| SENT FROM REVOLUT",
-        ):
-            if key in description:
-                return (
-                    Transaction.TYPE_TOPUP if is_credit else Transaction.TYPE_TRANSFER
-                )
-        for key in ("depozit", "transfer", "trz ib conturi proprii"):
-            if key in last_part:
-                return Transaction.TYPE_TRANSFER
-        if "schimb valutar" in description.lower():
+        if REVOLUT_KEYS.search(description):
+            return Transaction.TYPE_TOPUP if is_credit else Transaction.TYPE_TRANSFER
+        lowered = description.lower()
+        last_part = lowered.rpartition("|")[2]
+        if TRANSFER_KEYS.search(last_part):
+            return Transaction.TYPE_TRANSFER
+        if "schimb valutar" in lowered:
             return Transaction.TYPE_EXCHANGE
-        for key in ("telemunca", "salar", "plata automata dob", "diurna"):
-            if key in last_part:
-                return Transaction.TYPE_TOPUP
-        if "refund" in description.lower():
+        if TOPUP_KEYS.search(last_part):
+            return Transaction.TYPE_TOPUP
+        if "refund" in lowered:
             return Transaction.TYPE_CARD_REFUND
-        for key in ("comision", "dobanda", "taxa"):
-            if key in description.lower():
-                return Transaction.TYPE_FEE
+        if FEE_KEYS.search(lowered):
+            return Transaction.TYPE_FEE
         return (
             Transaction.TYPE_UNIDENTIFIED
             if is_credit
@@ -87,51 +132,32 @@ class RaiffeisenParser(StatementParser):
         )
         additional_data = {}
         for i, value in enumerate(data):
-            if value := value.strip():
+            if value := str(value or "").strip():  # empty cells are None
                 additional_data[fields[i]] = value
         return additional_data
 
-    def run(self):  # noqa: C901, PLR0912
-        from openpyxl import load_workbook
-
-        wb = load_workbook(self.file)
-        ws = wb.active
-
-        rows = list(ws.rows)
-        starting_index = None
-        for i, row in enumerate(rows):
-            if row[0].value == "Nume client:":
-                starting_index = i
-
-        if not starting_index:
-            raise StatementImportError("Could not find starting index")
-
-        if rows[starting_index][0].value != "Nume client:":
+    def get_account(self, rows) -> Account:
+        """The account from the rows starting with "Nume client:" """
+        if rows[0][0] != "Nume client:":
             raise AssertionError
         middle_name, first_name, last_name = [
-            n.capitalize() for n in rows[starting_index][1].value.split()
+            n.capitalize() for n in rows[0][1].split()
         ]
-        if rows[starting_index + 2][0].value != "Numar client:":
+        if rows[2][0] != "Numar client:":
             raise AssertionError
-        client_code = rows[starting_index + 2][1].value
-        if rows[starting_index + 4][0].value != "Unitate Bancara:":
+        client_code = rows[2][1]
+        if rows[4][0] != "Unitate Bancara:":
             raise AssertionError
-        bank = rows[starting_index + 4][1].value
-        if rows[starting_index + 6][0].value != "Cod IBAN:":
+        bank = rows[4][1]
+        if rows[6][0] != "Cod IBAN:":
             raise AssertionError
-        number = " ".join(chunks(rows[starting_index + 6][1].value, 4))
-        if rows[starting_index + 6][2].value != "Tip cont:":
+        number = " ".join(chunks(rows[6][1], 4))
+        if rows[6][2] != "Tip cont:":
             raise AssertionError
-        account_type = (
-            "Current" if rows[starting_index + 6][3].value == "curent" else None
-        )
-        if rows[starting_index + 6][4].value != "Valuta:":
+        account_type = "Current" if rows[6][3] == "curent" else None
+        if rows[6][4] != "Valuta:":
             raise AssertionError
-        currency = (
-            "RON"
-            if rows[starting_index + 6][5].value == "LEI"
-            else rows[starting_index + 6][5].upper()
-        )
+        currency = "RON" if rows[6][5] == "LEI" else rows[6][5].upper()
 
         account, created = Account.objects.get_or_create(
             bank=bank,
@@ -145,60 +171,64 @@ class RaiffeisenParser(StatementParser):
         if created:
             self.logger.warning("New account", account=str(account))
             backup_finance_model(model="Account")
+        return account
+
+    def get_transaction(self, account, row) -> Transaction:
+        started_at, completed_at, debit, credit, *additional_data, description = row
+        completed_at = completed_at and datetime.strptime(
+            completed_at, "%d/%m/%Y"
+        ).replace(tzinfo=timezone.utc)
+
+        cleaned_description, from_description = description, []
+        if "|" in description:
+            cleaned_description, *from_description = description.split("|")
+            cleaned_description = cleaned_description.strip()
+            from_description = [part.strip() for part in from_description]
+
+        additional_data = self.extract_additional_data(additional_data)
+        additional_data["from_description"] = from_description
+        return Transaction(
+            account=account,
+            additional_data=additional_data,
+            amount=credit if credit else -debit,
+            completed_at=completed_at,
+            currency=account.currency,
+            description=cleaned_description,
+            product=account.type,
+            started_at=self.detect_started_at(description, default=started_at),
+            state=completed_at and "Completed",
+            type=self.detect_transaction_type(description, is_credit=bool(credit)),
+        )
 
-        header_index = starting_index + 11
-        header = [x.value for x in rows[header_index]]
-        if header != [
-            "Data inregistrare",
-            "Data tranzactiei",
-            "Suma debit",
-            "Suma credit",
-            "Nr. OP",
-            "Cod fiscal beneficiar",
-            "Ordonator final",
-            "Beneficiar final",
-            "Nume/Denumire \n ordonator/beneficiar",
-            "Denumire Banca \nordonator/ beneficiar",
-            "Nr. cont in/din care se \n efectueaza tranzactiile",
-            "Descrierea tranzactiei",
-        ]:
-            raise AssertionError
-
-        if any(x.value for x in rows[header_index + 1]):
-            raise AssertionError
-        rows = rows[header_index + 2 :]
-        transactions = []
-        while any((row := [x.value for x in rows.pop(0)])):
-            started_at, completed_at, debit, credit, *additional_data, description = row
-            completed_at = completed_at and datetime.strptime(
-                completed_at, "%d/%m/%Y"
-            ).replace(tzinfo=timezone.utc)
-
-            cleaned_description, from_description = description, []
-            if "|" in description:
-                cleaned_description, *from_description = description.split("|")
-                cleaned_description = cleaned_description.strip()
-                from_description = [part.strip() for part in from_description]
-
-            additional_data = self.extract_additional_data(additional_data)
-            additional_data["from_description"] = from_description
-            transactions.append(
-                Transaction(
-                    account=account,
-                    additional_data=additional_data,
-                    amount=credit if credit else -debit,
-                    completed_at=completed_at,
-                    currency=currency,
-                    description=cleaned_description,
-                    product=account_type,
-                    started_at=self.detect_started_at(description, default=started_at),
-                    state=completed_at and "Completed",
-                    type=self.detect_transaction_type(
-                        description, is_credit=bool(credit)
-                    ),
-                )
-            )
-        return transactions
+    def run(self):
+        """Yields the transactions, reading the sheet one row at a time
+
+        The account details start at the "Nume client:" row, the header is 11
+        rows below it, followed by an empty row, the transactions and another
+        empty row.
+        """
+        wb = load_workbook(self.file, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            for row in rows:
+                if row and row[0] == "Nume client:":
+                    break
+            else:
+                raise StatementImportError("Could not find starting index")
+
+            preamble = [row, *islice(rows, 12)]
+            account = self.get_account(preamble)
+            if list(preamble[11]) != self.HEADER:
+                raise AssertionError
+            if any(preamble[12]):
+                raise AssertionError
+
+            for row in rows:
+                if not any(row):
+                    break
+                yield self.get_transaction(account, row)
+        finally:
+            wb.close()
 
 
 class RevolutParser(StatementParser):
@@ -250,12 +280,83 @@ class RevolutParser(StatementParser):
         return transaction
 
     def run(self):
-        reader = csv.DictReader(io.StringIO(self.file.read().decode()))
+        """Yields the transactions, reading the file one line at a time"""
+        reader = csv.DictReader(
+            io.TextIOWrapper(self.file, encoding="utf-8", newline="")
+        )
         reader.fieldnames = list(map(self.get_field, reader.fieldnames))
-        return [Transaction(**self.normalize(line)) for line in reader]
+        for line in reader:
+            yield Transaction(**self.normalize(line))
 
 
-def import_statement(file: str | InMemoryUploadedFile, logger):
+def get_fingerprint(file: str | InMemoryUploadedFile) -> str:
+    """sha256 of the file contents"""
+    digest = hashlib.sha256()
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            for chunk in File(f).chunks():
+                digest.update(chunk)
+    else:
+        for chunk in file.chunks():
+            digest.update(chunk)
+        file.seek(0)
+    return digest.hexdigest()
+
+
+def get_import_key(account_id, started_at, amount, description, balance) -> tuple:
+    """What identifies a statement row, amounts rounded like in the db"""
+    return (
+        account_id,
+        started_at,
+        round(Decimal(str(amount)), 2),
+        description,
+        balance if balance is None else round(Decimal(str(balance)), 2),
+    )
+
+
+def exclude_imported(transactions: list[Transaction], seen: Counter) -> list:
+    """The transactions that aren't in the db already
+
+    Identical rows are legit (e.g. Raiffeisen rows only have the date), so a
+    row is skipped only while there are more of them in the db than in the
+    rows of the file seen so far - which are counted in `seen`.
+    """
+    keys = [
+        get_import_key(*(getattr(t, field) for field in IMPORT_KEY))
+        for t in transactions
+    ]
+    available = Counter(
+        get_import_key(*row)
+        for row in Transaction.objects.filter(
+            account_id__in={key[0] for key in keys},
+            started_at__range=(
+                min(key[1] for key in keys),
+                max(key[1] for key in keys),
+            ),
+        ).values_list(*IMPORT_KEY)
+    )
+    available.subtract(seen)
+    new = []
+    for transaction, key in zip(transactions, keys, strict=True):
+        seen[key] += 1
+        if available[key] > 0:
+            available[key] -= 1
+        else:
+            new.append(transaction)
+    return new
+
+
+def import_statement(
+    file: str | InMemoryUploadedFile, logger, progress=None
+) -> tuple[StatementImport, bool]:
+    """Create the new transactions in the statement, in batches, all or nothing
+
+    Files imported before are skipped, and so are the rows already imported
+    from overlapping statements. The category rules are applied to the new
+    ones, and their monthly rollups refreshed once, at the end. Returns the
+    import and whether it's new.
+    progress, if given, is called with the counts so far after each batch.
+    """
     extension = (
         file.split(".")[-1] if isinstance(file, str) else file.name.split(".")[-1]
     ).lower()
@@ -268,17 +369,46 @@ def import_statement(file: str | InMemoryUploadedFile, logger):
             f'Missing bank statement parser for extension: "{extension}"'
         )
 
+    fingerprint = get_fingerprint(file)
     try:
-        results = parser.run()
-    except (IndexError, ValueError) as e:
-        logger.exception("Failed to import statements")
-        raise StatementImportError(e) from e
-
-    try:
-        transactions = Transaction.objects.bulk_create(results)
+        with atomic():
+            statement, created = StatementImport.objects.get_or_create(
+                fingerprint=fingerprint,
+                defaults={"name": file if isinstance(file, str) else file.name},
+            )
+            if not created:
+                logger.warning("Statement already imported", name=statement.name)
+                return statement, False
+
+            transactions, seen = parser.run(), Counter()
+            index, matched = rules.get(), 0
+            with deferred_rollups():
+                while batch := list(islice(transactions, IMPORT_BATCH_SIZE)):
+                    new = exclude_imported(batch, seen)
+                    matched += index.apply(new)
+                    Transaction.objects.bulk_create(new)
+                    statement.transaction_count += len(new)
+                    statement.skipped_count += len(batch) - len(new)
+                    if progress:
+                        progress(
+                            skipped=statement.skipped_count,
+                            transactions=statement.transaction_count,
+                        )
+            statement.save(update_fields=("skipped_count", "transaction_count"))
     except (IntegrityError, ValidationError) as e:
         logger.exception("Failed to create transaction records")
         raise StatementImportError(e) from e
+    except (IndexError, ValueError) as e:
+        logger.exception("Failed to import statements")
+        raise StatementImportError(e) from e
 
-    backup_finance_model(model="Transaction")
-    return transactions
+    logger.info(
+        "Statement imported",
+        matched_rules=matched,
+        name=statement.name,
+        skipped=statement.skipped_count,
+        transactions=statement.transaction_count,
+    )
+    if statement.transaction_count:
+        backup_finance_model(model="Transaction")
+    return statement, True
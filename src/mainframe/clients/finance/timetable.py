@@ -1,11 +1,10 @@
-import io
 import re
 from datetime import datetime
 
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
-from pypdf import PdfReader
 
+from mainframe.clients.finance.pdf import extract_pages_text, read_content
 from mainframe.finance.models import Account, Credit, Timetable
 from mainframe.finance.tasks import backup_finance_model
 
@@ -15,8 +14,8 @@ class TimetableImportError(Exception): ...
 
 def extract_amortization_table(pages):
     amortization_table = []
-    for i, page in enumerate(pages):
-        *rows, _, page = page.extract_text().split("\n")  # noqa: PLW2901
+    for i, text in enumerate(pages):
+        *rows, _, page = text.split("\n")
         rows = filter(lambda x: x[0].isdigit(), rows)
         current_page, _ = page.split("/")
         if i + 2 != int(current_page):
@@ -27,7 +26,7 @@ def extract_amortization_table(pages):
 
 def extract_first_page(first_page, logger):
     try:
-        summary, contents = first_page.extract_text().split("TABEL DE AMORTIZARE")
+        summary, contents = first_page.split("TABEL DE AMORTIZARE")
     except ValueError as e:
         raise TimetableImportError("Could not extract details on first page") from e
     fields, _, *rows, footer, __ = [x for x in contents.split("\n") if x]
@@ -136,13 +135,9 @@ def extract_summary(summary):
 
 
 def import_timetable(file, logger):
-    if isinstance(file, str):
-        reader = PdfReader(file)
-    else:
-        reader = PdfReader(io.BytesIO(file.read()))
-    first_page = reader.pages[0]
+    first_page, *pages = extract_pages_text(read_content(file))
     timetable = extract_first_page(first_page, logger)
-    timetable.amortization_table.extend(extract_amortization_table(reader.pages[1:]))
+    timetable.amortization_table.extend(extract_amortization_table(pages))
     try:
         timetable.save()
     except (IntegrityError, ValidationError, ValueError) as e:
@@ -3,12 +3,10 @@ import itertools
 from datetime import datetime, timedelta
 from typing import List
 
-import aiohttp
 import structlog
-from bs4 import BeautifulSoup
 from django.core.signing import Signer
-from rest_framework import status
 
+from mainframe.clients import scraper
 from mainframe.meals.models import Meal
 
 logger = structlog.get_logger(__name__)
@@ -26,29 +24,15 @@ class FetchMealsException(Exception):
     pass
 
 
-async def fetch(session, sem, url):
-    async with sem:
-        try:
-            async with session.get(url) as response:
-                if response.status != status.HTTP_200_OK:
-                    msg = f"Unexpected status for {url}. Status: {response.status}"
-                    if response.status == status.HTTP_404_NOT_FOUND:
-                        logger.warning(msg)
-                    else:
-                        raise ValueError(msg)
-                return await response.text(), url
-        except aiohttp.client_exceptions.ClientConnectorError:
-            logger.exception("Failed to fetch meals", url=url)
-            return "", url
-
-
 async def fetch_many(urls):
-    sem = asyncio.Semaphore(1000)
-    async with aiohttp.ClientSession() as session:
-        return map(
-            parse_week,
-            await asyncio.gather(*[fetch(session, sem, url) for url in urls]),
-        )
+    responses = await scraper.fetch_many(urls, soup=False)
+    weeks = []
+    for url, (response, error) in zip(urls, responses, strict=True):
+        if error:
+            logger.warning("Failed to fetch meals", error=str(error), url=url)
+            continue
+        weeks.append(parse_week((response.text, url)))
+    return weeks
 
 
 def parse_meal(row) -> Meal:
@@ -94,7 +78,10 @@ def parse_week(args) -> List[Meal]:
         "noi": "nov",
     }
     response_text, url = args
-    soup = BeautifulSoup(response_text, features="html.parser")
+    soup = scraper.make_soup(
+        response_text,
+        scraper.class_strainer("weekly-buttons", "slider-menu-for-day"),
+    )
 
     week = (
         soup.find("div", {"class": "weekly-buttons"})
@@ -1,27 +1,93 @@
+import os
 import pickle
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from itertools import islice
 
-import django.db.models
 from django.conf import settings
 from django.utils import timezone
+from google.api_core.exceptions import NotFound
 from huey.signals import SIGNAL_ERROR
 
 from mainframe.clients.storage import GoogleCloudStorageClient
 from mainframe.core.tasks import log_status
 
+MODEL_BUCKET = "GOOGLE_STORAGE_MODEL_BUCKET"
+MODEL_CACHE_SIZE = 4  # the model and vectorizer of the latest 2 versions
+MODEL_FILES = ("latest_model", "latest_vectorizer")
+MODE_FULL = "full"
+MODE_INCREMENTAL = "incremental"
+HASH_FEATURES = 2**16  # plenty for merchant names, keeps the coefficients small
+MIN_ACCURACY = 0.95  # below it, the latest model is kept
+TRAIN_BATCH_SIZE = 5000
 
-def load(file_name):
-    file_name = f"{file_name}.pkl"
+
+def get_model_path(file_name) -> str:
+    return f"{settings.BASE_DIR}/finance/data/model/{file_name}.pkl"
+
+
+def load(file_name, version=None):
+    """Unpickle the stored item, at the given version (blob generation) if any"""
     if settings.ENV != "local":
         client = GoogleCloudStorageClient()
         file = client.download_blob_into_memory(
-            file_name, "GOOGLE_STORAGE_MODEL_BUCKET"
+            f"{file_name}.pkl", MODEL_BUCKET, generation=version
         )
         return pickle.loads(file)  # noqa: S301, BAN-B301
-    model_path = f"{settings.BASE_DIR}/finance/data/model"
-    with open(f"{model_path}/{file_name}", "rb") as file:
+    with open(get_model_path(file_name), "rb") as file:
         return pickle.load(file)  # noqa: S301, BAN-B301
 
 
+class ModelRegistry:
+    """The unpickled models and vectorizers, kept in memory by name and version
+
+    Each get only checks the stored version: the blob generation, or the
+    file's mtime locally. New versions are downloaded and unpickled once per
+    process, the least recently used ones evicted past the size.
+    """
+
+    def __init__(self, size=MODEL_CACHE_SIZE):
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.size = size
+
+    @cached_property
+    def client(self):
+        return GoogleCloudStorageClient()
+
+    def get_version(self, file_name):
+        if settings.ENV != "local":
+            return self.client.get_blob_generation(f"{file_name}.pkl", MODEL_BUCKET)
+        return os.stat(get_model_path(file_name)).st_mtime_ns
+
+    def get(self, file_name):
+        key = file_name, self.get_version(file_name)
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return self.items[key]
+
+        item = load(*key)
+        with self.lock:
+            self.items[key] = item
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return item
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def warm_up(self):
+        """Load the latest versions ahead of the first prediction"""
+        for file_name in MODEL_FILES:
+            self.get(file_name)
+
+
+registry = ModelRegistry()
+
+
 def save(item, item_type, prefix, logger):
     if settings.ENV != "local":
         client = GoogleCloudStorageClient(logger)
@@ -34,11 +100,47 @@ def save(item, item_type, prefix, logger):
             pickle.dump(item, file)
 
 
+def check_accuracy(accuracy, mode):
+    """Raise, logging the error, if the model isn't accurate enough to be saved"""
+    if accuracy is None:
+        error = "Not enough transactions to validate the model"
+    elif accuracy < MIN_ACCURACY:
+        error = f"Insufficient accuracy: {accuracy:.2f}"
+    else:
+        return
+    log_status("train", error=error, mode=mode, status=SIGNAL_ERROR)
+    raise ValueError(error)
+
+
+def get_batches(rows, split_first=False):
+    """Lists of up to TRAIN_BATCH_SIZE rows
+
+    split_first: a new model can't score the first batch before learning from
+    it, so its last fifth comes in a batch of its own, to be validated on
+    """
+    while batch := list(islice(rows, TRAIN_BATCH_SIZE)):
+        if split_first and len(batch) > 1:
+            cut = len(batch) * 4 // 5
+            yield batch[:cut]
+            batch = batch[cut:]
+        split_first = False
+        yield batch
+
+
+def load_checkpoint() -> dict | None:
+    """How and when the latest model was trained, None before the first one"""
+    try:
+        return load("latest_checkpoint")
+    except (FileNotFoundError, NotFound):
+        return None
+
+
 class SKLearn:
     @classmethod
-    def predict(cls, df) -> django.db.models.QuerySet:
-        model, vectorizer = load("latest_model"), load("latest_vectorizer")
-        return model.predict(vectorizer.transform(df["description"]))
+    def predict(cls, descriptions: list[str]):
+        """The predicted category of each description, in the same order"""
+        model, vectorizer = map(registry.get, MODEL_FILES)
+        return model.predict(vectorizer.transform(descriptions))
 
     @classmethod
     def train(cls, df, logger):
@@ -57,18 +159,82 @@ class SKLearn:
         X_train = vect.fit_transform(X_train)
         X_test = vect.transform(X_test)
 
+        trained_at = timezone.now()
         model = LogisticRegression()  # noqa: F821
         model.fit(X_train, y_train)
 
         accuracy = model.score(X_test, y_test)
 
         log_status("train", accuracy=f"{accuracy:.2f}")
-        if accuracy < 0.95:  # noqa PLR2004
-            error = f"Insufficient accuracy: {accuracy:.2f}"
-            log_status("train", status=SIGNAL_ERROR, error=error)
-            raise ValueError(error)
+        check_accuracy(accuracy, MODE_FULL)
 
         prefix = f"{timezone.now():%Y_%m_%d_%H_%M_%S}_{accuracy}"
         save(model, "model", prefix, logger=logger)
         save(vect, "vectorizer", prefix, logger=logger)
+        checkpoint = {"mode": MODE_FULL, "trained_at": trained_at}
+        save(checkpoint, "checkpoint", prefix, logger=logger)
+        return accuracy
+
+    @classmethod
+    def train_incremental(cls, queryset, classes, logger):
+        """Update the model with the transactions confirmed since the last run
+
+        Descriptions are hashed, so there's no vocabulary to refit, and the
+        classifier is fed in batches with partial_fit. Starts over, on the
+        whole queryset, if the latest model wasn't trained incrementally or
+        the new transactions have categories it doesn't know about.
+        Each batch is scored before the model learns from it, and like a full
+        training, the model is only saved if that accuracy is high enough.
+        queryset: the confirmed transactions, classes: every category id
+        """
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+
+        trained_at = timezone.now()
+        checkpoint = load_checkpoint()
+        model = None
+        if checkpoint and checkpoint["mode"] == MODE_INCREMENTAL:
+            new = queryset.filter(updated_at__gte=checkpoint["trained_at"])
+            model = load("latest_model")
+            categories = new.order_by().values_list("category", flat=True).distinct()
+            if unknown := set(categories) - set(model.classes_):
+                logger.warning("New categories, starting over", categories=unknown)
+                model = None
+            else:
+                classes, queryset = model.classes_, new
+        if model is None:
+            model = SGDClassifier(loss="log_loss", random_state=42)
+
+        vectorizer = HashingVectorizer(alternate_sign=False, n_features=HASH_FEATURES)
+        rows = queryset.values_list("description", "category").iterator(
+            chunk_size=TRAIN_BATCH_SIZE
+        )
+        count = validated = correct = 0
+        for batch in get_batches(rows, split_first=not hasattr(model, "classes_")):
+            descriptions, categories = zip(*batch, strict=True)
+            X = vectorizer.transform(descriptions)
+            if hasattr(model, "classes_"):  # scored before it learns from them
+                predictions = model.predict(X)
+                correct += sum(
+                    p == c for p, c in zip(predictions, categories, strict=True)
+                )
+                validated += len(batch)
+            model.partial_fit(X, categories, classes=classes)
+            count += len(batch)
+            log_status("train", count=count, mode=MODE_INCREMENTAL)
+
+        if not count:
+            logger.info("No new confirmed transactions")
+            log_status("train", count=0, mode=MODE_INCREMENTAL)
+            return None
+
+        accuracy = correct / validated if validated else None
+        if accuracy is not None:
+            log_status("train", accuracy=f"{accuracy:.2f}", mode=MODE_INCREMENTAL)
+        check_accuracy(accuracy, MODE_INCREMENTAL)
+        prefix = f"{timezone.now():%Y_%m_%d_%H_%M_%S}_{MODE_INCREMENTAL}"
+        save(model, "model", prefix, logger=logger)
+        save(vectorizer, "vectorizer", prefix, logger=logger)
+        checkpoint = {"mode": MODE_INCREMENTAL, "trained_at": trained_at}
+        save(checkpoint, "checkpoint", prefix, logger=logger)
         return accuracy
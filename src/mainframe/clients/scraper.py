@@ -1,14 +1,126 @@
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from multidict import CIMultiDict
 from requests import Response
+from requests.adapters import HTTPAdapter
+
+PARSER = "html.parser"
+POOL_MAXSIZE = 10
+PER_HOST_LIMIT = 20
+VALIDATORS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+
+
+class NotModified(Exception): ...
+
+
+@dataclass
+class AsyncResponse:
+    """The parts of an aiohttp response that outlive its connection"""
+
+    url: str
+    status_code: int
+    content: bytes
+    encoding: str = "utf-8"
+    headers: CIMultiDict = field(default_factory=CIMultiDict)
+    elapsed: float = 0
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def make_soup(
+    markup, parse_only: SoupStrainer | None = None, features=PARSER
+) -> BeautifulSoup:
+    """Parse markup with the given backend (any tree builder bs4 knows about)
+
+    parse_only builds the tree from the matching elements only, which keeps
+    both the parse time and the memory down on large pages.
+    """
+    return BeautifulSoup(markup, features=features, parse_only=parse_only)
+
+
+def class_strainer(*class_names, name=None) -> SoupStrainer:
+    """Match the elements having any of class_names, besides any other classes
+
+    A plain class_ filter compares against the whole class attribute while
+    the document is being parsed, e.g. "item active" wouldn't match "item".
+    """
+    wanted = set(class_names)
+
+    def matches(value) -> bool:
+        if not value:
+            return False
+        return not wanted.isdisjoint(value.split() if isinstance(value, str) else value)
+
+    return SoupStrainer(name, class_=matches)
+
+
+def get_session(url) -> requests.Session:
+    """One keep-alive session per host, shared by all callers in the process"""
+    host = urlsplit(url).netloc
+    with _lock:
+        if not (session := _sessions.get(host)):
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+    return session
+
+
+def get_validators(response: Response | AsyncResponse) -> dict[str, str]:
+    """The ETag / Last-Modified of a response, to make the next request conditional
+
+    Store them only once the response was processed: sent back to the server,
+    they turn an unchanged resource into a NotModified error.
+    """
+    return {name: value for name in VALIDATORS if (value := response.headers.get(name))}
+
+
+def add_validators(method, kwargs, validators) -> None:
+    """Add the validators of a previous response to the request headers"""
+    if not validators or method.upper() != "GET":
+        return
+    headers = {
+        header: value
+        for name, header in VALIDATORS.items()
+        if (value := validators.get(name))
+    }
+    kwargs["headers"] = {**headers, **(kwargs.get("headers") or {})}
 
 
 def fetch(
-    url, retries=0, soup=True, timeout=10, **kwargs
+    url, retries=0, soup=True, timeout=10, validators=None, **kwargs
 ) -> tuple[BeautifulSoup | Response | None, Exception | None]:
+    """Fetch a url through the per host session
+
+    validators: the get_validators of the caller's previous response, if any.
+    GET requests send them along and report an unchanged resource as a
+    NotModified error so the caller can skip parsing altogether.
+    parse_only and features are passed on to make_soup when soup=True.
+    """
     method = kwargs.pop("method", "GET")
+    parse_only = kwargs.pop("parse_only", None)
+    features = kwargs.pop("features", PARSER)
+    add_validators(method, kwargs, validators)
     try:
-        response = requests.request(method, url, timeout=timeout, **kwargs)
+        response = get_session(url).request(method, url, timeout=timeout, **kwargs)
         response.raise_for_status()
     except (
         requests.exceptions.ConnectionError,
@@ -17,8 +129,96 @@ def fetch(
         requests.exceptions.TooManyRedirects,
     ) as e:
         if retries > 0:
-            return fetch(url, retries - 1, soup, timeout, **kwargs)
+            return fetch(
+                url,
+                retries - 1,
+                soup,
+                timeout,
+                validators,
+                method=method,
+                parse_only=parse_only,
+                features=features,
+                **kwargs,
+            )
         return None, e
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None, NotModified(url)
     if not soup:
         return response, None
-    return BeautifulSoup(response.content, features="html.parser"), None
+    return make_soup(response.content, parse_only, features), None
+
+
+async def request(
+    session: aiohttp.ClientSession, method, url, retries=0, backoff=0.5, **kwargs
+) -> AsyncResponse:
+    """Retry connection errors, timeouts and 5xx responses with exponential backoff"""
+    for attempt in range(retries + 1):
+        if attempt:
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+        started = time.monotonic()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                content = await response.read()
+                response.raise_for_status()
+                return AsyncResponse(
+                    url=str(response.url),
+                    status_code=response.status,
+                    content=content,
+                    encoding=response.get_encoding(),
+                    headers=CIMultiDict(response.headers),
+                    elapsed=time.monotonic() - started,
+                )
+        except aiohttp.ClientResponseError as e:
+            if e.status < HTTPStatus.INTERNAL_SERVER_ERROR or attempt == retries:
+                raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+    raise ValueError(f"Invalid number of retries: {retries}")
+
+
+async def fetch_one(
+    session: aiohttp.ClientSession, url, soup=True, validators=None, **kwargs
+) -> tuple[BeautifulSoup | AsyncResponse | None, Exception | None]:
+    method = kwargs.pop("method", "GET")
+    parse_only = kwargs.pop("parse_only", None)
+    features = kwargs.pop("features", PARSER)
+    if "verify" in kwargs:  # requests option names, as accepted by fetch
+        kwargs["ssl"] = bool(kwargs.pop("verify"))
+    if isinstance(timeout := kwargs.get("timeout"), int | float):
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+    add_validators(method, kwargs, validators)
+    try:
+        result = await request(session, method, url, **kwargs)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return None, e
+
+    if result.status_code == HTTPStatus.NOT_MODIFIED:
+        return None, NotModified(url)
+    if not soup:
+        return result, None
+    return make_soup(result.content, parse_only, features), None
+
+
+async def fetch_many(
+    urls, soup=True, timeout=10, per_host=PER_HOST_LIMIT, **kwargs
+) -> list[tuple[BeautifulSoup | AsyncResponse | None, Exception | None]]:
+    """Fetch all urls concurrently, at most per_host connections to any host
+
+    Accepts the same options as fetch (plus backoff, the base delay in seconds
+    between retries) and returns one (soup or response, error) pair per url,
+    in the order the urls were given. A url can also be a (url, options) pair
+    to override the shared options for that request only.
+    """
+    connector = aiohttp.TCPConnector(limit_per_host=per_host)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as session:
+        return await asyncio.gather(
+            *[
+                fetch_one(session, url, soup=soup, **{**kwargs, **options})
+                for url, options in (
+                    (url, {}) if isinstance(url, str) else url for url in urls
+                )
+            ]
+        )
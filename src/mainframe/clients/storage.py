@@ -19,9 +19,15 @@ class GoogleCloudStorageClient:
         bucket = self.client.bucket(config("GOOGLE_STORAGE_BUCKET"))
         bucket.blob(blob_name).download_to_filename(f"{destination_path}/{blob_name}")
 
-    def download_blob_into_memory(self, blob_name, bucket_var=None):
+    def download_blob_into_memory(self, blob_name, bucket_var=None, generation=None):
         bucket = self.client.bucket(config(bucket_var or "GOOGLE_STORAGE_BUCKET"))
-        return bucket.blob(blob_name).download_as_string()
+        return bucket.blob(blob_name, generation=generation).download_as_string()
+
+    def get_blob_generation(self, blob_name, bucket_var=None):
+        """The blob's current generation (a metadata request), None if missing"""
+        bucket = self.client.bucket(config(bucket_var or "GOOGLE_STORAGE_BUCKET"))
+        blob = bucket.get_blob(blob_name)
+        return blob.generation if blob else None
 
     def list_blobs_with_prefix(self, prefix):
         bucket_name = self.client.bucket(config("GOOGLE_STORAGE_BUCKET"))
@@ -0,0 +1,129 @@
+import bisect
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from huey import signals
+
+from mainframe.core.queues import SIGNAL_ENQUEUED
+
+# Upper bounds of the histogram buckets, in seconds, plus the overflow bucket
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+FINISHED = (signals.SIGNAL_COMPLETE, signals.SIGNAL_ERROR)
+METRICS = ("duration", "wait")
+PERCENTILES = (50, 95, 99)
+TASKS_KEY = "metrics.tasks"
+WINDOW_HOURS = 24
+
+_lock = threading.Lock()
+_executing: dict[str, tuple[float, float | None]] = {}
+
+
+def get_enqueued_key(task_id) -> str:
+    return f"metrics.enqueued.{task_id}"
+
+
+def get_hour_key(name, hour: datetime) -> str:
+    return f"metrics.{name}.{hour:%Y%m%d%H}"
+
+
+def get_bucket(value) -> str:
+    index = bisect.bisect_left(BUCKETS, value)
+    return str(BUCKETS[index]) if index < len(BUCKETS) else "inf"
+
+
+def queue_metrics(pipe, signal, task) -> None:
+    """Queue the metric updates for a huey signal on a redis pipeline
+
+    For SIGNAL_EXECUTING the last two queued commands read and drop the
+    enqueue time of the task, pass their results on to track_executing.
+    """
+    if signal == SIGNAL_ENQUEUED:
+        pipe.set(get_enqueued_key(task.id), time.time(), ex=WINDOW_HOURS * 3600)
+    if signal == signals.SIGNAL_EXECUTING:
+        pipe.get(get_enqueued_key(task.id))
+        pipe.delete(get_enqueued_key(task.id))
+        return
+
+    key = get_hour_key(task.name, datetime.now(timezone.utc))
+    pipe.hincrby(key, signal, 1)
+    with _lock:
+        started, wait = _executing.pop(task.id, (None, None))
+    if started is not None and signal in FINISHED:
+        queue_observation(pipe, key, "duration", time.monotonic() - started)
+    if wait is not None:
+        queue_observation(pipe, key, "wait", wait)
+    pipe.expire(key, (WINDOW_HOURS + 1) * 3600)
+    pipe.sadd(TASKS_KEY, task.name)
+
+
+def queue_observation(pipe, key, metric, value) -> None:
+    pipe.hincrby(key, f"{metric}.{get_bucket(value)}", 1)
+    pipe.hincrbyfloat(key, f"{metric}.sum", value)
+
+
+def track_executing(task, enqueued_at) -> None:
+    """Keep the start time and queue wait until the task finishes"""
+    wait = time.time() - float(enqueued_at) if enqueued_at else None
+    with _lock:
+        _executing[task.id] = (time.monotonic(), wait)
+
+
+def get_percentile(histogram: dict[str, int], count, percentile) -> float | None:
+    """Upper bound of the bucket holding the percentile, None for the overflow"""
+    rank = count * percentile / 100
+    seen = 0
+    for bound in BUCKETS:
+        seen += histogram.get(str(bound), 0)
+        if seen >= rank:
+            return bound
+    return None
+
+
+def summarize(hashes: list[dict]) -> dict:
+    counters, histograms, sums = {}, {metric: {} for metric in METRICS}, {}
+    for values in hashes:
+        for raw_field, value in values.items():
+            field = raw_field.decode() if isinstance(raw_field, bytes) else raw_field
+            metric, _, bucket = field.partition(".")
+            if metric not in METRICS:
+                counters[field] = counters.get(field, 0) + int(value)
+            elif bucket == "sum":
+                sums[metric] = sums.get(metric, 0) + float(value)
+            else:
+                histograms[metric][bucket] = histograms[metric].get(bucket, 0) + int(
+                    value
+                )
+
+    summary = {"counters": counters}
+    for metric, histogram in histograms.items():
+        if not (count := sum(histogram.values())):
+            continue
+        summary[metric] = {
+            "count": count,
+            "mean": round(sums.get(metric, 0) / count, 3),
+            **{
+                f"p{percentile}": get_percentile(histogram, count, percentile)
+                for percentile in PERCENTILES
+            },
+            "histogram": histogram,
+        }
+    return summary
+
+
+def get_metrics(redis_client, hours=WINDOW_HOURS, names=None) -> dict[str, dict]:
+    """Counters and duration / queue wait histograms per task, for the last hours"""
+    names = sorted(
+        names or (name.decode() for name in redis_client.smembers(TASKS_KEY))
+    )
+    now = datetime.now(timezone.utc)
+    window = [now - timedelta(hours=hour) for hour in range(hours)]
+    with redis_client.pipeline(transaction=False) as pipe:
+        for name in names:
+            for hour in window:
+                pipe.hgetall(get_hour_key(name, hour))
+        results = pipe.execute()
+    return {
+        name: summarize(results[i * hours : (i + 1) * hours])
+        for i, name in enumerate(names)
+    }
@@ -1,8 +1,205 @@
+import base64
+import binascii
+import json
+
+from django.core import exceptions
+from django.core.paginator import Paginator
+from django.db.models import Count, F, OrderBy, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class AggregatePaginator(Paginator):
+    """Computes the aggregates of the whole queryset in the same query as count"""
+
+    aggregates: dict = {}
+
+    @cached_property
+    def count(self):
+        if not self.aggregates:
+            return super().count
+        totals = self.object_list.aggregate(count=Count("pk"), **self.aggregates)
+        count = totals.pop("count")
+        self.totals = totals
+        return count
 
 
 class MainframePagination(PageNumberPagination):
     def get_paginated_response(self, data):
         response = super().get_paginated_response(data)
         response.data["page_size"] = self.page.paginator.per_page
+        response.data.update(getattr(self.page.paginator, "totals", {}))
         return response
+
+
+def estimate_count(queryset) -> int:
+    """The planner's row estimate, only as good as the table statistics"""
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_keyset(queryset) -> list[tuple[str, bool]]:
+    """(name, descending) of the ordering columns, ending with the pk"""
+    keyset = []
+    for order in queryset.query.order_by or queryset.model._meta.ordering:
+        if isinstance(order, str) and order != "?":
+            keyset.append((order.lstrip("-"), order.startswith("-")))
+        elif isinstance(order, OrderBy) and isinstance(order.expression, F):
+            keyset.append((order.expression.name, order.descending))
+        else:
+            raise exceptions.ImproperlyConfigured(
+                f"Can't paginate by cursor on {order}"
+            )
+    if not keyset:
+        raise exceptions.ImproperlyConfigured(
+            "Cursor pagination needs an ordered queryset"
+        )
+
+    pk = queryset.model._meta.pk.name
+    if not {"pk", pk} & {name for name, _ in keyset}:
+        keyset.append((pk, keyset[0][1]))
+    return keyset
+
+
+class KeysetPagination(MainframePagination):
+    """Page numbers, or keyset pages if there's a cursor param (empty for the first)
+
+    Keyset pages filter on the ordering columns, with the pk as a tie-breaker,
+    instead of using OFFSET, so deep pages are as fast as the first one.
+    Their count is the planner's estimate, unless asked for with count=true.
+    The ordering columns can't be nullable.
+    """
+
+    count_query_param = "count"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.queryset = queryset
+        self.keyset = get_keyset(queryset)
+        self.page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(
+            *(
+                f"{'-' if descending != reverse else ''}{name}"
+                for name, descending in self.keyset
+            )
+        )
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        del results[self.page_size :]
+        if reverse:
+            results.reverse()
+
+        # coming back from a page means there's one in that direction
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.results = results
+        return results
+
+    def get_field(self, name):
+        if name == "pk":
+            return self.queryset.model._meta.pk
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except exceptions.FieldDoesNotExist:
+            return None  # annotation, e.g. the search rank
+
+    def get_keyset_filter(self, position, reverse) -> Q:
+        """Rows after the position, e.g. (a < x) | (a = x & pk < y) for -a, -pk
+
+        The first column is also bounded on its own so postgres can range scan.
+        """
+        lookups, equal = [], {}
+        for (name, descending), value in zip(self.keyset, position, strict=True):
+            lookup = "lt" if descending != reverse else "gt"
+            lookups.append(Q(**equal, **{f"{name}__{lookup}": value}))
+            equal[name] = value
+        first, descending = self.keyset[0]
+        lookup = "lte" if descending != reverse else "gte"
+        return Q(**{f"{first}__{lookup}": position[0]}) & Q.create(
+            lookups, connector=Q.OR
+        )
+
+    def decode_cursor(self, request) -> tuple[bool, list | None]:
+        if not (encoded := request.query_params[self.cursor_query_param]):
+            return False, None
+        try:
+            reverse, position = json.loads(base64.urlsafe_b64decode(encoded))
+            if len(position) != len(self.keyset):
+                raise ValueError
+            return bool(reverse), [
+                field.to_python(value) if (field := self.get_field(name)) else value
+                for (name, _), value in zip(self.keyset, position, strict=True)
+            ]
+        except (
+            binascii.Error,
+            exceptions.ValidationError,
+            TypeError,
+            UnicodeDecodeError,
+            ValueError,
+        ) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+
+    def encode_cursor(self, obj, reverse) -> str:
+        position = []
+        for name, _ in self.keyset:
+            field = self.get_field(name)
+            position.append(field.value_to_string(obj) if field else getattr(obj, name))
+        encoded = base64.urlsafe_b64encode(json.dumps([reverse, position]).encode())
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded.decode())
+
+    def get_count(self) -> tuple[int, bool, dict]:
+        """count, whether it's estimated and the aggregates of the paginator"""
+        if self.request.query_params.get(self.count_query_param) != "true":
+            return estimate_count(self.queryset), True, {}
+        aggregates = getattr(self.django_paginator_class, "aggregates", {})
+        totals = self.queryset.order_by().aggregate(count=Count("pk"), **aggregates)
+        return totals.pop("count"), False, totals
+
+    def get_paginated_response(self, data):
+        if self.keyset is None:
+            return super().get_paginated_response(data)
+        count, estimated, totals = self.get_count()
+        return Response(
+            {
+                "count": count,
+                "count_estimated": estimated,
+                "next": self.encode_cursor(self.results[-1], False)
+                if self.has_next and self.results
+                else None,
+                "previous": self.encode_cursor(self.results[0], True)
+                if self.has_previous and self.results
+                else None,
+                "page_size": self.page_size,
+                "results": data,
+                **totals,
+            }
+        )
+
+
+def get_page_params(request, page_size, max_page_size) -> tuple[int, int]:
+    """page and page_size query params, for endpoints not backed by a queryset"""
+    try:
+        page = int(request.query_params.get("page", 1))
+        page_size = int(request.query_params.get("page_size", page_size))
+    except ValueError as e:
+        raise ValidationError({"detail": "Invalid page or page_size"}) from e
+    if page < 1 or page_size < 1:
+        raise ValidationError({"detail": "page and page_size must be positive"})
+    return page, min(page_size, max_page_size)
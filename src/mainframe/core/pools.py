@@ -0,0 +1,35 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_lock = threading.Lock()
+_pools: dict[str, ProcessPoolExecutor] = {}
+
+
+def get_pool(name, max_workers) -> ProcessPoolExecutor:
+    """Named process pools, kept alive for the lifetime of the (consumer) process
+
+    Workers are spawned rather than forked since the consumer is multithreaded,
+    so the functions sent to them must live in modules that don't need django.
+    """
+    with _lock:
+        if not (pool := _pools.get(name)):
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pools[name] = pool
+    return pool
+
+
+def pool_map(name, fn, *iterables, max_workers=2) -> list:
+    """Ordered map over a named pool, max_workers=0 runs in the current process"""
+    if not max_workers:
+        return list(map(fn, *iterables))
+    try:
+        return list(get_pool(name, max_workers).map(fn, *iterables))
+    except BrokenProcessPool:
+        with _lock:
+            _pools.pop(name, None)
+        raise
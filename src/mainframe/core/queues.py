@@ -0,0 +1,112 @@
+import threading
+
+from huey import RedisHuey
+from huey.api import ResultGroup
+from huey.exceptions import ConfigurationError, HueyException
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+SIGNAL_ENQUEUED = "enqueued"
+
+QUEUE_BATCH = "batch"  # CPU / IO heavy jobs: ML, backups
+QUEUE_CRITICAL = "critical"  # latency sensitive checks: earthquakes, watchers
+QUEUE_DEFAULT = "default"
+QUEUES = (QUEUE_CRITICAL, QUEUE_DEFAULT, QUEUE_BATCH)  # in order of priority
+
+
+class MainframeHuey(RedisHuey):
+    """RedisHuey with named queues, which also signals when a task is enqueued
+
+    Tasks are routed with task(queue=...) and each consumer process pulls from
+    the queues it was configured with (settings.HUEY["queues"]), the first ones
+    taking priority. Schedules, results and locks are shared by all of them.
+    """
+
+    def __init__(self, name="huey", queues=QUEUES, **kwargs):
+        if unknown := set(queues) - set(QUEUES):
+            raise ConfigurationError(f"Unknown queues: {', '.join(sorted(unknown))}")
+        self.queues = tuple(queues or QUEUES)
+        self._reload = {}
+        self._reload_lock = threading.Lock()
+        super().__init__(name, **kwargs)
+
+    def on_reload(self, name=None):
+        """Hooks which register the tasks added at runtime (e.g. crons)
+
+        Those only end up in the registry of the consumer that scheduled them,
+        the others run the hooks when they get a task they don't know about.
+        """
+
+        def decorator(fn):
+            self._reload[name or fn.__name__] = fn
+            return fn
+
+        return decorator
+
+    def deserialize_task(self, data):
+        try:
+            return super().deserialize_task(data)
+        except HueyException:
+            if not self._reload:
+                raise
+        with self._reload_lock:
+            for hook in self._reload.values():
+                hook()
+        return super().deserialize_task(data)
+
+    def get_queue_key(self, queue) -> str:
+        # the default queue keeps huey's own list, so nothing is left behind
+        if queue == QUEUE_DEFAULT:
+            return self.storage.queue_key
+        return f"{self.storage.queue_key}.{queue}"
+
+    def enqueue(self, task):
+        queue = getattr(task, "queue", QUEUE_DEFAULT)
+        if self._immediate or queue == QUEUE_DEFAULT:
+            result = super().enqueue(task)
+        else:
+            if queue not in QUEUES:
+                raise ConfigurationError(f"Unknown queue: {queue}")
+            if task.expires:
+                task.resolve_expires(self.utc)
+            self.storage.conn.lpush(
+                self.get_queue_key(queue), self.serialize_task(task)
+            )
+            result = self.get_result(task)
+
+        if not self._immediate:
+            self._emit(SIGNAL_ENQUEUED, task)
+        return result
+
+    def get_result(self, task):
+        """The result handle of an enqueued task, same as RedisHuey.enqueue's
+
+        Pipelines get a ResultGroup with the results of every task in them.
+        """
+        if not self.results:
+            return None
+        if not task.on_complete:
+            return self._result_handle(task)
+        results = []
+        while task is not None:
+            results.append(self._result_handle(task))
+            task = task.on_complete
+        return ResultGroup(results)
+
+    def dequeue(self):
+        """Pop a task from the first non-empty queue this consumer pulls from"""
+        keys = [self.get_queue_key(queue) for queue in self.queues]
+        if not self.storage.blocking:
+            data = next(filter(None, map(self.storage.conn.rpop, keys)), None)
+        else:
+            try:
+                data = self.storage.conn.brpop(keys, timeout=self.storage.read_timeout)[
+                    1
+                ]
+            except (RedisConnectionError, TypeError, IndexError):
+                data = None
+        if data is not None:
+            return self.deserialize_task(data)
+        return None
+
+    def pending_count(self):
+        return sum(self.storage.conn.llen(self.get_queue_key(q)) for q in QUEUES)
@@ -0,0 +1,55 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import models
+from django.db.models import F
+
+# no stemming or stop words: descriptions, IPs, MACs are not natural language
+SEARCH_CONFIG = "simple"
+
+
+def search_document(*expressions) -> models.GeneratedField:
+    """A stored tsvector column, kept up to date by postgres (needs a GinIndex)
+
+    Generated columns only take immutable expressions, e.g. no timestamptz casts.
+    Left out of dumpdata and serializers, it's derived from the other fields.
+    """
+    return models.GeneratedField(
+        db_persist=True,
+        expression=SearchVector(*expressions, config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        serialize=False,
+    )
+
+
+class PrefixSearchQuery(SearchQuery):
+    """plainto_tsquery, with every word matched as a prefix ("192.16" or "lid")
+
+    The search term is split into words by postgres, the same way the
+    documents are, so the lexemes line up.
+    """
+
+    def __init__(self, value, **kwargs):
+        super().__init__(value, config=SEARCH_CONFIG, search_type="plain", **kwargs)
+
+    def as_sql(self, compiler, connection, function=None, template=None):
+        sql, params = super().as_sql(compiler, connection, function, template)
+        config_sql, config_params = compiler.compile(self.config)
+        return (
+            f"to_tsquery({config_sql}, "
+            f"regexp_replace(({sql})::text, '''( |$)', ''':*\\1', 'g'))",
+            [*config_params, *params],
+        )
+
+
+def search(queryset, term, field="search_document"):
+    """Filter on a search_document field, best matches first"""
+    query = PrefixSearchQuery(term)
+    return (
+        queryset.filter(**{field: query})
+        .annotate(rank=SearchRank(F(field), query))
+        .order_by("-rank", *queryset.query.order_by)
+    )
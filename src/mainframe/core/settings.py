@@ -27,6 +27,7 @@ env = environ.Env(
     CSRF_TRUSTED_ORIGINS=(list, []),
     DEBUG=(bool, False),
     EARTHQUAKE_DEFAULT_COORDINATES=list,
+    HUEY_QUEUES=(list, ["critical", "default", "batch"]),
 )
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -151,6 +152,9 @@ else:
 
 STATIC_URL = "/static/"
 
+# Uploaded files, kept until the background jobs importing them are done
+MEDIA_ROOT = env("MEDIA_ROOT", default=BASE_DIR / "media")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -303,6 +307,17 @@ DATABASES = {
         "PORT": env("DB_PORT"),
     }
 }
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "KEY_PREFIX": "cache",
+            "LOCATION": env("REDIS_URL"),
+        }
+        if env("REDIS_URL", default=None)
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
 if ENV in ["local", "prod", "rpi"]:
     if ENV == "rpi":
         LOGGING["handlers"]["json_file"] = {
@@ -349,7 +364,8 @@ elif ENV not in ["ci", "test"]:
 
 
 HUEY = {
-    "huey_class": "huey.RedisHuey",  # Huey's implementation to use.
+    "huey_class": "mainframe.core.queues.MainframeHuey",  # Huey implementation
+    "queues": env("HUEY_QUEUES"),  # Queues this consumer pulls from, by priority
     "results": True,  # Store return values of tasks.
     "store_none": False,  # If a task returns None, do not save to results.
     "immediate": False,  # If DEBUG=True, run synchronously.
@@ -369,7 +385,8 @@ HUEY = {
         "backoff": 1.15,  # Exponential backoff using this rate, -b.
         "max_delay": 10.0,  # Max possible polling interval, -m.
         "scheduler_interval": 1,  # Check schedule every second, -s.
-        "periodic": True,  # Enable crontab feature.
+        # Enable crontab feature - only on the consumer pulling the default queue
+        "periodic": "default" in env("HUEY_QUEUES"),
         "check_worker_health": True,  # Enable worker health checks.
         "health_check_interval": 1,  # Check worker health every second.
     },
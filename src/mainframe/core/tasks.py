@@ -2,6 +2,7 @@ import asyncio
 import json
 
 import structlog
+from django.apps import apps
 from django.conf import settings
 from django.db import close_old_connections
 from django.utils import timezone
@@ -10,42 +11,139 @@ from huey.contrib.djhuey import HUEY, periodic_task, task
 
 from mainframe.clients.chat import send_telegram_message
 from mainframe.clients.system import run_cmd
+from mainframe.core.metrics import queue_metrics, track_executing
+from mainframe.core.queues import (
+    QUEUE_BATCH,
+    QUEUE_CRITICAL,
+    QUEUE_DEFAULT,
+    SIGNAL_ENQUEUED,
+)
 
 logger = structlog.get_logger(__name__)
 
+CRON_QUEUES = {  # by command, the rest go to the default queue
+    "backup": QUEUE_BATCH,
+    "check_infp": QUEUE_CRITICAL,
+    "check_usgs": QUEUE_CRITICAL,
+    "import_transit_lines": QUEUE_BATCH,
+}
+ERRORS_SIZE = 30
+HISTORY_SIZE = 1000
+
 
 def get_redis_client():
     return HUEY.storage.redis_client.from_url(settings.HUEY["connection"]["url"])
 
 
+def get_status_keys(key) -> tuple[str, str]:
+    return f"tasks.{key}.history", f"tasks.{key}.errors"
+
+
 def log_status(key, error=None, **kwargs):
+    """Prepend an event (and the error, if any) to the task's capped lists
+
+    Both pushes and their trims go out in one MULTI/EXEC round trip, so
+    concurrent workers can't overwrite each other's events.
+    Returns the entries that were added.
+    """
+    with get_redis_client().pipeline() as pipe:
+        details = queue_status(pipe, key, error, **kwargs)
+        if details:
+            pipe.execute()
+    return details
+
+
+def queue_status(pipe, key, error=None, **kwargs) -> dict:
+    """Queue the log_status writes on a redis pipeline"""
     if not error and key in ["[earthquakes] INFP", "[earthquakes] USGS"]:
         return {}
 
     stamp = {"timestamp": timezone.now().isoformat()}
-    redis_client = get_redis_client()
-    key = f"tasks.{key}"
     new_event = {**stamp, **kwargs}
     errors = [{**stamp, "msg": error}] if error else []
 
-    details = json.loads(redis_client.get(key) or "{}")
-    if not details:
-        details = {"errors": errors, "history": [new_event]}
-    else:
-        if "errors" not in details:
-            details["errors"] = errors
-        else:
-            details["errors"] = [*errors, *details["errors"][:29]]
-        details["history"] = [new_event, *details["history"][:999]]
-    redis_client.set(key, json.dumps(details))
-    return details
+    history_key, errors_key = get_status_keys(key)
+    pipe.lpush(history_key, json.dumps(new_event))
+    pipe.ltrim(history_key, 0, HISTORY_SIZE - 1)
+    if errors:
+        pipe.lpush(errors_key, json.dumps(errors[0]))
+        pipe.ltrim(errors_key, 0, ERRORS_SIZE - 1)
+    return {"errors": errors, "history": [new_event]}
+
+
+def get_status(key, page=1, page_size=HISTORY_SIZE) -> dict:
+    """A page of the task's history (newest first) along with its latest errors"""
+    history_key, errors_key = get_status_keys(key)
+    start = (page - 1) * page_size
+    with get_redis_client().pipeline(transaction=False) as pipe:
+        pipe.lrange(history_key, start, start + page_size - 1)
+        pipe.lrange(errors_key, 0, ERRORS_SIZE - 1)
+        pipe.llen(history_key)
+        history, errors, count = pipe.execute()
+    if not (count or errors):
+        return {}
+    return {
+        "count": count,
+        "errors": [json.loads(entry) for entry in errors],
+        "history": [json.loads(entry) for entry in history],
+    }
+
+
+def get_latest_status(key) -> str | None:
+    """The status of the task's latest event having one
+
+    Progress events (counts, accuracy, operations) are logged without it.
+    """
+    history = get_status(key).get("history", [])
+    return next((event["status"] for event in history if "status" in event), None)
+
+
+def queue_summary(pipe, key) -> None:
+    """Queue the commands read back by parse_summary on a redis pipeline"""
+    history_key, errors_key = get_status_keys(key)
+    pipe.lindex(history_key, 0)
+    pipe.llen(history_key)
+    pipe.llen(errors_key)
+
+
+def parse_summary(latest, count, errors_count) -> dict:
+    """The latest event along with the history and errors counts"""
+    if not (count or errors_count):
+        return {}
+    return {
+        "count": count,
+        "errors_count": errors_count,
+        "history": [json.loads(latest)] if latest else [],
+    }
+
+
+def clear_status(key) -> int:
+    # tasks.{key} is where the history used to be stored as a single JSON blob
+    return get_redis_client().delete(*get_status_keys(key), f"tasks.{key}")
+
+
+def expire_status(key, timeout) -> None:
+    """Drop the task's history and errors after timeout seconds (one-off jobs)"""
+    with get_redis_client().pipeline() as pipe:
+        for status_key in get_status_keys(key):
+            pipe.expire(status_key, timeout)
+        pipe.execute()
 
 
 @HUEY.signal()
 def signal_handler(signal, t, exc=None):
+    with get_redis_client().pipeline() as pipe:
+        if signal != SIGNAL_ENQUEUED:
+            queue_status(
+                pipe, t.name, error=str(exc) if exc else None, id=t.id, status=signal
+            )
+        queue_metrics(pipe, signal, t)
+        results = pipe.execute()
+
     if signal == signals.SIGNAL_EXECUTING:
         close_old_connections()
-    log_status(key=t.name, error=str(exc) if exc else None, id=t.id, status=signal)
+        enqueued_at, _ = results[-2:]
+        track_executing(t, enqueued_at)
 
 
 @task(expires=10)
@@ -104,12 +202,18 @@ def schedule_deploy():
     return msg
 
 
-@task()
+# Periodic tasks are registered in the consumer running it, which has to be the
+# one running the scheduler, i.e. the one pulling from the default queue
+@task(queue=QUEUE_DEFAULT)
 def schedule_task(instance, **kwargs):
+    queue = QUEUE_DEFAULT
     if (class_name := instance.__class__.__qualname__) == "Cron":
         expression = instance.expression
+        queue = CRON_QUEUES.get(instance.command, QUEUE_DEFAULT)
     elif class_name == "Watcher":
-        expression = instance.cron
+        # watchers are no longer scheduled one by one, they're all run by
+        # watchers.tasks.run_watchers - only unschedule leftover registrations
+        expression = ""
     else:
         logger.error(
             "Unknown task class. Must be one of: Watcher, Cron",
@@ -129,10 +233,20 @@ def schedule_task(instance, **kwargs):
     if expression and instance.is_active:
         schedule = crontab(*expression.split())
         lock_task = HUEY.lock_task(f"{task_name}-lock")
-        lock_task(periodic_task(schedule, name=instance.name)(instance.run))
+        lock_task(
+            periodic_task(schedule, name=instance.name, queue=queue)(instance.run)
+        )
         logger.info(
             "Scheduled task",
             class_name=class_name,
             expression=expression,
             identifier=instance.name,
+            queue=queue,
         )
+
+
+@HUEY.on_reload()
+def register_crons():
+    """Crons routed to other queues are run by consumers which didn't schedule them"""
+    for cron in apps.get_model("crons", "Cron").objects.filter(is_active=True):
+        schedule_task.call_local(cron)
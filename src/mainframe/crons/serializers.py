@@ -1,5 +1,3 @@
-import json
-
 import redis
 import structlog
 from cron_descriptor import get_description
@@ -7,7 +5,7 @@ from crontab import CronTab
 from rest_framework import serializers
 
 from mainframe.core.serializers import ScheduleTaskIsRenamedSerializer
-from mainframe.core.tasks import get_redis_client
+from mainframe.core.tasks import get_status
 from mainframe.crons.models import Cron
 
 logger = structlog.get_logger(__name__)
@@ -38,7 +36,7 @@ class CronSerializer(ScheduleTaskIsRenamedSerializer):
     @staticmethod
     def get_redis(obj):
         try:
-            result = json.loads(get_redis_client().get(f"tasks.{obj.name}") or "{}")
+            result = get_status(obj.name)
         except (AttributeError, redis.exceptions.ConnectionError):
             logger.exception("Error in CronSerializer.get_redis", obj_name=obj.name)
             return {}
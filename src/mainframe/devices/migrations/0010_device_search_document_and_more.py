@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("devices", "0009_device_last_seen"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="device",
+            name="search_document",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    models.Func("ip", function="host", output_field=models.TextField()),
+                    "mac",
+                    "name",
+                    config="simple",
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                serialize=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="device",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="devices_dev_search__f3d3f0_gin"
+            ),
+        ),
+    ]
@@ -1,7 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import Func, TextField
 from django.utils import timezone
 
 from mainframe.core.models import TimeStampedModel
+from mainframe.core.search import search_document
 
 
 class Device(TimeStampedModel):
@@ -12,8 +15,14 @@ class Device(TimeStampedModel):
     last_seen = models.DateTimeField(default=timezone.now)
     mac = models.CharField(max_length=24, unique=True)
     name = models.CharField(blank=True, max_length=32)
+    search_document = search_document(
+        Func("ip", function="host", output_field=TextField()), "mac", "name"
+    )
     should_notify_presence = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [GinIndex(fields=["search_document"])]
+
     def __str__(self):
         return self.alias or self.name or self.ip or self.mac
 
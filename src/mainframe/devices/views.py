@@ -1,6 +1,5 @@
 import structlog
 from actstream.registry import registry
-from django.contrib.postgres.search import SearchVector
 from django.http import JsonResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -8,6 +7,7 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 
 from mainframe.clients.devices import DevicesClient, DevicesException
+from mainframe.core.search import search
 from mainframe.devices.models import Device
 from mainframe.devices.serializers import DeviceSerializer
 from mainframe.sources.models import Source
@@ -26,13 +26,10 @@ class DeviceViewSet(viewsets.ModelViewSet):
     serializer_class = DeviceSerializer
 
     def get_queryset(self):  # noqa: C901
-        queryset = super().get_queryset()
-        params = self.request.query_params
-        if search_term := params.get("search"):
-            queryset = queryset.annotate(
-                search=SearchVector("ip", "mac", "name"),
-            ).filter(search__icontains=search_term)
-        return queryset.order_by("-is_active", "alias", "name", "mac")
+        queryset = super().get_queryset().order_by("-is_active", "alias", "name", "mac")
+        if search_term := self.request.query_params.get("search"):
+            queryset = search(queryset, search_term)
+        return queryset
 
     @action(detail=False, methods=["put"])
     def sync(self, request, **kwargs):
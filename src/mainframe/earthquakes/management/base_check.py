@@ -4,15 +4,17 @@ from zoneinfo import ZoneInfo
 
 import structlog
 from django.conf import settings
+from django.core.cache import cache
 from telegram.constants import ParseMode
 
 from mainframe.bots.models import Bot
 from mainframe.clients import healthchecks
 from mainframe.clients.chat import send_telegram_message
-from mainframe.clients.scraper import fetch
+from mainframe.clients.scraper import NotModified, fetch, get_validators
 from mainframe.earthquakes.models import Earthquake
 
 DATETIME_FORMAT = "%d.%m.%Y, %H:%M:%S %z"
+VALIDATORS_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # once expired, it's a full download
 
 
 def get_magnitude_icon(magnitude):
@@ -51,8 +53,14 @@ class BaseEarthquakeCommand:
         response, error = fetch(
             self.url,
             soup=False,
+            validators=cache.get(self.validators_key),
             **self.get_kwargs(),
         )
+        if isinstance(error, NotModified):
+            instance = Bot.objects.get(additional_data__earthquake__isnull=False)
+            self.set_last_check(instance)
+            logger.info("No new events!")
+            return
         if error:
             if self.source == Earthquake.SOURCE_INFP:
                 logger.warning("Fetching INFP earthquakes failed", error=str(error))
@@ -64,6 +72,7 @@ class BaseEarthquakeCommand:
         events = [self.parse_earthquake(event) for event in self.fetch_events(response)]
         if not events:
             self.set_last_check(instance)
+            self.set_validators(response)
             logger.info("No new events!")
             return
 
@@ -103,6 +112,17 @@ class BaseEarthquakeCommand:
             )
 
         self.set_last_check(instance)
+        self.set_validators(response)
+
+    @property
+    def validators_key(self) -> str:
+        return f"earthquake-validators:{self.source}"
+
+    def set_validators(self, response):
+        """Cached once the events are saved and sent, failed runs fetch them again"""
+        cache.set(
+            self.validators_key, get_validators(response), VALIDATORS_CACHE_TIMEOUT
+        )
 
     def get_kwargs(self) -> dict:
         raise NotImplementedError
@@ -7,6 +7,7 @@ from django.core.management import BaseCommand
 from geopy.distance import geodesic
 from geopy.point import Point
 
+from mainframe.clients.scraper import class_strainer, make_soup
 from mainframe.earthquakes.management.base_check import BaseEarthquakeCommand
 from mainframe.earthquakes.models import Earthquake
 
@@ -21,8 +22,8 @@ class Command(BaseEarthquakeCommand, BaseCommand):
 
     @staticmethod
     def fetch_events(response):
-        soup = BeautifulSoup(response.text, features="html.parser")
-        return soup.html.body.find_all("div", {"class": "event-item"})
+        soup = make_soup(response.text, class_strainer("event-item", name="div"))
+        return soup.find_all("div", {"class": "event-item"})
 
     @staticmethod
     def get_datetime(string):
@@ -7,11 +7,13 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 from mainframe.bots.models import Bot
+from mainframe.core.pagination import KeysetPagination
 from mainframe.earthquakes.models import Earthquake
 from mainframe.earthquakes.serializers import EarthquakeSerializer
 
 
 class EarthquakeViewSet(viewsets.ModelViewSet):
+    pagination_class = KeysetPagination
     queryset = Earthquake.objects.order_by("-timestamp")
     serializer_class = EarthquakeSerializer
     permission_classes = (IsAuthenticated,)
@@ -1,7 +1,7 @@
 import structlog
 from django.core.management import BaseCommand, CommandError
 
-from mainframe.events.tasks import get_band_concerts
+from mainframe.events.tasks import get_bands_concerts
 from mainframe.sources.models import Source
 
 logger = structlog.get_logger(__name__)
@@ -13,8 +13,7 @@ class Command(BaseCommand):
             raise CommandError("No favorite bands found in the dabatase")
 
         logger.info(
-            "Deploying tasks to fetch concerts for all favorite bands...",
+            "Deploying task to fetch concerts for all favorite bands...",
             bands_count=len(bands),
         )
-        for band in bands:
-            get_band_concerts(band)
+        get_bands_concerts(bands)
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from zoneinfo import ZoneInfo
@@ -6,7 +7,7 @@ import structlog
 from django.conf import settings
 from huey.contrib.djhuey import task
 
-from mainframe.clients.scraper import fetch
+from mainframe.clients.scraper import fetch_many
 from mainframe.events.models import Event
 from mainframe.sources.models import Source
 
@@ -79,8 +80,7 @@ def validate_selectors(band, selectors):
         )
 
 
-@task(expires=10)
-def get_band_concerts(band: Source):
+def parse_band_concerts(band: Source, soup) -> list[Event]:
     selectors = band.config.get("selectors")
     validate_selectors(band, selectors)
 
@@ -100,11 +100,7 @@ def get_band_concerts(band: Source):
         return clean_date(result, date_format, band.config.get("missing_year"))
 
     concerts = []
-    response, error = fetch(band.url)
-    if error:
-        raise FetchBandError(error)
-
-    for concert in response.select(selectors["list"]):
+    for concert in soup.select(selectors["list"]):
         location = extract_text(concert, "location")
         if not (title := extract_text(concert, "title")):
             title = f"{band.name} @ {location}"
@@ -123,9 +119,25 @@ def get_band_concerts(band: Source):
                 external_id=extract_text(concert, "external_id"),
             )
         )
+    return concerts
+
 
-    if concerts:
+def handle_band_concerts(band: Source, soup):
+    if concerts := parse_band_concerts(band, soup):
         store_concerts(band.name, concerts)
         return
 
     logger.warning("No concerts found", band=band.name)
+
+
+@task(expires=60)
+def get_bands_concerts(bands: list[Source]):
+    for band, (response, error) in zip(
+        bands, asyncio.run(fetch_many([band.url for band in bands])), strict=True
+    ):
+        try:
+            if error:
+                raise FetchBandError(error)
+            handle_band_concerts(band, response)
+        except FetchBandError as e:
+            logger.error("Error fetching concerts", band=band.name, error=str(e))
@@ -1,12 +1,16 @@
+import asyncio
 import decimal
 from decimal import Decimal
 
 from bs4 import BeautifulSoup
 from defusedxml import ElementTree
+from django.core.cache import cache
 
-from mainframe.clients.scraper import fetch
+from mainframe.clients.scraper import NotModified, fetch, fetch_many, get_validators
 from mainframe.exchange.models import ExchangeRate
 
+VALIDATORS_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # once expired, it's a full download
+
 
 class FetchExchangeRatesException(Exception):
     pass
@@ -26,13 +30,40 @@ class BaseExchange:
             raise FetchExchangeRatesException("Error fetching exchange rates")
         return resp.content
 
-    def fetch(self, full):
-        urls = self.fetch_available_urls() if full else [self.url]
+    @staticmethod
+    def get_validators_key(url) -> str:
+        return f"exchange-validators:{url}"
 
-        rates = []
-        for url in urls[:2]:
-            self.logger.info("Fetching URL", url=url)
-            rates += self.parse(self.do_request(url))
+    def fetch(self, full):
+        """Save the rates from the first 2 urls, skipping the unchanged ones
+
+        The validators of the responses are only cached once their rates are
+        saved, so a failed run fetches them all again next time.
+        """
+        urls = (self.fetch_available_urls() if full else [self.url])[:2]
+        self.logger.info("Fetching URLs", urls=urls)
+        stored = cache.get_many(map(self.get_validators_key, urls))
+        responses = asyncio.run(
+            fetch_many(
+                [
+                    (url, {"validators": stored.get(self.get_validators_key(url))})
+                    for url in urls
+                ],
+                soup=False,
+                timeout=20,
+                retries=1,
+            )
+        )
+        rates, validators = [], {}
+        for url, (response, error) in zip(urls, responses, strict=True):
+            if isinstance(error, NotModified):
+                self.logger.info("Rates not modified", url=url)
+                continue
+            if error:
+                raise FetchExchangeRatesException("Error fetching exchange rates")
+            rates += self.parse(response.content)
+            if response_validators := get_validators(response):
+                validators[self.get_validators_key(url)] = response_validators
 
         self.logger.info(
             "Saving events in batches",
@@ -48,6 +79,7 @@ class BaseExchange:
             unique_fields=list(*ExchangeRate._meta.unique_together),
             batch_size=self.batch_size,
         )
+        cache.set_many(validators, VALIDATORS_CACHE_TIMEOUT)
         return len(rates)
 
     def fetch_available_urls(self) -> list[str]:
@@ -1,12 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.settings import api_settings
 
+from mainframe.core.pagination import KeysetPagination
 from mainframe.exchange.models import ExchangeRate
 from mainframe.exchange.serializers import ExchangeRateSerializer
 
 
-class ExchangePagination(api_settings.DEFAULT_PAGINATION_CLASS):
+class ExchangePagination(KeysetPagination):
     page_size = 31
 
 
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from mainframe.finance.models import Account, Category, Credit, Payment, Timetable
+from mainframe.finance.models import (
+    Account,
+    Category,
+    CategoryRule,
+    Credit,
+    Payment,
+    StatementImport,
+    Timetable,
+)
 
 
 @admin.register(Account)
@@ -13,6 +21,12 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = "id", "verbose"
 
 
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+    list_display = "pattern", "category", "type", "priority", "updated_at"
+    search_fields = ("pattern",)
+
+
 @admin.register(Credit)
 class CreditAdmin(admin.ModelAdmin):
     list_display = "account", "currency", "total", "created_at", "updated_at"
@@ -30,6 +44,11 @@ class PaymentAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(StatementImport)
+class StatementImportAdmin(admin.ModelAdmin):
+    list_display = "name", "transaction_count", "skipped_count", "created_at"
+
+
 @admin.register(Timetable)
 class TimetableAdmin(admin.ModelAdmin):
     list_display = (
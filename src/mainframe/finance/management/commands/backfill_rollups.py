@@ -0,0 +1,32 @@
+import structlog
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from mainframe.finance.models import (
+    MonthlyRollup,
+    Transaction,
+    get_rollup_ranges,
+    refresh_rollups,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly rollups of the expenses from the transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, help="Only this account's")
+
+    def handle(self, *_, **options):
+        logger = structlog.get_logger(__name__)
+        transactions, rollups = Transaction.objects.all(), MonthlyRollup.objects.all()
+        if account_id := options["account"]:
+            transactions = transactions.filter(account_id=account_id)
+            rollups = rollups.filter(account_id=account_id)
+
+        with atomic():
+            rollups.delete()
+            ranges = get_rollup_ranges(transactions)
+            refresh_rollups(ranges)
+
+        logger.info("Rollups backfilled", accounts=len(ranges), rollups=rollups.count())
+        self.stdout.write(self.style.SUCCESS("Done"))
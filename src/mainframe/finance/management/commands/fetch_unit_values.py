@@ -2,18 +2,18 @@ import json
 from datetime import datetime
 
 import structlog
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from django.core.management.base import BaseCommand, CommandError
 
 from mainframe.clients import healthchecks
-from mainframe.clients.scraper import fetch
+from mainframe.clients.scraper import fetch, make_soup
 from mainframe.finance.models import Pension, UnitValue
 
 logger = structlog.get_logger(__name__)
 
 
 def extract_azt(response, pensions):
-    soup = BeautifulSoup(response.content, "html.parser")
+    soup = make_soup(response.content, SoupStrainer("tr"))
     rows = [r for r in soup.find_all("tr")[4:] if r.text.strip()]
     date_row = soup.find("td", text="Evolutie Fonduri de Pensii raportate la data de:")
     date = date_row.find_next_sibling("td").text.strip()
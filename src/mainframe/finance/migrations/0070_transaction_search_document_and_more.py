@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0069_remove_pension_total_units"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="search_document",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "description",
+                    "additional_data",
+                    "amount",
+                    "type",
+                    django.db.models.functions.text.Concat(
+                        django.db.models.functions.text.LPad(
+                            django.db.models.functions.comparison.Cast(
+                                models.Func(
+                                    "started_at",
+                                    output_field=models.IntegerField(),
+                                    part="YEAR",
+                                    template="EXTRACT(%(part)s FROM %(expressions)s AT TIME ZONE 'UTC')",
+                                ),
+                                models.TextField(),
+                            ),
+                            4,
+                            models.Value("0"),
+                        ),
+                        models.Value("-"),
+                        django.db.models.functions.text.LPad(
+                            django.db.models.functions.comparison.Cast(
+                                models.Func(
+                                    "started_at",
+                                    output_field=models.IntegerField(),
+                                    part="MONTH",
+                                    template="EXTRACT(%(part)s FROM %(expressions)s AT TIME ZONE 'UTC')",
+                                ),
+                                models.TextField(),
+                            ),
+                            2,
+                            models.Value("0"),
+                        ),
+                        models.Value("-"),
+                        django.db.models.functions.text.LPad(
+                            django.db.models.functions.comparison.Cast(
+                                models.Func(
+                                    "started_at",
+                                    output_field=models.IntegerField(),
+                                    part="DAY",
+                                    template="EXTRACT(%(part)s FROM %(expressions)s AT TIME ZONE 'UTC')",
+                                ),
+                                models.TextField(),
+                            ),
+                            2,
+                            models.Value("0"),
+                        ),
+                        output_field=models.TextField(),
+                    ),
+                    config="simple",
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                serialize=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_document"], name="finance_tra_search__09a0fd_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0070_transaction_search_document_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["-started_at", "-id"], name="transaction_started_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["account", "-started_at"], name="transaction_account_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("amount__lt", 0)),
+                fields=["account", "started_at"],
+                include=("amount", "category"),
+                name="transaction_expenses_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("amount__lt", 0)),
+                fields=["category", "confirmed_by"],
+                name="transaction_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(
+                    ("amount__lt", 0), ("category", "Unidentified"), ("confirmed_by", 0)
+                ),
+                fields=["description"],
+                name="transaction_unidentified_idx",
+            ),
+        ),
+    ]
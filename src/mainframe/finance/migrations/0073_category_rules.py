@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0072_statementimport"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="confirmed_by",
+            field=models.SmallIntegerField(
+                choices=[(0, "Unconfirmed"), (1, "Human"), (2, "ML"), (3, "Rule")],
+                default=0,
+            ),
+        ),
+        migrations.CreateModel(
+            name="CategoryRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("pattern", models.CharField(max_length=256, unique=True)),
+                ("priority", models.SmallIntegerField(default=0)),
+                (
+                    "type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("ATM", "ATM"),
+                            ("CARD_CHARGEBACK", "Card chargeback"),
+                            ("CARD_CREDIT", "Card credit"),
+                            ("CARD_PAYMENT", "Card payment"),
+                            ("CARD_REFUND", "Card refund"),
+                            ("CASHBACK", "Cashback"),
+                            ("EXCHANGE", "Exchange"),
+                            ("FEE", "Fee"),
+                            ("TOPUP", "Topup"),
+                            ("TRANSFER", "Transfer"),
+                            ("UNIDENTIFIED", "Unidentified"),
+                        ],
+                        default="",
+                        max_length=15,
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rules",
+                        to="finance.category",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-priority", "pattern"],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            ("category__isnull", False),
+                            models.Q(("type", ""), _negated=True),
+                            _connector="OR",
+                        ),
+                        name="category_rule_category_or_type",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:12
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_rollups(apps, _):
+    MonthlyRollup = apps.get_model("finance", "MonthlyRollup")
+    Transaction = apps.get_model("finance", "Transaction")
+    rows = (
+        Transaction.objects.filter(amount__lt=0)
+        .annotate(month=TruncMonth("started_at", output_field=models.DateField()))
+        .values("account_id", "month", "category_id", "currency")
+        .annotate(amount=models.Sum("amount"), count=models.Count("id"))
+        .order_by()
+    )
+    MonthlyRollup.objects.all().delete()
+    MonthlyRollup.objects.bulk_create(
+        (MonthlyRollup(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("finance", "0074_monthly_rollups"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_monthly_rollups, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,186 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+
+from django.contrib.postgres.indexes import GinIndex
+from django.core.cache import cache
 from django.db import models
+from django.db.models import (
+    Count,
+    DateField,
+    Func,
+    IntegerField,
+    Max,
+    Min,
+    Q,
+    Sum,
+    TextField,
+    Value,
+    signals,
+)
+from django.db.models.functions import Cast, Concat, LPad, Now, TruncMonth
+from django.db.transaction import atomic, on_commit
+from django.dispatch import receiver
+from django.utils import timezone
 
 from mainframe.core.models import TimeStampedModel
-from mainframe.finance.models import DECIMAL_DEFAULT_KWARGS, NULLABLE_KWARGS
+from mainframe.core.search import search_document
+from mainframe.finance.models import (
+    DECIMAL_DEFAULT_KWARGS,
+    NULLABLE_KWARGS,
+    Account,
+)
+
+CATEGORIZE_BATCH_SIZE = 1000
+FILTERS_CACHE_KEY = "finance.transactions.filters"
+# writing these means the monthly rollups of the transactions need a refresh
+ROLLUP_FIELDS = {
+    "account",
+    "account_id",
+    "amount",
+    "category",
+    "category_id",
+    "currency",
+    "started_at",
+}
+# and these that the transactions can end up in other rollups
+ROLLUP_KEY_FIELDS = {"account", "account_id", "started_at"}
+
+pending_rollups = ContextVar("pending_rollups", default=None)
+
+
+def started_on():
+    """started_at as YYYY-MM-DD in UTC, casting a timestamptz isn't immutable"""
+
+    def part(name, length):
+        extract = Func(
+            "started_at",
+            output_field=IntegerField(),
+            part=name,
+            template="EXTRACT(%(part)s FROM %(expressions)s AT TIME ZONE 'UTC')",
+        )
+        return LPad(
+            Cast(extract, TextField()),
+            length,
+            Value("0"),
+        )
+
+    return Concat(
+        part("YEAR", 4),
+        Value("-"),
+        part("MONTH", 2),
+        Value("-"),
+        part("DAY", 2),
+        output_field=TextField(),
+    )
+
+
+def clear_filters_cache():
+    """Drop the cached transaction filters, once the current transaction commits"""
+    on_commit(lambda: cache.delete(FILTERS_CACHE_KEY))
+
+
+def get_month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.get_current_timezone())
+
+
+def get_next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def get_rollup_ranges(queryset) -> dict[int, tuple[date, date]]:
+    """The first and last month of the transactions, by account
+
+    Months are in the current timezone, same as started_in and TruncMonth.
+    """
+    return {
+        row["account_id"]: tuple(
+            timezone.localtime(row[key]).date().replace(day=1)
+            for key in ("first", "last")
+        )
+        for row in queryset.order_by()
+        .values("account_id")
+        .annotate(first=Min("started_at"), last=Max("started_at"))
+    }
+
+
+def merge_ranges(*ranges: dict) -> dict[int, tuple[date, date]]:
+    merged = {}
+    for account_ranges in ranges:
+        for account_id, (first, last) in account_ranges.items():
+            start, end = merged.get(account_id, (first, last))
+            merged[account_id] = min(first, start), max(last, end)
+    return merged
+
+
+@contextmanager
+def deferred_rollups():
+    """Refresh the rollups once on exit, instead of after each write inside
+
+    e.g. the batches of an import, or the updates of every category.
+    """
+    if pending_rollups.get() is not None:  # nested, the outer one refreshes
+        yield
+        return
+    token = pending_rollups.set({})
+    try:
+        yield
+        ranges = pending_rollups.get()
+    finally:
+        pending_rollups.reset(token)
+    refresh_rollups(ranges)
+
+
+def refresh_rollups(ranges: dict[int, tuple[date, date]]):
+    """Recompute the rollups of each account between its first and last month
+
+    The months are summed up again from the expenses, so it works the same
+    after any write to them - creates, updates or deletes. The accounts are
+    locked meanwhile, so concurrent refreshes of one of them run one by one
+    instead of inserting the same rollups twice.
+    """
+    if not ranges:
+        return
+    if (pending := pending_rollups.get()) is not None:
+        pending.update(merge_ranges(pending, ranges))
+        return
+    with atomic():
+        list(
+            Account.objects.select_for_update()
+            .filter(id__in=ranges)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        rollups = []
+        for account_id, (first, last) in ranges.items():
+            MonthlyRollup.objects.filter(
+                account_id=account_id, month__range=(first, last)
+            ).delete()
+            rollups.extend(
+                MonthlyRollup(account_id=account_id, **row)
+                for row in Transaction.objects.expenses()
+                .filter(
+                    account_id=account_id,
+                    started_at__gte=get_month_start(first),
+                    started_at__lt=get_month_start(get_next_month(last)),
+                )
+                .annotate(month=TruncMonth("started_at", output_field=DateField()))
+                .values("month", "category_id", "currency")
+                .annotate(amount=Sum("amount"), count=Count("id"))
+                .order_by()
+            )
+        MonthlyRollup.objects.bulk_create(rollups)
+
+
+def group_by_value(items: dict):
+    """(value, keys) pairs, the keys with the same value in batches"""
+    grouped = defaultdict(list)
+    for key, value in items.items():
+        grouped[value].append(key)
+    for value, keys in grouped.items():
+        for i in range(0, len(keys), CATEGORIZE_BATCH_SIZE):
+            yield value, keys[i : i + CATEGORIZE_BATCH_SIZE]
 
 
 class Category(TimeStampedModel):
@@ -18,19 +197,131 @@ class Category(TimeStampedModel):
 
 
 class TransactionQuerySet(models.QuerySet):
+    """Clears the cached filters and refreshes the monthly rollups on bulk
+    writes too, since those send no signals
+
+    update() also sets updated_at, like save() does, so incremental training
+    can pick up the transactions confirmed in bulk since its checkpoint.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        result = super().bulk_create(objs, *args, **kwargs)
+        if ids := [obj.pk for obj in result if obj.pk is not None]:
+            refresh_rollups(get_rollup_ranges(self.model.objects.filter(id__in=ids)))
+        clear_filters_cache()
+        return result
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if ROLLUP_FIELDS.isdisjoint(fields):
+            result = super().bulk_update(objs, fields, *args, **kwargs)
+        else:
+            queryset = self.model.objects.filter(id__in=[obj.pk for obj in objs])
+            ranges = get_rollup_ranges(queryset)
+            result = super().bulk_update(objs, fields, *args, **kwargs)
+            refresh_rollups(merge_ranges(ranges, get_rollup_ranges(queryset)))
+        clear_filters_cache()
+        return result
+
+    def categorize(
+        self, categories: dict[str, str], confirmed_by=None
+    ) -> dict[str, int]:
+        """Set the category of the unidentified expenses, by description
+
+        One UPDATE per category, instead of one per description.
+        Returns the number of transactions updated for each category.
+        """
+        if confirmed_by is None:
+            confirmed_by = Transaction.CONFIRMED_BY_ML
+        counts = Counter()
+        with deferred_rollups():
+            for category, descriptions in group_by_value(categories):
+                counts[category] += (
+                    self.unidentified()
+                    .filter(description__in=descriptions)
+                    .update(
+                        category=category,
+                        category_suggestion_id=None,
+                        confirmed_by=confirmed_by,
+                    )
+                )
+        return dict(counts)
+
+    def delete(self):
+        ranges = get_rollup_ranges(self)
+        result = super().delete()
+        refresh_rollups(ranges)
+        clear_filters_cache()
+        return result
+
     def expenses(self):
         return self.filter(amount__lt=0)
 
+    def suggest(self, suggestions: dict[str, str]) -> dict[str, int]:
+        """Set the suggested category of the unidentified expenses, by description
+
+        Same as categorize, one UPDATE per category, leaving them unconfirmed.
+        """
+        counts = Counter()
+        for category, descriptions in group_by_value(suggestions):
+            counts[category] += (
+                self.unidentified()
+                .filter(description__in=descriptions)
+                .update(category_suggestion_id=category)
+            )
+        return dict(counts)
+
+    def unidentified(self):
+        """The expenses left in the Unidentified category, not confirmed yet"""
+        return self.expenses().filter(
+            category=Category.UNIDENTIFIED,
+            confirmed_by=Transaction.CONFIRMED_BY_UNCONFIRMED,
+        )
+
+    def started_in(self, year: int, month: int | None = None):
+        """started_at__year / __month as a range, so it can use the indexes
+
+        Same as those lookups, the boundaries are in the current timezone.
+        """
+        tz = timezone.get_current_timezone()
+        if month is None:
+            start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+        else:
+            start = datetime(year, month, 1)
+            end = datetime(year + month // 12, month % 12 + 1, 1)
+        return self.filter(
+            started_at__gte=start.replace(tzinfo=tz),
+            started_at__lt=end.replace(tzinfo=tz),
+        )
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", Now())
+        if ROLLUP_FIELDS.isdisjoint(kwargs):
+            result = super().update(**kwargs)
+        elif ROLLUP_KEY_FIELDS.isdisjoint(kwargs):
+            ranges = get_rollup_ranges(self)
+            result = super().update(**kwargs)
+            refresh_rollups(ranges)
+        else:  # the filters might not match them after the update
+            ids = list(self.values_list("id", flat=True))
+            queryset = self.model.objects.filter(id__in=ids)
+            ranges = get_rollup_ranges(queryset)
+            result = super().update(**kwargs)
+            refresh_rollups(merge_ranges(ranges, get_rollup_ranges(queryset)))
+        clear_filters_cache()
+        return result
+
 
 class Transaction(TimeStampedModel):
     CONFIRMED_BY_UNCONFIRMED = 0
     CONFIRMED_BY_HUMAN = 1
     CONFIRMED_BY_ML = 2
+    CONFIRMED_BY_RULE = 3
 
     CONFIRMED_BY_CHOICES = (
         (CONFIRMED_BY_UNCONFIRMED, "Unconfirmed"),
         (CONFIRMED_BY_HUMAN, "Human"),
         (CONFIRMED_BY_ML, "ML"),
+        (CONFIRMED_BY_RULE, "Rule"),
     )
 
     PRODUCT_CURRENT = "Current"
@@ -106,14 +397,177 @@ class Transaction(TimeStampedModel):
         max_length=15,
     )
 
+    search_document = search_document(
+        "description", "additional_data", "amount", "type", started_on()
+    )
+
     objects = TransactionQuerySet.as_manager()
 
     class Meta:
+        indexes = [
+            GinIndex(fields=["search_document"]),
+            # the transactions list, newest first - also by account
+            models.Index(fields=["-started_at", "-id"], name="transaction_started_idx"),
+            models.Index(
+                fields=["account", "-started_at"], name="transaction_account_idx"
+            ),
+            # account expenses per month and category
+            models.Index(
+                condition=Q(amount__lt=0),
+                fields=["account", "started_at"],
+                include=["amount", "category"],
+                name="transaction_expenses_idx",
+            ),
+            # expenses by category (list filters, training data)
+            models.Index(
+                condition=Q(amount__lt=0),
+                fields=["category", "confirmed_by"],
+                name="transaction_category_idx",
+            ),
+            # unidentified expenses to predict, bulk update or count
+            models.Index(
+                condition=Q(
+                    amount__lt=0,
+                    category=Category.UNIDENTIFIED,
+                    confirmed_by=0,  # CONFIRMED_BY_UNCONFIRMED
+                ),
+                fields=["description"],
+                name="transaction_unidentified_idx",
+            ),
+        ]
         ordering = ["-completed_at"]
 
+    def delete(self, *args, **kwargs):
+        ranges = get_rollup_ranges(Transaction.objects.filter(pk=self.pk))
+        result = super().delete(*args, **kwargs)
+        refresh_rollups(ranges)
+        clear_filters_cache()
+        return result
+
+    def save(self, *args, **kwargs):
+        """Refreshes the monthly rollups the transaction was in, and is in now"""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and ROLLUP_FIELDS.isdisjoint(update_fields):
+            return super().save(*args, **kwargs)
+        ranges = (
+            {}
+            if self._state.adding
+            else get_rollup_ranges(Transaction.objects.filter(pk=self.pk))
+        )
+        result = super().save(*args, **kwargs)
+        refresh_rollups(
+            merge_ranges(
+                ranges, get_rollup_ranges(Transaction.objects.filter(pk=self.pk))
+            )
+        )
+        return result
+
     def __str__(self):
         return (
             f"{self.started_at} - {self.description} - {self.get_type_display()} - "
             f"{self.amount} {self.currency} "
             f"{f'- {self.completed_at}' if self.completed_at else self.state}"
         )
+
+
+class MonthlyRollup(models.Model):
+    """The expenses of an account in a month, by category and currency
+
+    Derived from the transactions: their writes refresh the months they touch
+    (see refresh_rollups), the backfill_rollups command rebuilds all of them.
+    """
+
+    account = models.ForeignKey("finance.Account", on_delete=models.CASCADE)
+    amount = models.DecimalField(decimal_places=2, max_digits=12)  # a sum
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField()
+    currency = models.CharField(max_length=3)
+    month = models.DateField()  # the first day of it
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "month", "category", "currency"],
+                name="monthly_rollup_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.account_id} - {self.month:%Y-%m} - {self.category_id} - "
+            f"{self.amount} {self.currency}"
+        )
+
+
+class CategoryRule(TimeStampedModel):
+    """Transactions with the pattern in their description get its category / type
+
+    Applied on import and before predicting, so the model only gets the
+    descriptions no rule covers. See mainframe.finance.rules
+    """
+
+    category = models.ForeignKey(
+        Category,
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="rules",
+    )
+    pattern = models.CharField(max_length=256, unique=True)  # case insensitive
+    priority = models.SmallIntegerField(default=0)  # the highest one wins
+    type = models.CharField(
+        blank=True,
+        choices=Transaction.TYPE_CHOICES,
+        default="",
+        max_length=15,
+    )
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(category__isnull=False) | ~Q(type=""),
+                name="category_rule_category_or_type",
+            ),
+        ]
+        ordering = ["-priority", "pattern"]
+
+    def __str__(self):
+        return f"{self.pattern} - {self.category_id or '-'} - {self.type or '-'}"
+
+
+class StatementImport(TimeStampedModel):
+    """An imported statement file, so it isn't imported twice"""
+
+    fingerprint = models.CharField(max_length=64, unique=True)  # sha256
+    name = models.CharField(max_length=255)
+    skipped_count = models.PositiveIntegerField(default=0)
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} - {self.transaction_count} transactions"
+
+
+@receiver(signals.pre_delete, sender=Category)
+def pre_category_delete(sender, instance, **kwargs):  # noqa: F841
+    # its transactions are moved to Unidentified by an UPDATE sent directly,
+    # which doesn't refresh their rollups
+    instance.rollup_ranges = get_rollup_ranges(
+        Transaction.objects.filter(category=instance)
+    )
+
+
+@receiver(signals.post_delete, sender=Category)
+def post_category_delete(sender, instance, **kwargs):  # noqa: F841
+    refresh_rollups(getattr(instance, "rollup_ranges", {}))
+
+
+@receiver(signals.post_delete, sender="finance.Account")
+@receiver(signals.post_delete, sender=Category)
+@receiver(signals.post_save, sender="finance.Account")
+@receiver(signals.post_save, sender=Category)
+@receiver(signals.post_save, sender=Transaction)
+def post_change(sender, **kwargs):  # noqa: F841
+    # transaction deletes clear it in Transaction.delete and
+    # TransactionQuerySet.delete (accounts' cascade here), not listening to them
+    # keeps those fast deletes
+    clear_filters_cache()
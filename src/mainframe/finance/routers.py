@@ -2,7 +2,7 @@ from rest_framework import routers
 
 from mainframe.finance.viewsets.account import AccountViewSet
 from mainframe.finance.viewsets.bonds import BondsViewSet
-from mainframe.finance.viewsets.category import CategoryViewSet
+from mainframe.finance.viewsets.category import CategoryRuleViewSet, CategoryViewSet
 from mainframe.finance.viewsets.credit import CreditViewSet
 from mainframe.finance.viewsets.crypto import CryptoViewSet
 from mainframe.finance.viewsets.deposits import DepositsViewSet
@@ -13,12 +13,14 @@ from mainframe.finance.viewsets.prediction import PredictionViewSet
 from mainframe.finance.viewsets.stocks import StocksViewSet
 from mainframe.finance.viewsets.timetable import TimetableViewSet
 from mainframe.finance.viewsets.transaction import TransactionViewSet
+from mainframe.finance.viewsets.upload import UploadViewSet
 
 router = routers.SimpleRouter()
 
 router.register("accounts", AccountViewSet, basename="accounts")
 router.register("bonds", BondsViewSet, basename="bonds")
 router.register("categories", CategoryViewSet, basename="categories")
+router.register("category-rules", CategoryRuleViewSet, basename="category-rules")
 router.register("credit", CreditViewSet, basename="credit")
 router.register("crypto", CryptoViewSet, basename="crypto")
 router.register("deposits", DepositsViewSet, basename="deposits")
@@ -29,6 +31,7 @@ router.register("prediction", PredictionViewSet, basename="prediction")
 router.register("stocks", StocksViewSet, basename="stocks")
 router.register("timetables", TimetableViewSet, basename="timetables")
 router.register("transactions", TransactionViewSet, basename="transactions")
+router.register("uploads", UploadViewSet, basename="uploads")
 
 
 urlpatterns = router.urls
@@ -0,0 +1,97 @@
+import re
+from itertools import groupby
+from operator import attrgetter
+from threading import Lock
+
+from django.db.models import Count, Max
+
+from mainframe.finance.models import CategoryRule, Transaction
+
+
+class RuleIndex:
+    """The category rules compiled into a case insensitive regex per priority
+
+    One pass over a description per priority finds the rule to apply, instead
+    of checking every pattern separately. The highest priority with a match
+    wins, wherever it is in the description; between rules of the same
+    priority, the first match wins, then the longest pattern.
+    """
+
+    def __init__(self, rules):
+        self.tiers = []
+        rules = sorted(rules, key=lambda r: (-r.priority, -len(r.pattern)))
+        for _, group in groupby(rules, key=attrgetter("priority")):
+            tier = list(group)
+            regex = re.compile(
+                "|".join(f"({re.escape(rule.pattern)})" for rule in tier),
+                re.IGNORECASE,
+            )
+            self.tiers.append((regex, tier))
+
+    def match(self, description) -> CategoryRule | None:
+        for regex, rules in self.tiers:
+            if match := regex.search(description):
+                return rules[match.lastindex - 1]
+        return None
+
+    def categories(self, descriptions) -> dict[str, str]:
+        """The category of each description covered by a rule, by description"""
+        return {
+            description: rule.category_id
+            for description in descriptions
+            if (rule := self.match(description)) and rule.category_id
+        }
+
+    def apply(self, transactions: list[Transaction]) -> int:
+        """Set the category and / or type of the matching (unsaved) transactions
+
+        Returns how many of them matched.
+        """
+        matched = 0
+        for transaction in transactions:
+            if not (rule := self.match(transaction.description)):
+                continue
+            matched += 1
+            if rule.category_id:
+                transaction.category_id = rule.category_id
+                transaction.confirmed_by = Transaction.CONFIRMED_BY_RULE
+            if rule.type:
+                transaction.type = rule.type
+        return matched
+
+
+class RuleCache:
+    """The index of the current rules, compiled again only after they change
+
+    Kept in memory per process: checking the version of the rules is one
+    aggregate query, compiling them takes a lot longer than that.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.lock = Lock()
+        self.version = None
+
+    @staticmethod
+    def get_version() -> tuple:
+        # deletes change the count, edits and additions the latest updated_at
+        return tuple(
+            CategoryRule.objects.aggregate(
+                count=Count("id"), updated_at=Max("updated_at")
+            ).values()
+        )
+
+    def get(self) -> RuleIndex:
+        version = self.get_version()
+        with self.lock:
+            if self.index is None or version != self.version:
+                self.index = RuleIndex(CategoryRule.objects.all())
+                self.version = version
+            return self.index
+
+    def clear(self):
+        with self.lock:
+            self.index = self.version = None
+
+
+rules = RuleCache()
@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from mainframe.finance.models import (
     Category,
+    CategoryRule,
     Credit,
     Payment,
     Timetable,
@@ -18,6 +19,19 @@ class CategorySerializer(serializers.ModelSerializer):
     verbose = serializers.ReadOnlyField()
 
 
+class CategoryRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CategoryRule
+        fields = "__all__"
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        category = attrs.get("category", getattr(self.instance, "category", None))
+        if not category and not attrs.get("type", getattr(self.instance, "type", "")):
+            raise serializers.ValidationError("A category or a type is required")
+        return attrs
+
+
 class CreditSerializer(serializers.ModelSerializer):
     class Meta:
         model = Credit
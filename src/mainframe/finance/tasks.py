@@ -1,11 +1,13 @@
 import structlog
 from django.conf import settings
 from django.core.management import call_command
-from huey.contrib.djhuey import db_task
+from huey.contrib.djhuey import HUEY, db_task, on_startup
 from huey.signals import SIGNAL_ERROR
 
+from mainframe.core.queues import QUEUE_BATCH
 from mainframe.core.tasks import log_status
 from mainframe.finance.models import Category, Transaction
+from mainframe.finance.rules import rules
 
 logger = structlog.get_logger(__name__)
 
@@ -17,55 +19,85 @@ def backup_finance_model(model):
     logger.warning("Attempted to backup in local env", model=model)
 
 
-@db_task(expires=30)
+@db_task(expires=30, queue=QUEUE_BATCH)
 def backup_finance(model):
     call_command("backup", app="finance", model=model)
 
 
-@db_task()
-def predict(queryset, logger):
-    import pandas as pd
+@db_task(queue=QUEUE_BATCH)
+def process_upload(job_id, kind, path, name):
+    from mainframe.finance.uploads import run_upload
+
+    return run_upload(job_id, kind, path, name)
+
+
+@on_startup()
+def warm_up_models():
+    """Load the prediction model before the first task, on the batch consumers"""
+    if QUEUE_BATCH not in HUEY.queues:
+        return
+
+    from mainframe.clients.prediction import registry
+
+    try:
+        registry.warm_up()
+    except Exception:
+        logger.exception("Could not warm up the prediction models")
+
 
+@db_task(queue=QUEUE_BATCH)
+def predict(descriptions, logger):
+    """Suggest a category for each distinct description of the unidentified expenses
+
+    The descriptions covered by the category rules are categorized by them,
+    the model only predicts the rest. Every description is predicted once,
+    then the suggestions are written with one UPDATE per category.
+    """
     from mainframe.clients.prediction import SKLearn
 
-    total = queryset.count()
-
-    predictions = SKLearn.predict(pd.DataFrame(queryset))  # noqa: F821
-    transactions = []
-    for i, (item, category) in enumerate(zip(queryset, predictions, strict=False)):
-        transactions.append(Transaction(id=item["id"], category_suggestion_id=category))
-        if i and not i % 1000:
-            progress = i / total * 100
-            log_status(
-                "predict",
-                operation="2/3 mapping predictions",
-                progress=f"{progress / 2:.2f}",
-            )
-
-    logger.info("Bulk updating transactions", count=len(transactions))
-    log_status("predict", operation="3/3 saving to db", progress=70)
-    Transaction.objects.bulk_update(
-        transactions,
-        fields=("category_suggestion_id",),
-        batch_size=1000,
+    categories = rules.get().categories(descriptions)
+    logger.info("Applying rules", descriptions=len(categories))
+    categorized = Transaction.objects.categorize(
+        categories, confirmed_by=Transaction.CONFIRMED_BY_RULE
     )
+
+    log_status("predict", operation="1/2 predicting", progress=0)
+    descriptions = [d for d in descriptions if d not in categories]
+    predictions = SKLearn.predict(descriptions) if descriptions else []
+    suggestions = dict(zip(descriptions, map(str, predictions), strict=True))
+
+    logger.info("Updating suggestions", descriptions=len(suggestions))
+    log_status("predict", operation="2/2 saving to db", progress=50)
+    counts = Transaction.objects.suggest(suggestions)
     log_status("predict", operation=None, progress=100)
-    logger.info("Done.")
-    return transactions
+    logger.info("Done.", categorized=categorized, counts=counts)
+    return counts
 
 
-@db_task(expires=10)
-def train(logger):
-    import pandas as pd
+@db_task(expires=10, queue=QUEUE_BATCH)
+def train(logger, incremental=False):
+    """Train the categoriser on the confirmed expenses
 
+    incremental: only learn from those confirmed since the last incremental
+    run, instead of refitting on all of them
+    """
     from mainframe.clients.prediction import SKLearn
 
     qs = (
         Transaction.objects.expenses()
         .filter(confirmed_by=Transaction.CONFIRMED_BY_ML)
         .exclude(category=Category.UNIDENTIFIED)
-        .values("description", "category")
     )
+    if incremental:
+        logger.info("Training incrementally on confirmed transactions")
+        classes = Category.objects.exclude(id=Category.UNIDENTIFIED)
+        return SKLearn.train_incremental(
+            qs, sorted(classes.values_list("id", flat=True)), logger
+        )
+
+    import pandas as pd
+
+    qs = qs.values("description", "category")
     count = qs.count()
     if not count:
         log_status("train", status=SIGNAL_ERROR, error="No trained data")
@@ -0,0 +1,119 @@
+from uuid import uuid4
+
+import structlog
+from django.core.files import File
+from django.core.files.storage import default_storage
+from huey.signals import SIGNAL_COMPLETE, SIGNAL_ERROR, SIGNAL_EXECUTING
+
+from mainframe.clients.finance.crypto import (
+    CryptoImportError,
+    CryptoPnLImporter,
+    CryptoTransactionsImporter,
+)
+from mainframe.clients.finance.payment import PaymentImportError, PaymentsImporter
+from mainframe.clients.finance.statement import StatementImportError, import_statement
+from mainframe.clients.finance.stocks import (
+    StockImportError,
+    StockPnLImporter,
+    StockTransactionsImporter,
+)
+from mainframe.clients.finance.timetable import TimetableImportError, import_timetable
+from mainframe.core.tasks import expire_status, log_status
+from mainframe.finance.tasks import process_upload
+
+UPLOADS_DIR = "uploads"
+UPLOAD_STATUS_TTL = 60 * 60 * 24  # the status of finished jobs, in seconds
+
+
+def get_upload_key(job_id) -> str:
+    return f"upload.{job_id}"
+
+
+def run_importer(importer_class):
+    def run(file, logger, progress):
+        return importer_class(file, logger).run()
+
+    return run
+
+
+def run_statement_import(file, logger, progress):
+    statement, created = import_statement(file, logger, progress=progress)
+    if not created:
+        return {"level": "warning", "message": f"{file.name} was already imported"}
+    return {
+        "message": f"Imported {statement.transaction_count} transactions, "
+        f"skipped {statement.skipped_count} already imported",
+        "skipped": statement.skipped_count,
+        "transactions": statement.transaction_count,
+    }
+
+
+def run_timetable_import(file, logger, progress):
+    return import_timetable(file, logger)
+
+
+# by kind: the import function, called with (file, logger, progress), and the
+# error it raises for invalid files
+IMPORTERS = {
+    "crypto": (run_importer(CryptoTransactionsImporter), CryptoImportError),
+    "crypto-pnl": (run_importer(CryptoPnLImporter), CryptoImportError),
+    "payments": (run_importer(PaymentsImporter), PaymentImportError),
+    "statement": (run_statement_import, StatementImportError),
+    "stocks": (run_importer(StockTransactionsImporter), StockImportError),
+    "stocks-pnl": (run_importer(StockPnLImporter), StockImportError),
+    "timetable": (run_timetable_import, TimetableImportError),
+}
+
+
+def start_upload(kind, file) -> dict:
+    """Store the file and import it in the background
+
+    Returns the job id, which the status of the import is logged under.
+    """
+    if kind not in IMPORTERS:
+        raise ValueError(f"Unknown upload kind: {kind}")
+    job_id = uuid4().hex
+    path = default_storage.save(f"{UPLOADS_DIR}/{job_id}/{file.name}", file)
+    details = log_status(
+        get_upload_key(job_id), kind=kind, name=file.name, status="initial"
+    )
+    process_upload(job_id, kind, path, file.name)
+    return {"job_id": job_id, **details}
+
+
+def run_upload(job_id, kind, path, name):
+    """Import a stored file, logging the progress under the job's key
+
+    The file is deleted afterwards and the status expires a day later.
+    """
+    key = get_upload_key(job_id)
+    logger = structlog.get_logger(__name__).bind(job_id=job_id, kind=kind)
+    importer, import_error = IMPORTERS[kind]
+
+    def progress(**kwargs):
+        log_status(key, kind=kind, name=name, status=SIGNAL_EXECUTING, **kwargs)
+
+    progress()
+    try:
+        with default_storage.open(path) as file:
+            result = importer(File(file, name=name), logger, progress)
+    except import_error as e:
+        logger.exception("Could not process file", file_name=name)
+        log_status(
+            key,
+            error=f"Invalid file: {name} ({e})",
+            kind=kind,
+            name=name,
+            status=SIGNAL_ERROR,
+        )
+        result = None
+    except Exception as e:
+        log_status(key, error=str(e), kind=kind, name=name, status=SIGNAL_ERROR)
+        raise
+    else:
+        result = result if isinstance(result, dict) else {}
+        log_status(key, kind=kind, name=name, status=SIGNAL_COMPLETE, **result)
+    finally:
+        default_storage.delete(path)
+        expire_status(key, UPLOAD_STATUS_TTL)
+    return result
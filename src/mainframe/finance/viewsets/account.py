@@ -1,14 +1,15 @@
-from operator import attrgetter, itemgetter
+from collections import Counter, defaultdict
+from decimal import Decimal
 
-from django.db.models import Count, Q, Sum
-from django.db.models.functions import TruncMonth, TruncYear
+from django.db.models import Count, Sum
 from django.http import JsonResponse
 from django.utils import timezone
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 
-from mainframe.finance.models import Account, Category, Transaction
+from mainframe.finance.models import Account, Category, MonthlyRollup, Transaction
 from mainframe.finance.serializers import AccountSerializer
 
 
@@ -23,43 +24,33 @@ class AccountViewSet(viewsets.ModelViewSet):
 
     @action(methods=["get"], detail=True)
     def expenses(self, request, *args, **kwargs):
-        qs = Transaction.objects.expenses().filter(account_id=kwargs["pk"])
+        """The expenses of the account per month and category, from the rollups"""
+        rollups = MonthlyRollup.objects.filter(account_id=kwargs["pk"])
         categories = list(Category.objects.values_list("id", flat=True).order_by("id"))
-        year = request.query_params.get("year", timezone.now().year)
-        per_month = (
-            qs.filter(started_at__year=year)
-            .annotate(month=TruncMonth("started_at"))
-            .values("month")
-            .annotate(
-                **{
-                    k: Sum("amount", filter=Q(category=k), default=0)
-                    for k in categories
-                }
-            )
-            .order_by("month")
-        )
-        years = list(
-            map(
-                attrgetter("year"),
-                qs.annotate(year=TruncYear("started_at"))
-                .values_list("year", flat=True)
-                .distinct("year")
-                .order_by("year"),
-            )
-        )
+        try:
+            year = int(request.query_params.get("year", timezone.now().year))
+        except ValueError as e:
+            raise ValidationError({"detail": "Invalid year"}) from e
+        per_month, totals = defaultdict(dict), Counter()
+        for month, category, amount in (
+            rollups.filter(month__year=year)
+            .values("month", "category")
+            .annotate(total=Sum("amount"))  # all currencies, as before
+            .values_list("month", "category", "total")
+        ):
+            per_month[month][category] = amount
+            totals[category] += amount
         return JsonResponse(
             data={
                 "per_month": [
                     {
-                        "month": item["month"].strftime("%B"),
-                        **{k: item[k] for k in categories},
+                        "month": month.strftime("%B"),
+                        **{k: per_month[month].get(k, Decimal(0)) for k in categories},
                     }
-                    for item in per_month
-                ],
-                "years": years,
-                "categories": [
-                    cat for cat in categories if sum(map(itemgetter(cat), per_month))
+                    for month in sorted(per_month)
                 ],
+                "years": [month.year for month in rollups.dates("month", "year")],
+                "categories": [cat for cat in categories if totals[cat]],
                 "total": Transaction.objects.filter(account_id=kwargs["pk"]).count(),
             }
         )
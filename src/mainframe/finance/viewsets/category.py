@@ -2,8 +2,8 @@ from rest_framework import viewsets
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 
-from mainframe.finance.models import Category
-from mainframe.finance.serializers import CategorySerializer
+from mainframe.finance.models import Category, CategoryRule
+from mainframe.finance.serializers import CategoryRuleSerializer, CategorySerializer
 
 
 class CategoryPagination(PageNumberPagination):
@@ -15,3 +15,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminUser,)
     queryset = Category.objects.order_by("id")
     serializer_class = CategorySerializer
+
+
+class CategoryRuleViewSet(viewsets.ModelViewSet):
+    pagination_class = CategoryPagination
+    permission_classes = (IsAdminUser,)
+    queryset = CategoryRule.objects.select_related("category")
+    serializer_class = CategoryRuleSerializer
@@ -1,42 +1,30 @@
-import structlog
 from django.db.models import Count, Q, Sum
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from mainframe.clients.finance.crypto import (
-    CryptoImportError,
-    CryptoPnLImporter,
-    CryptoTransactionsImporter,
-)
 from mainframe.finance.models import CryptoPnL, CryptoTransaction
 from mainframe.finance.serializers import (
     CryptoPnLSerializer,
     CryptoTransactionSerializer,
 )
+from mainframe.finance.uploads import start_upload
 from mainframe.finance.viewsets.mixins import PnlActionModelViewSet
 
 
 class CryptoViewSet(PnlActionModelViewSet):
     permission_classes = (IsAdminUser,)
-    pnl_importer_class = CryptoPnLImporter
-    pnl_importer_error_class = CryptoImportError
     pnl_model_class = CryptoPnL
     pnl_serializer_class = CryptoPnLSerializer
+    pnl_upload_kind = "crypto-pnl"
     queryset = CryptoTransaction.objects.all()
     serializer_class = CryptoTransactionSerializer
 
     def create(self, request, *args, **kwargs):
-        file = request.FILES["file"]
-        logger = structlog.get_logger(__name__)
-        try:
-            CryptoTransactionsImporter(file, logger).run()
-        except CryptoImportError:
-            logger.exception("Could not process file", file_name=file.name)
-            return Response(
-                f"Invalid file: {file.name}", status=status.HTTP_400_BAD_REQUEST
-            )
-        return self.list(request, *args, **kwargs)
+        return Response(
+            start_upload("crypto", request.FILES["file"]),
+            status=status.HTTP_202_ACCEPTED,
+        )
 
     def get_queryset(self):
         queryset = super().get_queryset()
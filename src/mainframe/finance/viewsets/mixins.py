@@ -1,17 +1,16 @@
-import structlog
 from django.db.models import Q, Sum
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from mainframe.finance.models import CryptoPnL
+from mainframe.finance.uploads import start_upload
 
 
 class PnlActionModelViewSet(viewsets.ModelViewSet):
     pnl_model_class = NotImplemented
     pnl_serializer_class = NotImplemented
-    pnl_importer_class = NotImplemented
-    pnl_importer_error_class = NotImplementedError
+    pnl_upload_kind = NotImplemented
 
     @action(methods=["get", "post"], detail=False)
     def pnl(self, request, *args, **kwargs):
@@ -55,14 +54,7 @@ class PnlActionModelViewSet(viewsets.ModelViewSet):
             return response
 
         if request.method == "POST":
-            file = request.FILES["file"]
-            logger = structlog.get_logger(__name__)
-            try:
-                self.pnl_importer_class(file, logger).run()
-            except self.pnl_importer_error_class:
-                logger.exception("Could not process file", file_name=file.name)
-                return Response(
-                    f"Invalid file: {file.name}", status.HTTP_400_BAD_REQUEST
-                )
-            request.method = "GET"
-            return self.pnl(request, *args, **kwargs)
+            return Response(
+                start_upload(self.pnl_upload_kind, request.FILES["file"]),
+                status=status.HTTP_202_ACCEPTED,
+            )
@@ -1,12 +1,11 @@
-import structlog
 from rest_framework import status, viewsets
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from mainframe.clients.finance.payment import PaymentImportError, PaymentsImporter
 from mainframe.finance.models import Payment
 from mainframe.finance.serializers import PaymentSerializer
+from mainframe.finance.uploads import start_upload
 
 
 class PaymentPagination(PageNumberPagination):
@@ -21,13 +20,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
     serializer_class = PaymentSerializer
 
     def create(self, request, *args, **kwargs):
-        file = request.FILES["file"]
-        logger = structlog.get_logger(__name__)
-        try:
-            PaymentsImporter(file, logger).run()
-        except PaymentImportError:
-            logger.exception("Could not process file", file_name=file.name)
-            return Response(
-                f"Invalid file: {file.name}", status=status.HTTP_400_BAD_REQUEST
-            )
-        return self.list(request, *args, **kwargs)
+        return Response(
+            start_upload("payments", request.FILES["file"]),
+            status=status.HTTP_202_ACCEPTED,
+        )
@@ -1,5 +1,3 @@
-import json
-
 import redis
 import structlog
 from django.http import Http404, JsonResponse
@@ -16,8 +14,16 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
 
-from mainframe.core.tasks import get_redis_client, log_status
-from mainframe.finance.models import Category, Transaction
+from mainframe.clients.prediction import MODE_FULL, MODE_INCREMENTAL
+from mainframe.core.pagination import get_page_params
+from mainframe.core.tasks import (
+    HISTORY_SIZE,
+    clear_status,
+    get_latest_status,
+    get_status,
+    log_status,
+)
+from mainframe.finance.models import Transaction
 from mainframe.finance.tasks import predict, train
 
 logger = structlog.get_logger(__name__)
@@ -31,8 +37,8 @@ FINAL_STATUSES = [
     SIGNAL_LOCKED,
     SIGNAL_REVOKED,
 ]
-PREDICT_KEY = "tasks.predict"
-TRAIN_KEY = "tasks.train"
+PREDICT_KEY = "predict"
+TRAIN_KEY = "train"
 
 
 class PredictionViewSet(viewsets.ViewSet):
@@ -40,75 +46,72 @@ class PredictionViewSet(viewsets.ViewSet):
     error = "Tasks backend unreachable"
 
     def list(self, request, *args, **kwargs):
-        redis_client = get_redis_client()
+        page, page_size = get_page_params(request, HISTORY_SIZE, HISTORY_SIZE)
         try:
-            train_data = redis_client.get(TRAIN_KEY)
+            train_data = get_status(TRAIN_KEY, page, page_size)
         except redis.exceptions.ConnectionError:
             logger.exception(self.error)
             return JsonResponse({"detail": self.error}, status=400)
-        train_data = json.loads(train_data) if train_data else None
-        predict_data = redis_client.get(PREDICT_KEY)
-        predict_data = json.loads(predict_data) if predict_data else None
-        return JsonResponse({"train": train_data, "predict": predict_data})
+        predict_data = get_status(PREDICT_KEY, page, page_size)
+        return JsonResponse(
+            {"train": train_data or None, "predict": predict_data or None}
+        )
 
     @action(methods=["put"], detail=False, url_path="start-prediction")
     def start_prediction(self, request, *args, **kwargs):
-        redis_client = get_redis_client()
         try:
-            redis_entry = redis_client.get(PREDICT_KEY)
+            status = get_latest_status(PREDICT_KEY)
         except redis.exceptions.ConnectionError:
             logger.exception(self.error)
             return JsonResponse({"detail": self.error}, status=400)
-        details = json.loads(redis_entry) if redis_entry else {}
-        if (status := details.get("status")) and status not in FINAL_STATUSES:
+        if status and status not in FINAL_STATUSES:
             return JsonResponse({"detail": f"prediction - {status}"}, status=400)
-        redis_client.delete(PREDICT_KEY)
+        clear_status(PREDICT_KEY)
 
-        queryset = Transaction.objects.expenses().filter(
-            category=Category.UNIDENTIFIED,
-            confirmed_by=Transaction.CONFIRMED_BY_UNCONFIRMED,
-        )
+        queryset = Transaction.objects.unidentified()
         if descriptions := request.data:
             queryset = queryset.filter(description__in=descriptions)
 
-        predict(queryset.values("description", "id"), logger)
+        descriptions = queryset.order_by("description").distinct("description")
+        predict(list(descriptions.values_list("description", flat=True)), logger)
         return JsonResponse(
             data={"type": "predict", **log_status("predict", status="initial")}
         )
 
     @action(methods=["put"], detail=False, url_path="start-training")
     def start_training(self, request, *args, **kwargs):
-        redis_client = get_redis_client()
         try:
-            redis_entry = redis_client.get(TRAIN_KEY)
+            status = get_latest_status(TRAIN_KEY)
         except redis.exceptions.ConnectionError:
             logger.exception(self.error)
             return JsonResponse({"detail": self.error}, status=400)
 
-        details = json.loads(redis_entry) if redis_entry else {}
-        if (status := details.get("status")) and status not in FINAL_STATUSES:
+        if status and status not in FINAL_STATUSES:
             return JsonResponse({"detail": f"training - {status}"}, status=400)
-        redis_client.delete(TRAIN_KEY)
+        clear_status(TRAIN_KEY)
 
+        # incremental by default, {"mode": "full"} refits on every confirmation
+        incremental = request.data.get("mode") != MODE_FULL
         try:
-            train(logger)
+            train(logger, incremental=incremental)
         except redis.exceptions.ConnectionError as e:
             logger.exception(e)
             return JsonResponse({"detail": self.error}, status=400)
+        mode = MODE_INCREMENTAL if incremental else MODE_FULL
         return JsonResponse(
-            data={"type": "train", **log_status("train", status="initial")}
+            data={"type": "train", **log_status("train", mode=mode, status="initial")}
         )
 
     @action(methods=["get"], detail=False, url_path="predict-status")
     def predict_status(self, request, *args, **kwargs):
-        redis_client = get_redis_client()
-        if not (task := redis_client.get(PREDICT_KEY)):
+        page, page_size = get_page_params(request, HISTORY_SIZE, HISTORY_SIZE)
+        if not (task := get_status(PREDICT_KEY, page, page_size)):
             raise Http404
-        return JsonResponse(data={"type": "predict", **json.loads(task)})
+        return JsonResponse(data={"type": "predict", **task})
 
     @action(methods=["get"], detail=False, url_path="train-status")
     def train_status(self, request, *args, **kwargs):
-        redis_client = get_redis_client()
-        if not (task := redis_client.get(TRAIN_KEY)):
+        page, page_size = get_page_params(request, HISTORY_SIZE, HISTORY_SIZE)
+        if not (task := get_status(TRAIN_KEY, page, page_size)):
             raise Http404
-        return JsonResponse(data={"type": "train", **json.loads(task)})
+        return JsonResponse(data={"type": "train", **task})
@@ -1,38 +1,27 @@
-import structlog
 from django.db.models import Count, Q, Sum
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from mainframe.clients.finance.stocks import (
-    StockImportError,
-    StockPnLImporter,
-    StockTransactionsImporter,
-)
 from mainframe.finance.models import PnL, StockTransaction
 from mainframe.finance.serializers import PnLSerializer, StockTransactionSerializer
+from mainframe.finance.uploads import start_upload
 from mainframe.finance.viewsets.mixins import PnlActionModelViewSet
 
-logger = structlog.get_logger(__name__)
-
 
 class StocksViewSet(PnlActionModelViewSet):
     permission_classes = (IsAdminUser,)
-    pnl_importer_class = StockPnLImporter
-    pnl_importer_error_class = StockImportError
     pnl_model_class = PnL
     pnl_serializer_class = PnLSerializer
+    pnl_upload_kind = "stocks-pnl"
     queryset = StockTransaction.objects.all()
     serializer_class = StockTransactionSerializer
 
     def create(self, request, *args, **kwargs):
-        file = request.FILES["file"]
-        try:
-            StockTransactionsImporter(file, logger).run()
-        except StockImportError:
-            logger.exception("Could not process file", file_name=file.name)
-            return Response(f"Invalid file: {file.name}", status.HTTP_400_BAD_REQUEST)
-        return self.list(request, *args, **kwargs)
+        return Response(
+            start_upload("stocks", request.FILES["file"]),
+            status=status.HTTP_202_ACCEPTED,
+        )
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -1,11 +1,10 @@
-import structlog
 from rest_framework import status, viewsets
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from mainframe.clients.finance.timetable import TimetableImportError, import_timetable
 from mainframe.finance.models import Timetable
 from mainframe.finance.serializers import TimetableSerializer
+from mainframe.finance.uploads import start_upload
 
 
 class TimetableViewSet(viewsets.ModelViewSet):
@@ -16,11 +15,7 @@ class TimetableViewSet(viewsets.ModelViewSet):
     serializer_class = TimetableSerializer
 
     def create(self, request, *args, **kwargs):
-        file = request.FILES["file"]
-        logger = structlog.get_logger(__name__)
-        try:
-            import_timetable(file, logger)
-        except TimetableImportError:
-            logger.exception("Could not process file", file_name=file.name)
-            return Response(f"Invalid file: {file.name}", status.HTTP_400_BAD_REQUEST)
-        return self.list(request, *args, **kwargs)
+        return Response(
+            start_upload("timetable", request.FILES["file"]),
+            status=status.HTTP_202_ACCEPTED,
+        )
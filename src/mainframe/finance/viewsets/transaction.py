@@ -1,38 +1,113 @@
 from operator import itemgetter
 
-import structlog
-from django.contrib.postgres.search import SearchVector
+from django.core.cache import cache
 from django.db.models import Count, F, Sum
+from django.db.transaction import atomic
 from django.http import JsonResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
-from mainframe.clients.finance.statement import StatementImportError, import_statement
-from mainframe.finance.models import Account, Category, Transaction
+from mainframe.core.pagination import AggregatePaginator, KeysetPagination
+from mainframe.core.search import search
+from mainframe.finance.models import (
+    FILTERS_CACHE_KEY,
+    Account,
+    Category,
+    Transaction,
+)
 from mainframe.finance.serializers import TransactionSerializer
+from mainframe.finance.uploads import start_upload
+
+FILTERS_CACHE_TIMEOUT = 60 * 60 * 24  # cleared on changes, this is a safety net
+
+
+def get_filters() -> dict:
+    """The filter choices for the transactions list, cached until they change
+
+    See finance.models.transaction.clear_filters_cache for the invalidation.
+    """
+    if (filters := cache.get(FILTERS_CACHE_KEY)) is None:
+        expenses = Transaction.objects.expenses()
+        filters = {
+            "types": list(
+                expenses.values_list("type", flat=True)
+                .distinct("type")
+                .order_by("type")
+            ),
+            "categories": list(
+                Category.objects.values_list("id", flat=True).order_by("id")
+            ),
+            "accounts": list(Account.objects.values("id", "bank", "type")),
+            "unidentified_count": expenses.filter(
+                category=Category.UNIDENTIFIED
+            ).count(),
+        }
+        cache.set(FILTERS_CACHE_KEY, filters, FILTERS_CACHE_TIMEOUT)
+    return filters
+
+
+def filter_started_at(queryset, params):
+    """year and month params, as a started_at range when there's a year"""
+    try:
+        year = int(params["year"]) if params.get("year") else None
+        month = int(params["month"]) if params.get("month") else None
+        if year:
+            return queryset.started_in(year, month)
+    except ValueError as e:
+        raise ValidationError({"detail": "Invalid year or month"}) from e
+    if month:
+        return queryset.filter(started_at__month=month)
+    return queryset
+
+
+class TransactionPaginator(AggregatePaginator):
+    aggregates = {"page_amount": Sum("amount")}
+
+
+class TransactionPagination(KeysetPagination):
+    django_paginator_class = TransactionPaginator
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
+    pagination_class = TransactionPagination
     permission_classes = (IsAdminUser,)
     queryset = Transaction.objects.order_by("-started_at")
     serializer_class = TransactionSerializer
 
     @action(methods=["put"], detail=False, url_path="bulk-update")
     def bulk_update(self, request, *args, **kwargs):
-        total = 0
-        for item in self.request.data:
-            total += Transaction.objects.filter(
-                description=item["description"],
-                category=Category.UNIDENTIFIED,
-                confirmed_by=Transaction.CONFIRMED_BY_UNCONFIRMED,
-            ).update(
-                category=item["category"],
-                category_suggestion_id=None,
-                confirmed_by=Transaction.CONFIRMED_BY_ML,
+        """Categorize the unidentified expenses by description
+
+        The updated transactions list is only returned with list=true.
+        """
+        categories = {}
+        try:
+            for item in request.data:
+                categories.setdefault(str(item["description"]), str(item["category"]))
+        except (KeyError, TypeError) as e:
+            raise ValidationError(
+                {"detail": "Expected a list of descriptions and categories"}
+            ) from e
+        if unknown := set(categories.values()) - set(
+            Category.objects.filter(id__in=categories.values()).values_list(
+                "id", flat=True
             )
-        response = self.list(request, *args, **kwargs)
+        ):
+            raise ValidationError(
+                {"detail": f"Unknown categories: {', '.join(sorted(unknown))}"}
+            )
+
+        with atomic():
+            counts = Transaction.objects.categorize(categories)
+        total = sum(counts.values())
+        if request.query_params.get("list") == "true":
+            response = self.list(request, *args, **kwargs)
+        else:
+            response = Response({})
+        response.data["counts"] = counts
         response.data["msg"] = {
             "message": f"Successfully updated {total} transaction categories"
         }
@@ -62,18 +137,10 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
     @action(methods=["post"], detail=False, url_path="upload")
     def upload(self, request, *args, **kwargs):
-        file = request.FILES["file"]
-        logger = structlog.get_logger(__name__)
-        try:
-            import_statement(file, logger)
-        except StatementImportError:
-            logger.exception("Could not process file", file_name=file.name)
-            return Response(
-                f"Invalid file: {file.name}", status=status.HTTP_400_BAD_REQUEST
-            )
-        response = self.list(request, *args, **kwargs)
-        response.data["msg"] = {"message": "Payments uploaded successfully!"}
-        return response
+        return Response(
+            start_upload("statement", request.FILES["file"]),
+            status=status.HTTP_202_ACCEPTED,
+        )
 
     def get_queryset(self):  # noqa: C901
         queryset = super().get_queryset()
@@ -88,18 +155,11 @@ class TransactionViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(description=description)
         if params.get("only_expenses") == "true":
             queryset = queryset.expenses()
-        if month := params.get("month"):
-            queryset = queryset.filter(started_at__month=month)
         if search_term := params.get("search_term"):
-            queryset = queryset.annotate(
-                search=SearchVector(
-                    "description", "additional_data", "amount", "type", "started_at"
-                ),
-            ).filter(search=search_term)
+            queryset = search(queryset, search_term)
         if types := params.getlist("type"):
             queryset = queryset.filter(type__in=types)
-        if year := params.get("year"):
-            queryset = queryset.filter(started_at__year=year)
+        queryset = filter_started_at(queryset, params)
         if params.get("unique") == "true":
             queryset = queryset.distinct("description").order_by("description")
 
@@ -142,23 +202,6 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return response
 
     def _populate_filters(self, response):
-        response.data["types"] = (
-            Transaction.objects.expenses()
-            .values_list("type", flat=True)
-            .distinct("type")
-            .order_by("type")
-        )
+        response.data.update(get_filters())
         response.data["confirmed_by_choices"] = Transaction.CONFIRMED_BY_CHOICES
-        response.data["categories"] = Category.objects.values_list(
-            "id", flat=True
-        ).order_by("id")
-        response.data["accounts"] = Account.objects.values("id", "bank", "type")
-        response.data["unidentified_count"] = (
-            Transaction.objects.expenses()
-            .filter(category=Category.UNIDENTIFIED)
-            .count()
-        )
-        response.data["page_amount"] = self.get_queryset().aggregate(Sum("amount"))[
-            "amount__sum"
-        ]
         return response
@@ -0,0 +1,19 @@
+from django.http import Http404, JsonResponse
+from rest_framework import viewsets
+from rest_framework.permissions import IsAdminUser
+
+from mainframe.core.pagination import get_page_params
+from mainframe.core.tasks import HISTORY_SIZE, get_status
+from mainframe.finance.uploads import get_upload_key
+
+
+class UploadViewSet(viewsets.ViewSet):
+    """The progress of the files being imported in the background, by job id"""
+
+    permission_classes = (IsAdminUser,)
+
+    def retrieve(self, request, pk=None, *args, **kwargs):
+        page, page_size = get_page_params(request, HISTORY_SIZE, HISTORY_SIZE)
+        if not (job := get_status(get_upload_key(pk), page, page_size)):
+            raise Http404
+        return JsonResponse(data={"job_id": pk, **job})
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchers", "0015_remove_watcher_log_level"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watcher",
+            name="seen",
+            field=models.JSONField(default=list),
+        ),
+    ]
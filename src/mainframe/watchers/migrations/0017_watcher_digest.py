@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchers", "0016_watcher_seen"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watcher",
+            name="digest",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
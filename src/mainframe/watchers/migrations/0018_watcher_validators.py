@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watchers", "0017_watcher_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watcher",
+            name="validators",
+            field=models.JSONField(default=dict),
+        ),
+    ]
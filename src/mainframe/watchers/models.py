@@ -1,6 +1,5 @@
 import asyncio
-from typing import TypedDict
-from urllib.parse import urljoin
+import json
 
 import structlog
 from croniter import croniter
@@ -12,86 +11,38 @@ from django.utils import timezone
 from telegram.constants import ParseMode
 
 from mainframe.clients.chat import send_telegram_message
-from mainframe.clients.scraper import fetch
+from mainframe.clients.scraper import fetch, get_validators
 from mainframe.core.models import TimeStampedModel
 from mainframe.core.tasks import schedule_task
+from mainframe.watchers.parsers import (  # noqa: F401
+    Link,
+    WatcherElementsNotFound,
+    WatcherError,
+    digest,
+    extract,
+    fingerprint,
+    parse_api,
+    parse_web,
+)
 
 JSON_EXTENSION = ".json"
-
-
-class Link(TypedDict):
-    title: str
-    url: str
-
-
-class WatcherError(Exception): ...
-
-
-class WatcherElementsNotFound(WatcherError): ...
-
-
-def extract(structure, keys):
-    if len(keys) == 1:
-        return structure[keys[0]]
-    return extract(structure[keys[0]], keys[1:])
+MAX_NEW_RESULTS = 10
+SEEN_MAXSIZE = 500
+URGENT_KEYWORDS = ("breaking", "urgent", "alert", "ultima", "ultimă")
 
 
 def fetch_api(watcher) -> list[Link]:
     response, error = fetch(watcher.url, retries=1, soup=False, **watcher.request)
     if error:
         raise WatcherError(error)
-
-    results = response.json()
-    try:
-        list_selector, title_selector, url_selector = watcher.selector.split(" ")
-    except ValueError as e:
-        raise WatcherError(
-            "API type Watchers must have dotted list, title and url "
-            "selectors separated by space"
-        ) from e
-
-    if list_selector == "-":
-        items = [results]
-    else:
-        if not all((list_selector, title_selector, url_selector)):
-            raise WatcherError("Missing one of the selectors")
-        items = extract(results, list_selector.split("."))
-
-    try:
-        return [
-            {
-                "title": extract(result, title_selector.split(".")),
-                "url": extract(result, url_selector.split(".")),
-            }
-            for result in items
-        ]
-    except (IndexError, ValueError) as e:
-        raise WatcherError(e) from e
+    return parse_api(response.json(), watcher.selector)
 
 
 def fetch_web(watcher) -> list[Link]:
-    def get_title(element):
-        return (
-            element.text.strip()
-            or element.attrs.get("title")
-            or element.attrs.get("aria-label")
-        )
-
     soup, error = fetch(watcher.url, retries=1, **watcher.request)
-    if soup and (elements := soup.select(watcher.selector)):
-        return [
-            {
-                "title": get_title(e),
-                "url": str(urljoin(watcher.url, e.attrs["href"]))
-                if not e.attrs["href"].startswith("http")
-                else e.attrs["href"],
-            }
-            for e in elements
-            if get_title(e)
-        ]
     if error:
         raise WatcherError(error)
-    raise WatcherElementsNotFound(f"[{watcher.name}] No elements found")
+    return parse_web(soup, watcher.url, watcher.selector, watcher.name)
 
 
 class Watcher(TimeStampedModel):
@@ -103,17 +54,20 @@ class Watcher(TimeStampedModel):
     chat_id = models.BigIntegerField(blank=True, null=True)
     cron = models.CharField(blank=True, max_length=32)
     cron_notification = models.CharField(blank=True, max_length=32)
+    digest = models.CharField(blank=True, max_length=32)
     is_active = models.BooleanField(default=False)
     latest = models.JSONField(default=dict)
     pending_data = models.JSONField(default=list)
     name = models.CharField(max_length=255, unique=True)
     request = models.JSONField(default=dict)
+    seen = models.JSONField(default=list)
     selector = models.CharField(max_length=128)
     type = models.IntegerField(
         choices=TYPE_CHOICES,
         default=TYPE_WEB,
     )
     url = models.URLField()
+    validators = models.JSONField(default=dict)  # of the page the digest is of
 
     def __str__(self):
         return self.name
@@ -126,60 +80,133 @@ class Watcher(TimeStampedModel):
         if not fetcher:
             raise WatcherError(f"Unexpected watcher type: {self.type}")
 
-        results = fetcher(self)
+        return self.get_new_results(fetcher(self))
+
+    def get_new_results(self, results: list[Link]) -> list[Link]:
+        """Results not seen before, newest first - also marks them all as seen
+
+        seen holds the fingerprints of the most recent SEEN_MAXSIZE items, the
+        ones on the current page first, so they're evicted last.
+        """
+        fingerprints = [fingerprint(result) for result in results]
+        if self.seen:
+            seen = set(self.seen)
+            new_results = [
+                result
+                for result, result_fingerprint in zip(
+                    results, fingerprints, strict=True
+                )
+                if result_fingerprint not in seen
+            ]
+        else:
+            new_results = self._get_results_since_latest(results)
+        self.seen = list(dict.fromkeys(fingerprints + self.seen))[:SEEN_MAXSIZE]
+        return new_results[:MAX_NEW_RESULTS]
+
+    def _get_results_since_latest(self, results: list[Link]) -> list[Link]:
+        """Fallback for watchers that haven't recorded any seen items yet"""
         if not (self.latest and self.latest.get("timestamp")):
-            return results[:5]
+            return results
 
         if not (latest_url := self.latest.get("url")):
-            return results[:5]
+            return results
 
         for i, result in enumerate(results):
             if result["url"] == latest_url:
                 if result["title"] != self.latest.get("title"):
-                    return results[: i + 1][:5]
-                return results[:i][:5]
+                    return results[: i + 1]
+                return results[:i]
 
-        return results[:5]
+        return results
 
-    def run(self):
-        logger = structlog.get_logger(__name__)
-        logger = logger.bind(identifier=self.name)
-        matching_cron = (
-            croniter.match(self.cron_notification, timezone.now())
-            if self.cron_notification
-            else True
+    def get_config(self) -> tuple:
+        """The fields the page is fetched and parsed by"""
+        return (
+            self.type,
+            self.url,
+            self.selector,
+            json.dumps(self.request, sort_keys=True),
         )
-        if self.pending_data and matching_cron:
-            logger.info("Sending pending data")
-            self.send_notification(self.pending_data)
-            self.pending_data = []
-            self.save()
 
-        if not (results := self.fetch()):
-            logger.info("No new items")
-            return None
+    def get_digest(self, content: bytes) -> str:
+        """The body digest, changing with the fields it's fetched and parsed by too
 
-        urgent_keywords = ("breaking", "urgent", "alert", "ultima", "ultimă")
+        So editing e.g. the selector gets the page parsed again, unchanged or not.
+        """
+        return digest(content, *self.get_config())
+
+    def get_validators(self) -> dict[str, str]:
+        """The validators of the last parsed page, if it was with this config
+
+        Otherwise the page is fetched in full, a NotModified would keep it from
+        being parsed with the new selector, url or request.
+        """
+        validators = dict(self.validators)
+        if validators.pop("config", None) != digest(b"", *self.get_config()):
+            return {}
+        return validators
+
+    def set_validators(self, response) -> None:
+        """Store the validators of a page parsed (successfully) with this config"""
+        if validators := get_validators(response):
+            validators["config"] = digest(b"", *self.get_config())
+        self.validators = validators
+
+    def matches_notification_cron(self) -> bool:
+        if not self.cron_notification:
+            return True
+        return croniter.match(self.cron_notification, timezone.now())
+
+    def pop_pending_data(self, logger) -> list[Link]:
+        if not (self.pending_data and self.matches_notification_cron()):
+            return []
+        logger.info("Sending pending data")
+        pending_data, self.pending_data = self.pending_data, []
+        return pending_data
+
+    def handle_results(self, results: list[Link], logger) -> list[Link]:
+        """Update latest and pending_data with the new results (without saving)
+
+        Returns the results that need to be sent right away, if any.
+        """
+        matching_cron = self.matches_notification_cron()
         is_urgent = any(
-            result["title"].lower().startswith(urgent_keywords) for result in results
+            result["title"].lower().startswith(URGENT_KEYWORDS) for result in results
         )
+        result = results[0]
+        self.latest = {
+            "title": result["title"],
+            "url": result["url"],
+            "timestamp": timezone.now().isoformat(),
+        }
         if is_urgent or matching_cron:
             logger.info(
                 "Sending notification.",
                 is_urgent=is_urgent,
                 matching_cron=matching_cron,
             )
-            self.send_notification(results)
-        else:
-            logger.info("Deferring notification to next cron window")
-            self._accumulate_pending_data(results, logger)
+            return results
 
-        result = results[0]
-        self.latest = {
-            "title": result["title"],
-            "url": result["url"],
-            "timestamp": timezone.now().isoformat(),
-        }
+        logger.info("Deferring notification to next cron window")
+        self._accumulate_pending_data(results, logger)
+        return []
+
+    def run(self):
+        logger = structlog.get_logger(__name__)
+        logger = logger.bind(identifier=self.name)
+        if pending_data := self.pop_pending_data(logger):
+            self.send_notification(pending_data)
+            self.save()
+
+        seen = self.seen
+        if not (results := self.fetch()):
+            logger.info("No new items")
+            if self.seen != seen:
+                self.save()
+            return None
+
+        if results := self.handle_results(results, logger):
+            self.send_notification(results)
         self.save()
         return self
 
@@ -233,7 +260,8 @@ class Watcher(TimeStampedModel):
 
         self.pending_data = kept_items
 
-    def send_notification(self, results):
+    def notification(self, results):
+        """The telegram message coroutine for these results"""
         text = "\n".join(
             [
                 f"{f'{i + 1}. ' if len(results) > 1 else ''}"
@@ -251,7 +279,10 @@ class Watcher(TimeStampedModel):
         header = f"📣 <b>{self.name}</b> 📣\n"
         footer = f"\nMore articles: <a href='{url}'>here</a>"
 
-        asyncio.run(send_telegram_message(f"{header}{text}{footer}", **kwargs))
+        return send_telegram_message(f"{header}{text}{footer}", **kwargs)
+
+    def send_notification(self, results):
+        asyncio.run(self.notification(results))
 
 
 @receiver(signals.post_delete, sender=Watcher)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import time
+from typing import TypedDict
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+# No django imports in here: parse runs in spawned worker processes
+
+
+class Link(TypedDict):
+    title: str
+    url: str
+
+
+class WatcherError(Exception): ...
+
+
+class WatcherElementsNotFound(WatcherError): ...
+
+
+def digest(content: bytes, *config) -> str:
+    """Hash of a page body, along with the config it was fetched and parsed with"""
+    hasher = hashlib.blake2b(content, digest_size=16)
+    for part in config:
+        hasher.update(b"\0" + str(part).encode())
+    return hasher.hexdigest()
+
+
+def fingerprint(link: Link) -> str:
+    return hashlib.blake2b(
+        f"{link['url']}\n{link['title']}".encode(), digest_size=8
+    ).hexdigest()
+
+
+def extract(structure, keys):
+    if len(keys) == 1:
+        return structure[keys[0]]
+    return extract(structure[keys[0]], keys[1:])
+
+
+def parse_api(results, selector) -> list[Link]:
+    try:
+        list_selector, title_selector, url_selector = selector.split(" ")
+    except ValueError as e:
+        raise WatcherError(
+            "API type Watchers must have dotted list, title and url "
+            "selectors separated by space"
+        ) from e
+
+    if list_selector == "-":
+        items = [results]
+    else:
+        if not all((list_selector, title_selector, url_selector)):
+            raise WatcherError("Missing one of the selectors")
+        items = extract(results, list_selector.split("."))
+
+    try:
+        return [
+            {
+                "title": extract(result, title_selector.split(".")),
+                "url": extract(result, url_selector.split(".")),
+            }
+            for result in items
+        ]
+    except (IndexError, ValueError) as e:
+        raise WatcherError(e) from e
+
+
+def parse_web(soup, url, selector, name) -> list[Link]:
+    def get_title(element):
+        return (
+            element.text.strip()
+            or element.attrs.get("title")
+            or element.attrs.get("aria-label")
+        )
+
+    if not (elements := soup.select(selector)):
+        raise WatcherElementsNotFound(f"[{name}] No elements found")
+
+    return [
+        {
+            "title": get_title(e),
+            "url": str(urljoin(url, e.attrs["href"]))
+            if not e.attrs["href"].startswith("http")
+            else e.attrs["href"],
+        }
+        for e in elements
+        if get_title(e)
+    ]
+
+
+def parse(
+    content: bytes, is_api, url, selector, name
+) -> tuple[list[Link], str | None, float]:
+    """Parse a fetched watcher page, returns (links, error, duration)"""
+    started = time.monotonic()
+    try:
+        if is_api:
+            links = parse_api(json.loads(content), selector)
+        else:
+            soup = BeautifulSoup(content, features="html.parser")
+            links = parse_web(soup, url, selector, name)
+    except (KeyError, TypeError, ValueError, WatcherError) as e:
+        return [], str(e), time.monotonic() - started
+    return links, None, time.monotonic() - started
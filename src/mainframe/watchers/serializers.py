@@ -1,12 +1,10 @@
-import json
-
 import redis.exceptions
 import structlog
 from cron_descriptor import get_description
 from rest_framework import serializers
 
 from mainframe.core.serializers import ScheduleTaskIsRenamedSerializer
-from mainframe.core.tasks import get_redis_client
+from mainframe.core.tasks import get_status
 from mainframe.watchers.models import Watcher
 
 logger = structlog.get_logger(__name__)
@@ -19,7 +17,7 @@ class WatcherSerializer(ScheduleTaskIsRenamedSerializer):
 
     class Meta:
         model = Watcher
-        fields = "__all__"
+        exclude = ("digest", "seen", "validators")
 
     @staticmethod
     def get_cron_description(obj: Watcher) -> str:
@@ -32,7 +30,7 @@ class WatcherSerializer(ScheduleTaskIsRenamedSerializer):
     @staticmethod
     def get_redis(obj):
         try:
-            result = json.loads(get_redis_client().get(f"tasks.{obj.name}") or "{}")
+            result = get_status(obj.name)
         except (AttributeError, redis.exceptions.ConnectionError):
             logger.exception("Error in WatcherSerializer.get_redis", obj_name=obj.name)
             return {}
@@ -0,0 +1,168 @@
+import asyncio
+
+import structlog
+from croniter import croniter
+from django.utils import timezone
+from huey import crontab
+from huey.contrib.djhuey import HUEY, db_periodic_task
+from huey.signals import SIGNAL_COMPLETE, SIGNAL_ERROR
+
+from mainframe.clients.scraper import AsyncResponse, NotModified, fetch_many
+from mainframe.core.pools import pool_map
+from mainframe.core.queues import QUEUE_CRITICAL
+from mainframe.core.tasks import log_status
+from mainframe.watchers.models import Watcher
+from mainframe.watchers.parsers import parse
+
+logger = structlog.get_logger(__name__)
+
+PARSE_WORKERS = 2
+
+
+def get_due_watchers(now) -> list[Watcher]:
+    return [
+        watcher
+        for watcher in Watcher.objects.filter(is_active=True).exclude(cron="")
+        if croniter.match(watcher.cron, now)
+    ]
+
+
+def parse_responses(watchers, responses) -> dict[int, tuple]:
+    """Parse the changed pages in the worker pool, by watcher id
+
+    Pages with the same digest as the last parsed one are skipped - the body
+    and the watcher's fetch / parse fields. The digest and the validators are
+    only updated when parsing succeeds so errors keep surfacing: a NotModified
+    only ever answers for a page parsed successfully, with the same config.
+    """
+    fetched = []
+    for watcher, (response, _) in zip(watchers, responses, strict=True):
+        if not response:
+            continue
+        if (body_digest := watcher.get_digest(response.content)) == watcher.digest:
+            watcher.set_validators(response)
+        else:
+            fetched.append((watcher, response, body_digest))
+    if not fetched:
+        return {}
+
+    parsed = pool_map(
+        "watchers",
+        parse,
+        [response.content for _, response, _ in fetched],
+        [watcher.type == Watcher.TYPE_API for watcher, *_ in fetched],
+        [watcher.url for watcher, *_ in fetched],
+        [watcher.selector for watcher, *_ in fetched],
+        [watcher.name for watcher, *_ in fetched],
+        max_workers=PARSE_WORKERS,
+    )
+    results = {}
+    for (watcher, response, body_digest), result in zip(fetched, parsed, strict=True):
+        results[watcher.id] = result
+        if not result[1]:
+            watcher.digest = body_digest
+            watcher.set_validators(response)
+    return results
+
+
+def process(
+    watcher: Watcher, response: AsyncResponse | None, error, parsed
+) -> tuple[list, bool]:
+    """Update the watcher in memory
+
+    Returns the notifications to send and whether the watcher needs saving.
+    """
+    watcher_logger = logger.bind(identifier=watcher.name)
+    notifications = []
+    if pending_data := watcher.pop_pending_data(watcher_logger):
+        notifications.append(watcher.notification(pending_data))
+
+    links, parse_error, parse_duration = parsed or ([], None, 0)
+    if isinstance(error, NotModified):
+        error = None
+    error = str(error or parse_error or "") or None
+
+    if results := watcher.get_new_results(links):
+        if to_send := watcher.handle_results(results, watcher_logger):
+            notifications.append(watcher.notification(to_send))
+    elif error:
+        watcher_logger.warning("Watcher failed", error=error)
+    else:
+        watcher_logger.info("No new items")
+
+    log_status(
+        watcher.name,
+        error=error,
+        status=SIGNAL_ERROR if error else SIGNAL_COMPLETE,
+        fetch_duration=f"{response.elapsed:.3f}" if response else None,
+        parse_duration=f"{parse_duration:.3f}" if parsed else None,
+        new_items=len(results),
+    )
+    if changed := bool(pending_data or parsed):
+        watcher.updated_at = timezone.now()
+    return notifications, changed
+
+
+async def send_notifications(notifications):
+    return await asyncio.gather(*notifications, return_exceptions=True)
+
+
+def dispatch(watchers: list[Watcher]) -> int:
+    """Run the watchers in one pass
+
+    Pages are fetched concurrently, conditionally on the validators of the
+    last parsed ones, the changed ones are parsed in a process pool and the
+    updated watchers are written back with a single bulk update.
+    """
+    if not watchers:
+        return 0
+
+    validators = [watcher.validators for watcher in watchers]
+    responses = asyncio.run(
+        fetch_many(
+            [
+                (
+                    watcher.url,
+                    {**watcher.request, "validators": watcher.get_validators()},
+                )
+                for watcher in watchers
+            ],
+            soup=False,
+            retries=1,
+        )
+    )
+    parsed = parse_responses(watchers, responses)
+
+    notifications, changed = [], []
+    for watcher, watcher_validators, (response, error) in zip(
+        watchers, validators, responses, strict=True
+    ):
+        to_send, has_changed = process(watcher, response, error, parsed.get(watcher.id))
+        notifications.extend(to_send)
+        if has_changed or watcher.validators != watcher_validators:
+            changed.append(watcher)
+
+    if notifications := [n for n in notifications if n]:
+        for result in asyncio.run(send_notifications(notifications)):
+            if isinstance(result, Exception):
+                logger.error("Failed to send watcher notification", error=str(result))
+
+    if changed:
+        Watcher.objects.bulk_update(
+            changed,
+            fields=(
+                "digest",
+                "latest",
+                "pending_data",
+                "seen",
+                "updated_at",
+                "validators",
+            ),
+        )
+    return len(watchers)
+
+
+@db_periodic_task(crontab(), expires=50, queue=QUEUE_CRITICAL)
+@HUEY.lock_task("run-watchers-lock")
+def run_watchers():
+    return dispatch(get_due_watchers(timezone.now()))
@@ -1,9 +1,18 @@
-import json
 from unittest import mock
 
 import pytest
+from huey.contrib.djhuey import HUEY
 from rest_framework import status
 
+from mainframe.api.huey_tasks.views import get_registered_tasks
+
+
+@pytest.fixture(autouse=True)
+def clear_registered_tasks():
+    get_registered_tasks.cache_clear()
+    yield
+    get_registered_tasks.cache_clear()
+
 
 @pytest.mark.django_db
 @mock.patch("mainframe.api.huey_tasks.views.HUEY._registry")
@@ -11,10 +20,8 @@ class TestTasksViewSet:
     @mock.patch("mainframe.api.huey_tasks.views.get_redis_client")
     def test_list_tasks(self, mock_redis, mock_huey, client, staff_session):
         """Test listing all available tasks"""
-        mock_client = mock.MagicMock()
-        mock_client.get.return_value = None
-        mock_redis.return_value = mock_client
-
+        pipe = mock_redis.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [None, 0, 0, None, 0, 0, [None, None]]
         mock_huey._registry.__iter__.return_value = [
             "mainframe.api.task1",
             "mainframe.api.task2",
@@ -30,14 +37,14 @@ class TestTasksViewSet:
                     "name": "task1",
                     "id": "api.task1",
                     "is_periodic": False,
-                    "is_revoked": mock.ANY,
+                    "is_revoked": False,
                 },
                 {
                     "app": "api",
                     "name": "task2",
                     "id": "api.task2",
                     "is_periodic": False,
-                    "is_revoked": mock.ANY,
+                    "is_revoked": False,
                 },
             ]
         }
@@ -46,31 +53,71 @@ class TestTasksViewSet:
     def test_list_tasks_with_history(
         self, mock_redis, mock_huey, client, staff_session
     ):
-        mock_client = mock.MagicMock()
-        task_history = {
-            "history": [{"status": "success", "timestamp": "2024-01-01"}],
-            "errors": [],
-        }
-        mock_client.get.return_value = json.dumps(task_history).encode()
-        mock_redis.return_value = mock_client
-        mock_huey._registry.__iter__.return_value = ["mainframe.core.my_task"]
+        pipe = mock_redis.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [
+            b'{"status": "success", "timestamp": "2024-01-01"}',
+            12,
+            1,
+            b'{"status": "complete", "timestamp": "2024-01-02"}',
+            1,
+            0,
+            [HUEY.serializer.serialize((None, False)), None],
+        ]
+        mock_huey._registry.__iter__.return_value = [
+            "mainframe.core.my_task",
+            "mainframe.api.other_task",
+        ]
 
         response = client.get("/tasks/", HTTP_AUTHORIZATION=staff_session.token)
 
         assert response.status_code == status.HTTP_200_OK
         assert response.json() == {
             "results": [
+                {
+                    "app": "api",
+                    "name": "other_task",
+                    "id": "api.other_task",
+                    "is_periodic": False,
+                    "is_revoked": False,
+                    "count": 1,
+                    "errors_count": 0,
+                    "history": [{"status": "complete", "timestamp": "2024-01-02"}],
+                },
                 {
                     "app": "core",
                     "name": "my_task",
                     "id": "core.my_task",
                     "is_periodic": False,
-                    "is_revoked": mock.ANY,
+                    "is_revoked": True,
+                    "count": 12,
+                    "errors_count": 1,
                     "history": [{"status": "success", "timestamp": "2024-01-01"}],
-                    "errors": [],
-                }
+                },
             ]
         }
+        assert pipe.mock_calls == [
+            mock.call.lindex("tasks.my_task.history", 0),
+            mock.call.llen("tasks.my_task.history"),
+            mock.call.llen("tasks.my_task.errors"),
+            mock.call.lindex("tasks.other_task.history", 0),
+            mock.call.llen("tasks.other_task.history"),
+            mock.call.llen("tasks.other_task.errors"),
+            mock.call.hmget(
+                HUEY.storage.result_key,
+                ["rt:mainframe.core.my_task", "rt:mainframe.api.other_task"],
+            ),
+            mock.call.execute(),
+        ]
+
+    def test_list_registry_is_cached(self, mock_huey, client, staff_session):
+        mock_huey._registry.__iter__.return_value = []
+        with mock.patch(
+            "mainframe.api.huey_tasks.views.autodiscover_modules"
+        ) as autodiscover:
+            for _ in range(2):
+                response = client.get("/tasks/", HTTP_AUTHORIZATION=staff_session.token)
+                assert response.json() == {"results": []}
+        assert autodiscover.call_args_list == [mock.call("tasks")]
 
     def test_tasks_unauthorized(self, _, client, session):
         response = client.get("/tasks/", HTTP_AUTHORIZATION=session.token)
@@ -80,12 +127,9 @@ class TestTasksViewSet:
         response = client.get("/tasks/")
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
-    @mock.patch("mainframe.api.huey_tasks.views.get_redis_client")
-    def test_delete_task_history(self, mock_redis, _, client, staff_session):
-        mock_client = mock.MagicMock()
-        mock_client.delete.return_value = 1
-        mock_client.get.return_value = None
-        mock_redis.return_value = mock_client
+    @mock.patch("mainframe.api.huey_tasks.views.clear_status", return_value=1)
+    def test_delete_task_history(self, mock_clear, mock_huey, client, staff_session):
+        mock_huey._registry.__iter__.return_value = []
 
         response = client.delete(
             "/tasks/my_task/delete-history/",
@@ -93,13 +137,10 @@ class TestTasksViewSet:
         )
 
         assert response.status_code == status.HTTP_200_OK
-        mock_client.delete.assert_called_once()
+        assert mock_clear.call_args_list == [mock.call("my_task")]
 
-    @mock.patch("mainframe.api.huey_tasks.views.get_redis_client")
-    def test_delete_task_history_not_found(self, mock_redis, _, client, staff_session):
-        mock_client = mock.MagicMock()
-        mock_client.delete.return_value = 0
-        mock_redis.return_value = mock_client
+    @mock.patch("mainframe.api.huey_tasks.views.clear_status", return_value=0)
+    def test_delete_task_history_not_found(self, _, __, client, staff_session):
 
         response = client.delete(
             "/tasks/nonexistent/delete-history/",
@@ -108,3 +149,54 @@ class TestTasksViewSet:
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json() == {"detail": "No history found"}
+
+    @mock.patch("mainframe.api.huey_tasks.views.is_revoked", return_value=False)
+    @mock.patch("mainframe.api.huey_tasks.views.get_status", return_value={})
+    def test_retrieve_paginates_history(
+        self, mock_status, _, mock_huey, client, staff_session
+    ):
+        mock_huey._registry.__iter__.return_value = ["mainframe.core.my_task"]
+        mock_huey.periodic_tasks = []
+
+        response = client.get(
+            "/tasks/my_task/?page=2&page_size=10",
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "app": "core",
+            "name": "my_task",
+            "id": "core.my_task",
+            "is_periodic": False,
+            "is_revoked": False,
+        }
+        assert mock_status.call_args_list == [mock.call("my_task", 2, 10)]
+
+    def test_retrieve_invalid_page(self, mock_huey, client, staff_session):
+        response = client.get(
+            "/tasks/my_task/?page=0", HTTP_AUTHORIZATION=staff_session.token
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @mock.patch("mainframe.api.huey_tasks.views.get_redis_client")
+    @mock.patch("mainframe.api.huey_tasks.views.get_metrics", return_value={})
+    def test_metrics(self, mock_metrics, mock_redis, _, client, staff_session):
+        response = client.get(
+            "/tasks/metrics/?hours=2&name=foo&name=bar",
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"results": {}}
+        assert mock_metrics.call_args_list == [
+            mock.call(mock_redis.return_value, 2, ["foo", "bar"])
+        ]
+
+    @pytest.mark.parametrize("hours", ["0", "25", "x"])
+    def test_metrics_invalid_hours(self, _, hours, client, staff_session):
+        response = client.get(
+            f"/tasks/metrics/?hours={hours}", HTTP_AUTHORIZATION=staff_session.token
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"detail": "hours must be between 1 and 24"}
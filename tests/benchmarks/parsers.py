@@ -0,0 +1,91 @@
+"""Compare the bs4 backends, with and without a SoupStrainer, on saved pages
+
+    PYTHONPATH=src python -m tests.benchmarks.parsers \\
+        [case=path/to/page.html ...] [--repeat N]
+
+Cases are the scrapers' strainers below, save the pages with e.g.
+`curl -o meals.html <url>`. Without any page a synthetic one is used.
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import FeatureNotFound, SoupStrainer
+
+from mainframe.clients.scraper import class_strainer, make_soup
+
+BACKENDS = ("html.parser", "lxml", "html5lib")
+CASES = {
+    "azt": SoupStrainer("tr"),
+    "ib": SoupStrainer("script", type="application/ld+json"),
+    "infp": class_strainer("event-item", name="div"),
+    "meals": class_strainer("weekly-buttons", "slider-menu-for-day"),
+    "zn": SoupStrainer("section"),
+}
+
+
+def synthetic_page(size=2000) -> str:
+    filler = "".join(
+        f"<div class='card'><a href='/{i}'>link {i}</a><p>{'text ' * 20}</p></div>"
+        for i in range(size)
+    )
+    targets = "".join(
+        f"<div class='event-item big'>{i}</div><table><tr><td>{i}</td></tr></table>"
+        f"<script type='application/ld+json'>{{}}</script>"
+        for i in range(size // 20)
+    )
+    return (
+        f"<html><body><nav class='weekly-buttons'></nav>{filler}"
+        f"<section><div class='slider-menu-for-day'>{targets}</div></section>"
+        f"{filler}</body></html>"
+    )
+
+
+def measure(markup, backend, parse_only, repeat) -> tuple[float, float]:
+    """Median parse time in ms and peak traced memory in MiB"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        make_soup(markup, parse_only, backend)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    make_soup(markup, parse_only, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2**20
+
+
+def run(pages: dict[str, str], repeat) -> None:
+    print(f"{'case':<8}{'backend':<13}{'strained':<10}{'ms':>10}{'peak MiB':>10}")
+    for case, markup in pages.items():
+        for backend in BACKENDS:
+            for parse_only in (None, CASES[case]):
+                try:
+                    ms, mib = measure(markup, backend, parse_only, repeat)
+                except FeatureNotFound:
+                    break
+                strained = "yes" if parse_only else "no"
+                print(f"{case:<8}{backend:<13}{strained:<10}{ms:>10.1f}{mib:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", metavar="case=path")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = {}
+    for page in args.pages:
+        case, path = page.split("=", 1)
+        if case not in CASES:
+            parser.error(f"Unknown case {case}, must be one of: {', '.join(CASES)}")
+        pages[case] = Path(path).read_bytes()
+    run(pages or dict.fromkeys(CASES, synthetic_page()), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
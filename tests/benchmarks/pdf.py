@@ -0,0 +1,88 @@
+"""Time the page text extraction of a PDF with different numbers of workers
+
+    PYTHONPATH=src python -m tests.benchmarks.pdf [path/to/timetable.pdf] [--repeat N]
+
+Without a path a synthetic amortization table is used, --pages long.
+"""
+
+import argparse
+import io
+import os
+import statistics
+import time
+from pathlib import Path
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from mainframe.clients.finance import pdf
+
+FONT = DictionaryObject(
+    {
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/Type"): NameObject("/Font"),
+    }
+)
+
+
+def synthetic_pdf(pages: list[list[str]]) -> bytes:
+    """A PDF with the given lines of text on each page"""
+    writer = PdfWriter()
+    for lines in pages:
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): FONT})}
+        )
+        contents = DecodedStreamObject()
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        contents.set_data(f"BT /F1 8 Tf 10 TL 20 770 Td {text} ET".encode())
+        page.replace_contents(contents)
+    content = io.BytesIO()
+    writer.write(content)
+    return content.getvalue()
+
+
+def synthetic_timetable(size=40) -> bytes:
+    return synthetic_pdf(
+        [
+            [
+                f"{row:02}.01.2030 3.512,15 1.800,20 1.650,95 412.000,00 61,00"
+                for row in range(70)
+            ]
+            + ["Scadentar", f"{page + 2}/{size + 1}"]
+            for page in range(size)
+        ]
+    )
+
+
+def measure(content, max_workers, repeat) -> float:
+    """Median extraction time in ms, once the pool is warmed up"""
+    pdf.PDF_POOL = f"benchmark-{max_workers}"  # pools are sized when created
+    pdf.extract_pages_text(content, max_workers)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pdf.extract_pages_text(content, max_workers)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.path:
+        content = Path(args.path).read_bytes()
+    else:
+        content = synthetic_timetable(args.pages)
+    print(f"{'workers':<10}{'ms':>10}")
+    for max_workers in sorted({0, 2, 4, os.cpu_count() or 1}):
+        print(f"{max_workers:<10}{measure(content, max_workers, args.repeat):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -187,7 +187,7 @@ class TestHandleDex:
             )
         ]
 
-    @mock.patch("requests.request", side_effect=DexOnlineError("foo"))
+    @mock.patch("requests.Session.request", side_effect=DexOnlineError("foo"))
     async def test_3rd_party_error(self, _, update, __, ___):
         update = prepare_update(update, text="/dex 1", mock_class=AsyncMock)
         update.message.reply_text = AsyncMock()
@@ -199,7 +199,7 @@ class TestHandleDex:
             mock.call("Couldn't find definition for '1'", **DEFAULT_REPLY_KWARGS)
         ]
 
-    @mock.patch("requests.request")
+    @mock.patch("requests.Session.request")
     async def test_success(self, get_mock, update, logger, __):
         get_mock.return_value = MagicMock(
             status_code=200,
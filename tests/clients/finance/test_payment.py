@@ -0,0 +1,54 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from mainframe.clients.finance.payment import PaymentsImporter
+from tests.factories.finance import TimetableFactory
+
+
+def amortization_row(principal, interest):
+    return {
+        "date": "01.01.2030",
+        "insurance": "1",
+        "interest": interest,
+        "principal": principal,
+        "remaining": "0",
+        "total": "0",
+    }
+
+
+@pytest.mark.django_db
+class TestParseSaved:
+    @pytest.fixture(autouse=True)
+    def timetables(self):
+        table = [
+            amortization_row("100", "49"),
+            amortization_row("100", "39"),
+            amortization_row("100", "29"),
+        ]
+        TimetableFactory(amortization_table=table, date="2024-01-01")
+        TimetableFactory(amortization_table=table[1:], date="2025-01-01")
+
+    @pytest.mark.parametrize(
+        ("principal", "saved"),
+        [("99.99", 0), ("100", 50), ("199.99", 50), ("200", 90), ("1000", 120)],
+    )
+    def test_rows_covered_by_the_prepayment(self, principal, saved):
+        importer = PaymentsImporter(None, mock.Mock())
+        assert importer.parse_saved(date(2024, 6, 1), Decimal(principal)) == saved
+
+    def test_latest_timetable_before_the_payment(self, django_assert_num_queries):
+        importer = PaymentsImporter(None, mock.Mock())
+        with django_assert_num_queries(1):
+            assert [
+                importer.parse_saved(payment_date, Decimal(200))
+                for payment_date in (
+                    date(2024, 1, 1),
+                    date(2024, 1, 2),
+                    date(2025, 1, 1),
+                    date(2025, 1, 2),
+                )
+            ] == [0, 90, 90, 70]
+        assert len(importer.cumulative_sums) == 2  # noqa: PLR2004
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from mainframe.clients.finance.pdf import PDF_POOL, extract_pages_text, extract_text
+from mainframe.core.pools import pool_map
+from tests.benchmarks.pdf import synthetic_pdf
+
+PAGES = [[f"page {page}", f"row {page}"] for page in range(10)]
+TEXTS = [f"page {page}\nrow {page}" for page in range(10)]
+
+
+@mock.patch("mainframe.clients.finance.pdf.os.cpu_count", return_value=4)
+class TestExtractPagesText:
+    def test_chunks_are_extracted_in_order(self, _):
+        assert extract_pages_text(synthetic_pdf(PAGES), max_workers=3) == TEXTS
+
+    def test_chunks(self, _):
+        content = synthetic_pdf(PAGES)
+        with mock.patch(
+            "mainframe.clients.finance.pdf.pool_map", return_value=[["a"], ["b"]]
+        ) as mocked:
+            assert extract_pages_text(content, max_workers=3) == ["a", "b"]
+        [call] = mocked.call_args_list
+        name, fn, contents, starts, stops = call.args
+        assert (name, fn, call.kwargs) == (PDF_POOL, extract_text, {"max_workers": 3})
+        assert (list(starts), stops) == ([0, 4, 8], [4, 8, 12])
+        assert next(contents) == content
+
+    def test_short_documents_stay_in_process(self, _):
+        with mock.patch(
+            "mainframe.clients.finance.pdf.pool_map", return_value=[["a"]]
+        ) as mocked:
+            extract_pages_text(synthetic_pdf(PAGES[:2]), max_workers=3)
+        assert mocked.call_args_list[0].kwargs == {"max_workers": 0}
+
+    def test_single_cpu_stays_in_process(self, cpu_count):
+        cpu_count.return_value = 1
+        with mock.patch(
+            "mainframe.clients.finance.pdf.pool_map", wraps=pool_map
+        ) as wrapped:
+            assert extract_pages_text(synthetic_pdf(PAGES), max_workers=3) == TEXTS
+        assert wrapped.call_args_list[0].kwargs == {"max_workers": 0}
@@ -1,9 +1,31 @@
+import io
 from datetime import datetime
+from decimal import Decimal
+from unittest import mock
 from zoneinfo import ZoneInfo
 
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import override_settings
+from openpyxl import Workbook
 
-from mainframe.clients.finance.statement import RevolutParser
+from mainframe.clients.finance.statement import (
+    RaiffeisenParser,
+    RevolutParser,
+    StatementImportError,
+    import_statement,
+)
+from mainframe.finance.models import (
+    Account,
+    Category,
+    StatementImport,
+    Transaction,
+)
+from tests.factories.finance import (
+    AccountFactory,
+    CategoryFactory,
+    CategoryRuleFactory,
+)
 
 
 @override_settings(TIME_ZONE="Europe/Bucharest")
@@ -13,3 +35,249 @@ def test_revolut_convert_to_utc_returns_utc_tzinfo():
     # sanity check conversion: in Feb, Bucharest is +02:00
     local = datetime(2026, 2, 21, 14, 0, 0, tzinfo=ZoneInfo("Europe/Bucharest"))
     assert dt == local.astimezone(ZoneInfo("UTC"))
+
+
+def raiffeisen_statement(*transactions) -> SimpleUploadedFile:
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in (
+        ["Extras de cont"],
+        [],
+        ["Nume client:", "POPESCU ION VASILE"],
+        [],
+        ["Numar client:", "123"],
+        [],
+        ["Unitate Bancara:", "Raiffeisen"],
+        [],
+        [
+            "Cod IBAN:",
+            "RO49AAAA1B31007593840000",
+            "Tip cont:",
+            "curent",
+            "Valuta:",
+            "LEI",
+        ],
+        *[[]] * 4,
+        RaiffeisenParser.HEADER,
+        [],
+        *transactions,
+        [],
+        ["Sold final", 100],
+    ):
+        sheet.append(row)
+    content = io.BytesIO()
+    workbook.save(content)
+    return SimpleUploadedFile("statement.xlsx", content.getvalue())
+
+
+def raiffeisen_row(date, debit, credit, description):
+    return [date, date, debit, credit, "1", *[None] * 6, description]
+
+
+class TestDetectTransactionType:
+    @pytest.mark.parametrize(
+        ("description", "is_credit", "expected"),
+        [
+            ("Retragere ATM Bucuresti", False, Transaction.TYPE_ATM),
+            ("Plata atmosfera", False, Transaction.TYPE_CARD_PAYMENT),
+            ("Revolut*1234 Dublin", True, Transaction.TYPE_TOPUP),
+            ("Revolut*1234 Dublin", False, Transaction.TYPE_TRANSFER),
+            ("revolut*1234", False, Transaction.TYPE_CARD_PAYMENT),
+            ("Depozit|Constituire DEPOZIT", False, Transaction.TYPE_TRANSFER),
+            ("Depozit|other", True, Transaction.TYPE_UNIDENTIFIED),
+            ("Schimb valutar|EUR", False, Transaction.TYPE_EXCHANGE),
+            ("Salariu|SALAR ianuarie", True, Transaction.TYPE_TOPUP),
+            ("Salar|other", True, Transaction.TYPE_UNIDENTIFIED),
+            ("Magazin|REFUND", True, Transaction.TYPE_CARD_REFUND),
+            ("Comision administrare", False, Transaction.TYPE_FEE),
+            ("Lidl", False, Transaction.TYPE_CARD_PAYMENT),
+        ],
+    )
+    def test_keywords(self, description, is_credit, expected):
+        assert (
+            RaiffeisenParser.detect_transaction_type(description, is_credit=is_credit)
+            == expected
+        )
+
+
+@pytest.mark.django_db
+@mock.patch("mainframe.clients.finance.statement.backup_finance_model")
+class TestImportStatement:
+    @pytest.fixture(autouse=True)
+    def unidentified(self):
+        # bulk_create, since Category.save lowercases the id
+        Category.objects.bulk_create([CategoryFactory.build(id=Category.UNIDENTIFIED)])
+
+    def test_raiffeisen(self, backup_finance_model):
+        file = raiffeisen_statement(
+            raiffeisen_row(
+                "02/02/2026", 10.5, None, "LIDL|Data utilizarii cardului 01/02/2026"
+            ),
+            raiffeisen_row("03/02/2026", None, 1000, "Salariu|salar"),
+            raiffeisen_row("04/02/2026", 7, None, "Comision administrare"),
+        )
+        with (
+            mock.patch("mainframe.clients.finance.statement.IMPORT_BATCH_SIZE", 2),
+            mock.patch.object(
+                Transaction.objects,
+                "bulk_create",
+                wraps=Transaction.objects.bulk_create,
+            ) as bulk_create,
+        ):
+            statement, created = import_statement(file, mock.Mock())
+        assert created
+        assert (statement.transaction_count, statement.skipped_count) == (3, 0)
+
+        assert [len(c.args[0]) for c in bulk_create.call_args_list] == [2, 1]
+        assert backup_finance_model.call_args_list == [
+            mock.call(model="Account"),
+            mock.call(model="Transaction"),
+        ]
+        account = Account.objects.get()
+        assert (account.number, account.currency, account.first_name) == (
+            "RO49 AAAA 1B31 0075 9384 0000",
+            "RON",
+            "Popescu Ion",
+        )
+        transactions = Transaction.objects.order_by("started_at")
+        assert [
+            (t.started_at.day, t.amount, t.description, t.type) for t in transactions
+        ] == [
+            (1, Decimal("-10.5"), "LIDL", Transaction.TYPE_CARD_PAYMENT),
+            (3, Decimal(1000), "Salariu", Transaction.TYPE_TOPUP),
+            (4, Decimal(-7), "Comision administrare", Transaction.TYPE_FEE),
+        ]
+        assert transactions[0].additional_data == {
+            "nr_op": "1",
+            "from_description": ["Data utilizarii cardului 01/02/2026"],
+        }
+
+    def test_rules_are_applied(self, _):
+        food = CategoryFactory(id="food")
+        CategoryRuleFactory(category=food, pattern="lidl")
+        CategoryRuleFactory(category=None, pattern="coffee", type=Transaction.TYPE_FEE)
+        file = raiffeisen_statement(
+            raiffeisen_row("02/02/2026", 10, None, "LIDL Bucuresti"),
+            raiffeisen_row("03/02/2026", 3, None, "Coffee"),
+            raiffeisen_row("04/02/2026", 5, None, "Kaufland"),
+        )
+
+        import_statement(file, mock.Mock())
+
+        assert list(
+            Transaction.objects.order_by("started_at").values_list(
+                "category", "confirmed_by", "type"
+            )
+        ) == [
+            (food.id, Transaction.CONFIRMED_BY_RULE, Transaction.TYPE_CARD_PAYMENT),
+            (
+                Category.UNIDENTIFIED,
+                Transaction.CONFIRMED_BY_UNCONFIRMED,
+                Transaction.TYPE_FEE,
+            ),
+            (
+                Category.UNIDENTIFIED,
+                Transaction.CONFIRMED_BY_UNCONFIRMED,
+                Transaction.TYPE_CARD_PAYMENT,
+            ),
+        ]
+
+    def test_raiffeisen_is_all_or_nothing(self, _):
+        file = raiffeisen_statement(
+            raiffeisen_row("02/02/2026", 1, None, "ok"),
+            raiffeisen_row("31/02/2026", 1, None, "invalid date"),
+        )
+        with (
+            mock.patch("mainframe.clients.finance.statement.IMPORT_BATCH_SIZE", 1),
+            pytest.raises(StatementImportError),
+        ):
+            import_statement(file, mock.Mock())
+        assert not Transaction.objects.exists()
+        assert not StatementImport.objects.exists()
+
+    def test_raiffeisen_without_client(self, _):
+        workbook = Workbook()
+        workbook.active.append(["Extras de cont"])
+        content = io.BytesIO()
+        workbook.save(content)
+        file = SimpleUploadedFile("statement.xlsx", content.getvalue())
+        with pytest.raises(StatementImportError, match="Could not find starting index"):
+            import_statement(file, mock.Mock())
+
+    def test_revolut(self, backup_finance_model):
+        current, _, savings = [
+            AccountFactory(bank="Revolut", type=account_type)
+            for account_type in (
+                Account.TYPE_CURRENT,
+                Account.TYPE_DEPOSIT,
+                Account.TYPE_SAVINGS,
+            )
+        ]
+        file = SimpleUploadedFile(
+            "statement.csv",
+            b"Type,Product,Started Date,Completed Date,Description,Amount,Fee,"
+            b"Currency,State,Balance\n"
+            b"CARD_PAYMENT,Current,2026-02-01 10:00:00,2026-02-02 10:00:00,Lidl,"
+            b"-10.50,0.00,RON,COMPLETED,89.50\n"
+            b"TOPUP,Savings,2026-02-03 10:00:00,,Savings,5.00,0.00,RON,PENDING,\n",
+        )
+        statement, _ = import_statement(file, mock.Mock())
+        assert statement.transaction_count == 2  # noqa: PLR2004
+        assert backup_finance_model.call_args_list == [mock.call(model="Transaction")]
+        assert [
+            (t.account, t.amount, t.balance, t.completed_at is None)
+            for t in Transaction.objects.order_by("started_at")
+        ] == [
+            (current, Decimal("-10.5"), Decimal("89.5"), False),
+            (savings, Decimal(5), None, True),
+        ]
+
+    def test_same_file_is_skipped(self, backup_finance_model):
+        file = raiffeisen_statement(raiffeisen_row("02/02/2026", 1, None, "Lidl"))
+        content = file.read()
+        file.seek(0)
+        import_statement(file, mock.Mock())
+        logger = mock.Mock()
+
+        statement, created = import_statement(
+            SimpleUploadedFile("statement.xlsx", content), logger
+        )
+
+        assert not created
+        assert statement.transaction_count == 1
+        assert Transaction.objects.count() == 1
+        assert logger.warning.call_args_list == [
+            mock.call("Statement already imported", name="statement.xlsx")
+        ]
+        assert backup_finance_model.call_args_list == [
+            mock.call(model="Account"),
+            mock.call(model="Transaction"),
+        ]
+
+    def test_overlapping_rows_are_skipped(self, _):
+        coffee = raiffeisen_row("02/02/2026", 3, None, "Coffee")
+        import_statement(
+            raiffeisen_statement(
+                raiffeisen_row("01/02/2026", 10, None, "Lidl"), coffee, coffee
+            ),
+            mock.Mock(),
+        )
+
+        with mock.patch("mainframe.clients.finance.statement.IMPORT_BATCH_SIZE", 1):
+            statement, created = import_statement(
+                raiffeisen_statement(
+                    coffee,
+                    coffee,
+                    coffee,
+                    raiffeisen_row("03/02/2026", 5, None, "Lidl"),
+                ),
+                mock.Mock(),
+            )
+
+        assert created
+        assert (statement.transaction_count, statement.skipped_count) == (2, 2)
+        assert list(
+            Transaction.objects.order_by("started_at").values_list(
+                "description", flat=True
+            )
+        ) == ["Lidl", "Coffee", "Coffee", "Coffee", "Lidl"]
@@ -0,0 +1,59 @@
+import asyncio
+from unittest import mock
+
+from mainframe.clients.ctp import CTPClient
+from mainframe.clients.scraper import AsyncResponse
+from mainframe.transit_lines.models import TransitLine
+
+CSV = "\n".join(
+    [
+        "25,Lv",
+        "Unirii - Manastur",
+        "in vigoare din,01.02.2026",
+        "Unirii,Manastur",
+        "plecari,plecari",
+        "06:00,06:10",
+        "06:30,",
+    ]
+)
+
+
+class TestRequestMany:
+    def test_schedules(self):
+        logger = mock.Mock()
+        line = TransitLine(name="25")
+        schedules = [
+            (line, "lv", "https://ctp/25_lv.csv"),
+            (line, "s", "https://ctp/25_s.csv"),
+            (line, "d", "https://ctp/25_d.csv"),
+        ]
+        responses = [
+            (AsyncResponse(schedules[0][2], 200, CSV.encode()), None),
+            (None, mock.Mock(status=404)),
+            (None, ValueError("boom")),
+        ]
+        with mock.patch(
+            "mainframe.clients.ctp.scraper.fetch_many",
+            new=mock.AsyncMock(return_value=responses),
+        ) as fetch_many:
+            results = asyncio.run(CTPClient(logger).request_many(schedules))
+
+        assert fetch_many.call_args_list == [
+            mock.call(
+                [url for *_, url in schedules],
+                soup=False,
+                headers={"Referer": "https://ctpcj.ro/"},
+                retries=1,
+            )
+        ]
+        schedule, not_found, failed = results
+        assert (not_found, failed) == (None, None)
+        assert (schedule.line, schedule.occurrence) == (line, "lv")
+        assert schedule.terminal1_schedule == ["06:00", "06:30"]
+        assert schedule.terminal2_schedule == ["06:10"]
+        assert schedule.schedule_start_date.day == 1
+        # 404s are expected for lines without that occurrence
+        assert [c.args[0] for c in logger.error.call_args_list] == [
+            "Failed to fetch transit line schedule"
+        ]
+        assert logger.error.call_args.kwargs["occurrence"] == "d"
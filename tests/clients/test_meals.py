@@ -0,0 +1,33 @@
+import asyncio
+from unittest import mock
+
+from mainframe.clients import meals
+from mainframe.clients.scraper import AsyncResponse
+
+
+class TestFetchMany:
+    def test_failed_weeks_are_skipped(self):
+        urls = ["https://meals/week-1", "https://meals/week-2"]
+        responses = [
+            (AsyncResponse(urls[0], 200, b"<html>week 1</html>"), None),
+            (None, ValueError("boom")),
+        ]
+        with (
+            mock.patch(
+                "mainframe.clients.meals.scraper.fetch_many",
+                new=mock.AsyncMock(return_value=responses),
+            ) as fetch_many,
+            mock.patch(
+                "mainframe.clients.meals.parse_week", return_value=["meal"]
+            ) as parse_week,
+            mock.patch("mainframe.clients.meals.logger") as logger,
+        ):
+            assert asyncio.run(meals.fetch_many(urls)) == [["meal"]]
+
+        assert fetch_many.call_args_list == [mock.call(urls, soup=False)]
+        assert parse_week.call_args_list == [
+            mock.call(("<html>week 1</html>", urls[0]))
+        ]
+        assert logger.warning.call_args_list == [
+            mock.call("Failed to fetch meals", error="boom", url=urls[1])
+        ]
@@ -0,0 +1,305 @@
+import os
+import pickle
+import sys
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from google.api_core.exceptions import NotFound
+from huey.signals import SIGNAL_ERROR
+
+from mainframe.clients.prediction import (
+    MODE_FULL,
+    MODE_INCREMENTAL,
+    MODEL_BUCKET,
+    ModelRegistry,
+    SKLearn,
+    load_checkpoint,
+)
+from mainframe.finance.models import Transaction
+from mainframe.finance.tasks import warm_up_models
+from tests.factories.finance import CategoryFactory, TransactionFactory
+
+
+@pytest.fixture
+def model_dir(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    settings.ENV = "local"
+    path = tmp_path / "finance/data/model"
+    path.mkdir(parents=True)
+    return path
+
+
+def save_model(model_dir, file_name, item, mtime_ns):
+    path = model_dir / f"{file_name}.pkl"
+    path.write_bytes(pickle.dumps(item))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@mock.patch("mainframe.clients.prediction.load", side_effect=lambda name, _: name)
+class TestModelRegistry:
+    def test_reloads_new_versions_only(self, load, model_dir):
+        registry = ModelRegistry()
+        save_model(model_dir, "latest_model", "v1", 1)
+        assert [registry.get("latest_model") for _ in range(3)] == ["latest_model"] * 3
+
+        save_model(model_dir, "latest_model", "v2", 2)
+        registry.get("latest_model")
+        assert load.call_args_list == [
+            mock.call("latest_model", 1),
+            mock.call("latest_model", 2),
+        ]
+
+    def test_least_recently_used_are_evicted(self, load, model_dir):
+        registry = ModelRegistry(size=2)
+        for version in (1, 2):
+            save_model(model_dir, "latest_model", "", version)
+            registry.get("latest_model")
+        save_model(model_dir, "latest_vectorizer", "", 1)
+        registry.get("latest_vectorizer")
+        assert list(registry.items) == [("latest_model", 2), ("latest_vectorizer", 1)]
+
+    def test_blob_generation(self, load, settings):
+        settings.ENV = "prod"
+        registry = ModelRegistry()
+        with mock.patch("mainframe.clients.prediction.GoogleCloudStorageClient") as gcs:
+            gcs.return_value.get_blob_generation.return_value = 7
+            registry.warm_up()
+            registry.warm_up()
+        assert (
+            gcs.return_value.get_blob_generation.call_args_list
+            == [
+                mock.call("latest_model.pkl", MODEL_BUCKET),
+                mock.call("latest_vectorizer.pkl", MODEL_BUCKET),
+            ]
+            * 2
+        )
+        assert load.call_args_list == [
+            mock.call("latest_model", 7),
+            mock.call("latest_vectorizer", 7),
+        ]
+
+
+def test_load_downloads_the_version(settings):
+    settings.ENV = "prod"
+    with mock.patch("mainframe.clients.prediction.GoogleCloudStorageClient") as gcs:
+        download = gcs.return_value.download_blob_into_memory
+        download.return_value = pickle.dumps("model")
+        assert ModelRegistry().get("latest_model") == "model"
+    assert download.call_args_list == [
+        mock.call(
+            "latest_model.pkl",
+            MODEL_BUCKET,
+            generation=gcs.return_value.get_blob_generation.return_value,
+        )
+    ]
+
+
+class TestLoadCheckpoint:
+    def test_local(self, model_dir):
+        assert load_checkpoint() is None
+        save_model(model_dir, "latest_checkpoint", {"mode": "incremental"}, 1)
+        assert load_checkpoint() == {"mode": "incremental"}
+
+    def test_missing_blob(self, settings):
+        settings.ENV = "prod"
+        with mock.patch("mainframe.clients.prediction.GoogleCloudStorageClient") as gcs:
+            gcs.return_value.download_blob_into_memory.side_effect = NotFound("x")
+            assert load_checkpoint() is None
+
+
+@mock.patch("mainframe.clients.prediction.registry")
+class TestWarmUpModels:
+    def test_batch_consumers(self, registry):
+        with mock.patch("mainframe.finance.tasks.HUEY.queues", ("batch",)):
+            warm_up_models()
+        assert registry.warm_up.call_args_list == [mock.call()]
+
+    def test_other_consumers(self, registry):
+        with mock.patch("mainframe.finance.tasks.HUEY.queues", ("critical",)):
+            warm_up_models()
+        assert registry.warm_up.call_args_list == []
+
+    def test_errors_are_logged(self, registry):
+        registry.warm_up.side_effect = FileNotFoundError
+        with (
+            mock.patch("mainframe.finance.tasks.HUEY.queues", ("batch",)),
+            mock.patch("mainframe.finance.tasks.logger") as logger,
+        ):
+            warm_up_models()
+        assert logger.exception.call_args_list == [
+            mock.call("Could not warm up the prediction models")
+        ]
+
+
+class FakeVectorizer:
+    def __init__(self, **_):
+        pass
+
+    def transform(self, descriptions):
+        return list(descriptions)
+
+
+class FakeClassifier:
+    """Learns the category of each description it was fit on, by heart"""
+
+    def __init__(self, seen=None, **_):
+        self.calls = []
+        self.seen = dict(seen or {})
+        if seen:
+            self.classes_ = sorted(set(self.seen.values()))
+
+    def partial_fit(self, X, y, classes):
+        self.calls.append((list(X), list(y), list(classes)))
+        self.classes_ = list(classes)
+        self.seen.update(zip(X, y, strict=True))
+
+    def predict(self, X):
+        return [self.seen.get(x) for x in X]
+
+
+@pytest.mark.django_db
+@mock.patch("mainframe.clients.prediction.TRAIN_BATCH_SIZE", 3)
+@mock.patch("mainframe.clients.prediction.save")
+@mock.patch("mainframe.clients.prediction.log_status")
+class TestTrainIncremental:
+    @pytest.fixture(autouse=True)
+    def sklearn(self):
+        modules = {
+            "sklearn": mock.Mock(),
+            "sklearn.feature_extraction": mock.Mock(),
+            "sklearn.feature_extraction.text": mock.Mock(
+                HashingVectorizer=FakeVectorizer
+            ),
+            "sklearn.linear_model": mock.Mock(SGDClassifier=FakeClassifier),
+        }
+        with mock.patch.dict(sys.modules, modules):
+            yield
+
+    @pytest.fixture
+    def food(self):
+        return CategoryFactory(id="food")
+
+    @staticmethod
+    def train(checkpoint=None, model=None, classes=("food", "fuel")):
+        logger = mock.Mock()
+        with (
+            mock.patch(
+                "mainframe.clients.prediction.load_checkpoint", return_value=checkpoint
+            ),
+            mock.patch("mainframe.clients.prediction.load", return_value=model) as load,
+        ):
+            accuracy = SKLearn.train_incremental(
+                Transaction.objects.order_by("id"), list(classes), logger
+            )
+        return accuracy, load, logger
+
+    def test_new_model(self, log_status, save, food):
+        for _ in range(5):
+            TransactionFactory(category=food, description="lidl")
+
+        accuracy, load, _ = self.train(checkpoint={"mode": MODE_FULL})
+
+        assert accuracy == 1
+        assert load.call_args_list == []
+        model = save.call_args_list[0].args[0]
+        # the first batch is split, for the model to be scored on its last part
+        assert model.calls == [
+            (["lidl"] * 2, ["food"] * 2, ["food", "fuel"]),
+            (["lidl"], ["food"], ["food", "fuel"]),
+            (["lidl"] * 2, ["food"] * 2, ["food", "fuel"]),
+        ]
+        assert [c.args[1] for c in save.call_args_list] == [
+            "model",
+            "vectorizer",
+            "checkpoint",
+        ]
+        assert save.call_args_list[2].args[0]["mode"] == MODE_INCREMENTAL
+        assert log_status.call_args_list[-1] == mock.call(
+            "train", accuracy="1.00", mode=MODE_INCREMENTAL
+        )
+
+    def test_resumes_from_the_checkpoint(self, log_status, save, food):
+        fuel = CategoryFactory(id="fuel")
+        old = TransactionFactory(category=food, description="lidl")
+        new = TransactionFactory(category=fuel, description="omv")
+        trained_at = timezone.now() - timedelta(days=1)
+        Transaction.objects.filter(id=old.id).update(
+            updated_at=trained_at - timedelta(days=1)
+        )
+        model = FakeClassifier(seen={"lidl": "food", "omv": "fuel"})
+
+        accuracy, load, _ = self.train(
+            checkpoint={"mode": MODE_INCREMENTAL, "trained_at": trained_at},
+            model=model,
+            classes=("food", "fuel", "unused"),
+        )
+
+        assert accuracy == 1
+        assert load.call_args_list == [mock.call("latest_model")]
+        assert model.calls == [([new.description], ["fuel"], ["food", "fuel"])]
+        assert save.call_args_list[0].args[0] is model
+
+    def test_new_categories_start_over(self, log_status, save, food):
+        fuel = CategoryFactory(id="fuel")
+        for category in (food, fuel, food, food, fuel):
+            TransactionFactory(category=category, description=category.id)
+        model = FakeClassifier(seen={"lidl": "food"})
+        trained_at = timezone.now() - timedelta(days=1)
+
+        _, _, logger = self.train(
+            checkpoint={"mode": MODE_INCREMENTAL, "trained_at": trained_at},
+            model=model,
+        )
+
+        assert model.calls == []
+        assert logger.warning.call_args_list == [
+            mock.call("New categories, starting over", categories={"fuel"})
+        ]
+        new_model = save.call_args_list[0].args[0]
+        assert new_model is not model
+        assert sum(len(x) for x, *_ in new_model.calls) == 5  # noqa: PLR2004
+        assert {tuple(classes) for *_, classes in new_model.calls} == {("food", "fuel")}
+
+    def test_no_new_transactions(self, log_status, save, food):
+        TransactionFactory(category=food, description="lidl")
+        Transaction.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        model = FakeClassifier(seen={"lidl": "food"})
+
+        accuracy, _, logger = self.train(
+            checkpoint={"mode": MODE_INCREMENTAL, "trained_at": timezone.now()},
+            model=model,
+        )
+
+        assert accuracy is None
+        assert save.call_args_list == []
+        assert logger.info.call_args_list == [
+            mock.call("No new confirmed transactions")
+        ]
+        assert log_status.call_args_list == [
+            mock.call("train", count=0, mode=MODE_INCREMENTAL)
+        ]
+
+    def test_insufficient_accuracy(self, log_status, save, food):
+        for description in ("lidl", "lidl", "kaufland"):
+            TransactionFactory(category=food, description=description)
+
+        with pytest.raises(ValueError, match="Insufficient accuracy: 0.00"):
+            self.train()
+
+        assert save.call_args_list == []
+        assert log_status.call_args_list[-1] == mock.call(
+            "train",
+            error="Insufficient accuracy: 0.00",
+            mode=MODE_INCREMENTAL,
+            status=SIGNAL_ERROR,
+        )
+
+    def test_nothing_to_validate_on(self, log_status, save, food):
+        TransactionFactory(category=food, description="lidl")
+
+        with pytest.raises(ValueError, match="Not enough transactions"):
+            self.train()
+
+        assert save.call_args_list == []
@@ -1,14 +1,20 @@
 from unittest import mock
 
 import pytest
+import pytest_asyncio
 import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from bs4 import SoupStrainer
 
 from mainframe.clients import scraper
 
 
 class FakeResponse:
-    def __init__(self, content):
+    def __init__(self, content, status_code=200, headers=None):
         self.content = content
+        self.headers = headers or {}
+        self.status_code = status_code
 
     def raise_for_status(self):
         return None
@@ -16,23 +22,199 @@ class FakeResponse:
 
 @pytest.mark.django_db
 class TestFetch:
-    @mock.patch("mainframe.clients.scraper.requests.request")
-    def test_fetch_returns_soup_on_success(self, mock_request):
-        mock_request.return_value = FakeResponse(b"<html><body></body></html>")
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_returns_soup_on_success(self, mock_session):
+        mock_session.return_value.request.return_value = FakeResponse(
+            b"<html><body></body></html>"
+        )
         res, err = scraper.fetch("http://x", soup=True)
         assert err is None
         assert hasattr(res, "select")
 
-    @mock.patch("mainframe.clients.scraper.requests.request")
-    def test_fetch_returns_error_on_connection(self, mock_request):
-        mock_request.side_effect = requests.exceptions.ConnectionError("conn")
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_returns_error_on_connection(self, mock_session):
+        mock_session.return_value.request.side_effect = (
+            requests.exceptions.ConnectionError("conn")
+        )
         res, err = scraper.fetch("http://x", retries=0)
         assert res is None
         assert isinstance(err, Exception)
 
-    @mock.patch("mainframe.clients.scraper.requests.request")
-    def test_fetch_return_response_when_soup_false(self, mock_request):
-        mock_request.return_value = FakeResponse(b"ok")
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_retries_keep_method(self, mock_session):
+        mock_session.return_value.request.side_effect = (
+            requests.exceptions.ConnectionError("conn")
+        )
+        scraper.fetch("http://x", retries=1, method="POST")
+        assert [c.args[0] for c in mock_session.return_value.request.mock_calls] == [
+            "POST",
+            "POST",
+        ]
+
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_return_response_when_soup_false(self, mock_session):
+        mock_session.return_value.request.return_value = FakeResponse(b"ok")
         res, err = scraper.fetch("http://x", soup=False)
         assert err is None
         assert hasattr(res, "content")
+
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_sends_the_validators(self, mock_session):
+        request = mock_session.return_value.request
+        request.return_value = FakeResponse(
+            b"ok", headers={"ETag": '"abc"', "Last-Modified": "yesterday"}
+        )
+        response, _ = scraper.fetch("http://x", soup=False)
+        assert "headers" not in request.call_args.kwargs
+        validators = scraper.get_validators(response)
+        assert validators == {"ETag": '"abc"', "Last-Modified": "yesterday"}
+
+        request.return_value = FakeResponse(b"", status_code=304)
+        res, err = scraper.fetch(
+            "http://x", soup=False, validators=validators, headers={"X-A": "1"}
+        )
+
+        assert res is None
+        assert isinstance(err, scraper.NotModified)
+        assert request.call_args.kwargs["headers"] == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "yesterday",
+            "X-A": "1",
+        }
+
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_retries_keep_the_validators(self, mock_session):
+        request = mock_session.return_value.request
+        request.side_effect = [
+            requests.exceptions.ConnectionError("conn"),
+            FakeResponse(b"", status_code=304),
+        ]
+        _, err = scraper.fetch("http://x", retries=1, validators={"ETag": '"abc"'})
+        assert isinstance(err, scraper.NotModified)
+        assert [c.kwargs["headers"] for c in request.call_args_list] == [
+            {"If-None-Match": '"abc"'}
+        ] * 2
+
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_validators_only_for_get(self, mock_session):
+        request = mock_session.return_value.request
+        request.return_value = FakeResponse(b"ok")
+        scraper.fetch("http://x", method="POST", validators={"ETag": '"abc"'})
+        assert "headers" not in request.call_args.kwargs
+
+    @mock.patch("mainframe.clients.scraper.get_session")
+    def test_fetch_parse_only(self, mock_session):
+        mock_session.return_value.request.return_value = FakeResponse(
+            b"<nav><a href='/'>home</a></nav><section><a href='/1'>one</a></section>"
+        )
+        soup, err = scraper.fetch(
+            "http://x", retries=1, parse_only=SoupStrainer("section")
+        )
+        assert err is None
+        assert [a.text for a in soup.find_all("a")] == ["one"]
+        assert "parse_only" not in mock_session.return_value.request.call_args.kwargs
+
+
+class TestMakeSoup:
+    def test_class_strainer_matches_any_class(self):
+        soup = scraper.make_soup(
+            "<div class='item active'>1</div><div class='other'>2</div>"
+            "<span class='item'>3</span><p class='extra'>4</p>",
+            scraper.class_strainer("item", "extra"),
+        )
+        assert [tag.text for tag in soup.find_all(True)] == ["1", "3", "4"]
+
+    def test_class_strainer_with_name(self):
+        soup = scraper.make_soup(
+            "<div class='item'>1</div><span class='item'>2</span><div>3</div>",
+            scraper.class_strainer("item", name="div"),
+        )
+        assert [tag.text for tag in soup.find_all(True)] == ["1"]
+
+
+class TestGetSession:
+    def test_session_is_shared_per_host(self):
+        assert scraper.get_session("http://a/1") is scraper.get_session("http://a/2")
+        assert scraper.get_session("http://a/") is not scraper.get_session("http://b/")
+
+
+@pytest_asyncio.fixture
+async def server():
+    attempts = {"flaky": 0}
+
+    async def ok(request):
+        return web.Response(text=f"<p>{request.match_info['name']}</p>")
+
+    async def flaky(request):
+        attempts["flaky"] += 1
+        if attempts["flaky"] == 1:
+            return web.Response(status=503)
+        return web.Response(text="recovered")
+
+    async def missing(request):
+        return web.Response(status=404)
+
+    async def cached(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="fresh", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/ok/{name}", ok)
+    app.router.add_get("/flaky", flaky)
+    app.router.add_get("/missing", missing)
+    app.router.add_get("/cached", cached)
+    async with TestServer(app, host="127.0.0.1") as test_server:
+        test_server.attempts = attempts
+        yield test_server
+
+
+@pytest.mark.asyncio
+class TestFetchMany:
+    async def test_results_keep_url_order(self, server):
+        urls = [str(server.make_url(f"/ok/{name}")) for name in ("a", "b", "c")]
+        results = await scraper.fetch_many(urls)
+        assert [(soup.p.text, error) for soup, error in results] == [
+            ("a", None),
+            ("b", None),
+            ("c", None),
+        ]
+
+    async def test_response_when_soup_false(self, server):
+        ((response, error),) = await scraper.fetch_many(
+            [str(server.make_url("/ok/a"))], soup=False
+        )
+        assert error is None
+        assert response.status_code == 200
+        assert response.text == "<p>a</p>"
+
+    async def test_retries_server_errors(self, server):
+        ((response, error),) = await scraper.fetch_many(
+            [str(server.make_url("/flaky"))], soup=False, retries=1, backoff=0
+        )
+        assert error is None
+        assert response.text == "recovered"
+        assert server.attempts["flaky"] == 2
+
+    async def test_client_errors_are_not_retried(self, server):
+        ((response, error),) = await scraper.fetch_many(
+            [str(server.make_url("/missing"))], retries=3, backoff=0
+        )
+        assert response is None
+        assert error.status == 404
+
+    async def test_conditional(self, server):
+        url = str(server.make_url("/cached"))
+        ((response, error),) = await scraper.fetch_many([url], soup=False)
+        assert response.text == "fresh"
+
+        validators = scraper.get_validators(response)
+        ((response, error),) = await scraper.fetch_many(
+            [(url, {"validators": validators})], soup=False
+        )
+        assert response is None
+        assert isinstance(error, scraper.NotModified)
+
+        # validators are the caller's, nothing is remembered in between
+        ((response, error),) = await scraper.fetch_many([url], soup=False)
+        assert response.text == "fresh"
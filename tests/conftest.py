@@ -2,6 +2,7 @@ from unittest.mock import patch
 
 import dotenv
 import pytest
+from django.core.cache import cache
 
 from tests.factories.authentication import ActiveSessionFactory
 from tests.factories.user import UserFactory
@@ -18,6 +19,16 @@ def fast_password_hasher(settings):
     yield
 
 
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """In memory cache, cleared after each test"""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    yield
+    cache.clear()
+
+
 # in order for pytest-asyncio (uses sockets) to work with
 # pytest-socket (which disables all sockets)
 def pytest_collection_modifyitems(config, items):
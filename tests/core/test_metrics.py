@@ -0,0 +1,134 @@
+from unittest import mock
+
+import pytest
+from freezegun import freeze_time
+from huey import signals
+
+from mainframe.core import metrics
+from mainframe.core.queues import SIGNAL_ENQUEUED
+from mainframe.core.tasks import signal_handler
+
+HOUR_KEY = "metrics.foo.2026020600"
+
+
+@pytest.fixture(autouse=True)
+def clear_executing():
+    metrics._executing.clear()
+    yield
+    metrics._executing.clear()
+
+
+def make_task(task_id="1"):
+    task = mock.MagicMock(id=task_id)
+    task.name = "foo"
+    return task
+
+
+@freeze_time("2026-02-06 00:14:00")
+class TestQueueMetrics:
+    def test_enqueued(self):
+        pipe = mock.MagicMock()
+        metrics.queue_metrics(pipe, SIGNAL_ENQUEUED, make_task())
+        assert pipe.mock_calls == [
+            mock.call.set("metrics.enqueued.1", 1770336840.0, ex=86400),
+            mock.call.hincrby(HOUR_KEY, "enqueued", 1),
+            mock.call.expire(HOUR_KEY, 90000),
+            mock.call.sadd("metrics.tasks", "foo"),
+        ]
+
+    def test_executing_reads_enqueue_time(self):
+        pipe = mock.MagicMock()
+        metrics.queue_metrics(pipe, signals.SIGNAL_EXECUTING, make_task())
+        assert pipe.mock_calls == [
+            mock.call.get("metrics.enqueued.1"),
+            mock.call.delete("metrics.enqueued.1"),
+        ]
+
+    @mock.patch("mainframe.core.metrics.time.monotonic", side_effect=[10, 12.2])
+    def test_complete_records_duration_and_wait(self, _):
+        metrics.track_executing(make_task(), b"1770336837")
+        pipe = mock.MagicMock()
+
+        metrics.queue_metrics(pipe, signals.SIGNAL_COMPLETE, make_task())
+
+        assert pipe.mock_calls == [
+            mock.call.hincrby(HOUR_KEY, "complete", 1),
+            mock.call.hincrby(HOUR_KEY, "duration.2.5", 1),
+            mock.call.hincrbyfloat(HOUR_KEY, "duration.sum", pytest.approx(2.2)),
+            mock.call.hincrby(HOUR_KEY, "wait.5", 1),
+            mock.call.hincrbyfloat(HOUR_KEY, "wait.sum", 3.0),
+            mock.call.expire(HOUR_KEY, 90000),
+            mock.call.sadd("metrics.tasks", "foo"),
+        ]
+        assert metrics._executing == {}
+
+    def test_locked_only_counts(self):
+        metrics.track_executing(make_task(), None)
+        pipe = mock.MagicMock()
+        metrics.queue_metrics(pipe, signals.SIGNAL_LOCKED, make_task())
+        assert pipe.mock_calls == [
+            mock.call.hincrby(HOUR_KEY, "locked", 1),
+            mock.call.expire(HOUR_KEY, 90000),
+            mock.call.sadd("metrics.tasks", "foo"),
+        ]
+        assert metrics._executing == {}
+
+
+class TestSummary:
+    def test_summarize_across_hours(self):
+        assert metrics.summarize(
+            [
+                {
+                    b"complete": b"9",
+                    b"error": b"1",
+                    b"duration.0.5": b"18",
+                    b"duration.sum": b"3.5",
+                },
+                {b"complete": b"1", b"duration.30": b"1", b"duration.inf": b"1"},
+                {},
+            ]
+        ) == {
+            "counters": {"complete": 10, "error": 1},
+            "duration": {
+                "count": 20,
+                "mean": 0.175,
+                "p50": 0.5,
+                "p95": 30,
+                "p99": None,
+                "histogram": {"0.5": 18, "30": 1, "inf": 1},
+            },
+        }
+
+    @freeze_time("2026-02-06 01:14:00")
+    def test_get_metrics_reads_the_window_in_one_pipeline(self):
+        redis_client = mock.MagicMock()
+        redis_client.smembers.return_value = {b"foo"}
+        pipe = redis_client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [{b"complete": b"2"}, {b"error": b"1"}]
+
+        assert metrics.get_metrics(redis_client, hours=2) == {
+            "foo": {"counters": {"complete": 2, "error": 1}}
+        }
+        assert pipe.mock_calls == [
+            mock.call.hgetall("metrics.foo.2026020601"),
+            mock.call.hgetall(HOUR_KEY),
+            mock.call.execute(),
+        ]
+
+
+@mock.patch("mainframe.core.tasks.close_old_connections")
+@mock.patch("mainframe.core.tasks.get_redis_client")
+class TestSignalHandler:
+    def test_executing_tracks_the_queue_wait(self, redis_client, _):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [1, True, b"100", 1]
+
+        with mock.patch("mainframe.core.tasks.track_executing") as track:
+            signal_handler(signals.SIGNAL_EXECUTING, make_task())
+
+        assert track.call_args_list == [mock.call(mock.ANY, b"100")]
+
+    def test_enqueued_is_not_logged_in_history(self, redis_client, _):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        signal_handler(SIGNAL_ENQUEUED, make_task())
+        assert not [c for c in pipe.mock_calls if c[0] == "lpush"]
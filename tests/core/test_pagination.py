@@ -0,0 +1,110 @@
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+
+from mainframe.core.pagination import get_keyset
+from mainframe.exchange.models import ExchangeRate
+from mainframe.finance.models import Transaction
+from mainframe.finance.viewsets.transaction import TransactionPagination
+from tests.factories.finance import AccountFactory, TransactionFactory
+
+
+class TestGetKeyset:
+    def test_ordering(self):
+        queryset = Transaction.objects.order_by("-started_at")
+        assert get_keyset(queryset) == [("started_at", True), ("id", True)]
+
+    def test_meta_ordering_with_mixed_directions(self):
+        assert get_keyset(ExchangeRate.objects.all()) == [
+            ("date", True),
+            ("symbol", False),
+            ("id", True),
+        ]
+
+    def test_pk_is_not_added_twice(self):
+        queryset = Transaction.objects.order_by("started_at", "-pk")
+        assert get_keyset(queryset) == [("started_at", False), ("pk", True)]
+
+    def test_random_ordering(self):
+        with pytest.raises(ImproperlyConfigured):
+            get_keyset(Transaction.objects.order_by("?"))
+
+
+@pytest.mark.django_db
+@mock.patch.object(TransactionPagination, "page_size", 2)
+class TestKeysetPagination:
+    url = reverse("finance:transactions-list")
+
+    def create_transactions(self):
+        account = AccountFactory()
+        same_time = "2026-01-02T10:00:00Z"
+        return [
+            TransactionFactory(account=account, started_at="2026-01-03T10:00:00Z"),
+            *reversed(
+                TransactionFactory.create_batch(
+                    3, account=account, started_at=same_time
+                )
+            ),
+            TransactionFactory(account=account, started_at="2026-01-01T10:00:00Z"),
+        ]
+
+    def test_pages(self, client, staff_session):
+        transactions = self.create_transactions()
+        ids, previous, url = [], [], f"{self.url}?cursor="
+        while url:
+            response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["page_size"] == 2
+            ids.append([t["id"] for t in data["results"]])
+            previous.append(data["previous"])
+            url = data["next"]
+        assert ids == [
+            [transactions[0].id, transactions[1].id],
+            [transactions[2].id, transactions[3].id],
+            [transactions[4].id],
+        ]
+        assert previous[0] is None
+
+        response = client.get(previous[2], HTTP_AUTHORIZATION=staff_session.token)
+        assert [t["id"] for t in response.json()["results"]] == ids[1]
+        assert response.json()["next"] is not None
+
+    def test_count(self, client, staff_session):
+        TransactionFactory.create_batch(3, amount=10)
+        response = client.get(
+            f"{self.url}?cursor=&count=true", HTTP_AUTHORIZATION=staff_session.token
+        )
+        data = response.json()
+        assert (data["count"], data["count_estimated"]) == (3, False)
+        assert data["page_amount"] == 30
+
+        with mock.patch(
+            "mainframe.core.pagination.estimate_count", return_value=1000
+        ) as estimate_count:
+            response = client.get(
+                f"{self.url}?cursor=", HTTP_AUTHORIZATION=staff_session.token
+            )
+        data = response.json()
+        assert (data["count"], data["count_estimated"]) == (1000, True)
+        assert "page_amount" not in data
+        assert len(estimate_count.call_args_list) == 1
+
+    def test_page_numbers_without_cursor(self, client, staff_session):
+        TransactionFactory.create_batch(3)
+        response = client.get(
+            f"{self.url}?page=2", HTTP_AUTHORIZATION=staff_session.token
+        )
+        data = response.json()
+        assert (data["count"], len(data["results"])) == (3, 1)
+        assert "count_estimated" not in data
+
+    @pytest.mark.parametrize("cursor", ["x", "WzFd", "W2ZhbHNlLCBbIngiLCAiMSJdXQ=="])
+    def test_invalid_cursor(self, client, cursor, staff_session):
+        response = client.get(
+            f"{self.url}?cursor={cursor}", HTTP_AUTHORIZATION=staff_session.token
+        )
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Invalid cursor"}
@@ -0,0 +1,141 @@
+from unittest import mock
+
+import pytest
+from huey.api import ResultGroup
+from huey.contrib.djhuey import HUEY
+from huey.exceptions import ConfigurationError, HueyException
+
+from mainframe.core.queues import (
+    QUEUE_BATCH,
+    QUEUE_CRITICAL,
+    SIGNAL_ENQUEUED,
+    MainframeHuey,
+)
+from mainframe.core.tasks import register_crons, schedule_task
+from tests.factories.crons import CronFactory
+
+
+@pytest.fixture(name="huey")
+def huey_fixture():
+    huey = MainframeHuey("test", immediate=False)
+    with mock.patch.object(huey.storage, "conn") as conn:
+        yield huey, conn
+
+
+class TestMainframeHuey:
+    def test_enqueue_default_queue(self, huey):
+        huey, conn = huey
+        task_wrapper = huey.task()(lambda: None)
+        with mock.patch.object(huey, "_emit") as emit:
+            task_wrapper()
+        assert conn.lpush.call_args_list == [mock.call("huey.redis.test", mock.ANY)]
+        assert emit.call_args_list == [mock.call(SIGNAL_ENQUEUED, mock.ANY)]
+
+    def test_enqueue_routes_to_the_task_queue(self, huey):
+        huey, conn = huey
+        task_wrapper = huey.task(queue=QUEUE_BATCH)(lambda: None)
+        result = task_wrapper()
+        assert conn.lpush.call_args_list == [
+            mock.call("huey.redis.test.batch", mock.ANY)
+        ]
+        assert result.id == result.task.id
+
+    def test_enqueue_pipeline_to_the_task_queue(self, huey):
+        huey, conn = huey
+        first = huey.task(name="first", queue=QUEUE_BATCH)(lambda: 1)
+        second = huey.task(name="second", queue=QUEUE_BATCH)(lambda _: 2)
+        pipeline = first.s().then(second)
+
+        result = huey.enqueue(pipeline)
+
+        assert conn.lpush.call_args_list == [
+            mock.call("huey.redis.test.batch", mock.ANY)
+        ]
+        assert isinstance(result, ResultGroup)
+        assert [r.task for r in result] == [pipeline, pipeline.on_complete]
+
+    def test_enqueue_unknown_queue(self, huey):
+        huey, _ = huey
+        with pytest.raises(ConfigurationError, match="Unknown queue: foo"):
+            huey.task(queue="foo")(lambda: None)()
+
+    def test_dequeue_in_order_of_priority(self, huey):
+        huey, conn = huey
+        task_wrapper = huey.task(queue=QUEUE_CRITICAL)(lambda: None)
+        conn.brpop.return_value = (b"key", huey.serialize_task(task_wrapper.s()))
+
+        assert isinstance(huey.dequeue(), task_wrapper.task_class)
+        assert conn.brpop.call_args_list == [
+            mock.call(
+                [
+                    "huey.redis.test.critical",
+                    "huey.redis.test",
+                    "huey.redis.test.batch",
+                ],
+                timeout=1,
+            )
+        ]
+
+    def test_dequeue_own_queues_only(self):
+        huey = MainframeHuey("test", blocking=False, queues=["batch"])
+        with mock.patch.object(huey.storage, "conn") as conn:
+            conn.rpop.return_value = None
+            assert huey.dequeue() is None
+        assert conn.rpop.call_args_list == [mock.call("huey.redis.test.batch")]
+
+    def test_unknown_queues(self):
+        with pytest.raises(ConfigurationError, match="Unknown queues: foo"):
+            MainframeHuey("test", queues=["default", "foo"])
+
+    def test_unknown_task_runs_the_reload_hooks(self, huey):
+        huey, _ = huey
+        producer = MainframeHuey("test", immediate=False)
+        data = producer.serialize_task(producer.task(name="late")(lambda: None).s())
+
+        def register():
+            huey.task(name="late")(lambda: None)
+
+        hook = mock.Mock(side_effect=register)
+        huey.on_reload("late")(hook)
+
+        assert huey.deserialize_task(data).name == "late"
+        assert hook.call_args_list == [mock.call()]
+
+    def test_unknown_task_without_reload_hooks(self, huey):
+        huey, _ = huey
+        producer = MainframeHuey("test", immediate=False)
+        data = producer.serialize_task(producer.task(name="late")(lambda: None).s())
+        with pytest.raises(HueyException):
+            huey.deserialize_task(data)
+
+
+@pytest.mark.django_db
+class TestScheduleCrons:
+    @pytest.fixture(autouse=True)
+    def restore_registry(self):
+        registry = dict(HUEY._registry._registry)
+        periodic = set(HUEY._registry._periodic_tasks)
+        yield
+        HUEY._registry._registry = registry
+        HUEY._registry._periodic_tasks = periodic
+
+    def test_cron_is_routed_by_command(self):
+        critical = CronFactory(name="usgs", command="check_usgs", is_active=True)
+        default = CronFactory(name="events", command="fetch_events", is_active=True)
+
+        schedule_task.call_local(critical)
+        schedule_task.call_local(default)
+
+        registry = HUEY._registry._registry
+        assert registry[f"mainframe.crons.models.{critical.name}"].queue == "critical"
+        assert registry[f"mainframe.crons.models.{default.name}"].queue == "default"
+
+    def test_register_crons(self):
+        active = CronFactory(name="active", is_active=True)
+        inactive = CronFactory(name="inactive", is_active=False)
+
+        with mock.patch("mainframe.core.tasks.schedule_task") as schedule:
+            register_crons()
+
+        assert schedule.call_local.call_args_list == [mock.call(active)]
+        assert inactive.name not in HUEY._registry._registry
@@ -0,0 +1,95 @@
+import json
+from unittest import mock
+
+from freezegun import freeze_time
+
+from mainframe.core.tasks import (
+    clear_status,
+    expire_status,
+    get_latest_status,
+    get_status,
+    log_status,
+)
+
+
+@mock.patch("mainframe.core.tasks.get_redis_client")
+class TestTaskStatus:
+    @freeze_time("2026-02-06 00:14:00")
+    def test_log_status_pushes_and_trims_in_one_pipeline(self, redis_client):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+
+        assert log_status("foo", error="boom", status="error") == {
+            "errors": [{"timestamp": "2026-02-06T00:14:00+00:00", "msg": "boom"}],
+            "history": [{"timestamp": "2026-02-06T00:14:00+00:00", "status": "error"}],
+        }
+        assert pipe.mock_calls == [
+            mock.call.lpush(
+                "tasks.foo.history",
+                json.dumps(
+                    {"timestamp": "2026-02-06T00:14:00+00:00", "status": "error"}
+                ),
+            ),
+            mock.call.ltrim("tasks.foo.history", 0, 999),
+            mock.call.lpush(
+                "tasks.foo.errors",
+                json.dumps({"timestamp": "2026-02-06T00:14:00+00:00", "msg": "boom"}),
+            ),
+            mock.call.ltrim("tasks.foo.errors", 0, 29),
+            mock.call.execute(),
+        ]
+
+    def test_log_status_skips_successful_earthquake_checks(self, redis_client):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        assert log_status("[earthquakes] USGS", status="complete") == {}
+        assert pipe.mock_calls == []
+
+    def test_get_status_reads_a_page(self, redis_client):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [[b'{"status": "complete"}'], [], 11]
+
+        assert get_status("foo", page=2, page_size=10) == {
+            "count": 11,
+            "errors": [],
+            "history": [{"status": "complete"}],
+        }
+        assert pipe.mock_calls == [
+            mock.call.lrange("tasks.foo.history", 10, 19),
+            mock.call.lrange("tasks.foo.errors", 0, 29),
+            mock.call.llen("tasks.foo.history"),
+            mock.call.execute(),
+        ]
+
+    def test_get_status_empty(self, redis_client):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [[], [], 0]
+        assert get_status("foo") == {}
+
+    def test_get_latest_status_skips_progress_events(self, redis_client):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [
+            [b'{"count": 10}', b'{"status": "executing"}', b'{"status": "initial"}'],
+            [],
+            3,
+        ]
+        assert get_latest_status("foo") == "executing"
+
+        pipe.execute.return_value = [[b'{"count": 10}'], [], 1]
+        assert get_latest_status("foo") is None
+        pipe.execute.return_value = [[], [], 0]
+        assert get_latest_status("foo") is None
+
+    def test_clear_status(self, redis_client):
+        redis_client.return_value.delete.return_value = 2
+        assert clear_status("foo") == 2
+        assert redis_client.return_value.delete.call_args_list == [
+            mock.call("tasks.foo.history", "tasks.foo.errors", "tasks.foo")
+        ]
+
+    def test_expire_status(self, redis_client):
+        pipe = redis_client.return_value.pipeline.return_value.__enter__.return_value
+        expire_status("foo", 60)
+        assert pipe.mock_calls == [
+            mock.call.expire("tasks.foo.history", 60),
+            mock.call.expire("tasks.foo.errors", 60),
+            mock.call.execute(),
+        ]
@@ -6,7 +6,7 @@ from mainframe.crons.serializers import CronSerializer
 from tests.factories.crons import CronFactory
 
 
-@mock.patch("mainframe.crons.serializers.get_redis_client", return_value={})
+@mock.patch("mainframe.crons.serializers.get_status", return_value={})
 @mock.patch("mainframe.crons.models.schedule_task", return_value="{}")
 @pytest.mark.django_db
 class TestCronSerializer:
@@ -0,0 +1,65 @@
+from unittest import mock
+
+import pytest
+
+from mainframe.bots.models import Bot
+from mainframe.clients.scraper import NotModified
+from mainframe.earthquakes.management.commands.check_usgs import Command
+from mainframe.earthquakes.models import Earthquake
+from tests.factories.bots import BotFactory
+
+EVENT = {
+    "properties": {"time": 1700000000000, "place": "Vrancea", "mag": 4.2},
+    "geometry": {"coordinates": [26.5, 45.7, 120]},
+}
+
+
+class FakeResponse:
+    headers = {"ETag": '"v1"'}
+
+    @staticmethod
+    def json():
+        return {"features": [EVENT]}
+
+
+@pytest.mark.django_db
+@mock.patch("mainframe.earthquakes.management.base_check.healthchecks")
+@mock.patch(
+    "mainframe.earthquakes.management.base_check.send_telegram_message",
+    new_callable=mock.AsyncMock,
+)
+@mock.patch("mainframe.earthquakes.management.base_check.fetch")
+class TestHandle:
+    @pytest.fixture(autouse=True)
+    def bot(self, settings):
+        settings.EARTHQUAKE_DEFAULT_COORDINATES = (45.7, 26.5)
+        Bot.objects.all().delete()  # the async bot tests commit theirs
+        return BotFactory(
+            additional_data={"earthquake": {"last_check": {}, "min_magnitude": 4}}
+        )
+
+    def test_validators_are_cached_after_the_events_are_sent(self, fetch, send, _):
+        fetch.return_value = FakeResponse(), None
+        Command().handle()
+
+        fetch.return_value = None, NotModified(Command.url)
+        Command().handle()
+
+        assert [c.kwargs["validators"] for c in fetch.call_args_list] == [
+            None,
+            {"ETag": '"v1"'},
+        ]
+        assert len(send.call_args_list) == 1
+        assert Earthquake.objects.filter(location="Vrancea").count() == 1
+
+    def test_failed_runs_fetch_the_events_again(self, fetch, send, _):
+        fetch.return_value = FakeResponse(), None
+        send.side_effect = ValueError("telegram is down")
+        with pytest.raises(ValueError, match="telegram is down"):
+            Command().handle()
+
+        send.side_effect = None
+        Command().handle()
+
+        assert [c.kwargs["validators"] for c in fetch.call_args_list] == [None, None]
+        assert len(send.call_args_list) == 2  # noqa: PLR2004
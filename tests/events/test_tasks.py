@@ -0,0 +1,58 @@
+from datetime import date
+from unittest import mock
+
+import pytest
+from bs4 import BeautifulSoup
+from django.utils import timezone
+
+from mainframe.events.models import Event
+from mainframe.events.tasks import get_bands_concerts
+from tests.factories.source import SourceFactory
+
+HTML = """
+<div class="concert">
+  <span class="location">Form Space</span>
+  <span class="date">15.06.2026</span>
+  <a class="link" href="https://tickets.example.com/1?afflky=x&utm=y#top">tickets</a>
+</div>
+"""
+
+
+@pytest.mark.django_db
+class TestGetBandsConcerts:
+    def test_concerts(self):
+        config = {
+            "date_format": "%d.%m.%Y",
+            "selectors": {
+                "list": ".concert",
+                "location": ".location",
+                "start_date": ".date",
+                "url": ".link",
+            },
+        }
+        band, failing = SourceFactory.create_batch(2, config=config, type="band")
+        responses = [
+            (BeautifulSoup(HTML, "html.parser"), None),
+            (None, ValueError("boom")),
+        ]
+        with (
+            mock.patch(
+                "mainframe.events.tasks.fetch_many",
+                new=mock.AsyncMock(return_value=responses),
+            ) as fetch_many,
+            mock.patch("mainframe.events.tasks.logger") as logger,
+        ):
+            get_bands_concerts.call_local([band, failing])
+
+        assert fetch_many.call_args_list == [mock.call([band.url, failing.url])]
+        event = Event.objects.get()
+        assert (event.source, event.title, event.location, event.url) == (
+            band,
+            f"{band.name} @ Form Space",
+            "Form Space",
+            "https://tickets.example.com/1?afflky=x",
+        )
+        assert timezone.localtime(event.start_date).date() == date(2026, 6, 15)
+        assert logger.error.call_args_list == [
+            mock.call("Error fetching concerts", band=failing.name, error="boom")
+        ]
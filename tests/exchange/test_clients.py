@@ -0,0 +1,85 @@
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from multidict import CIMultiDict
+
+from mainframe.clients.scraper import AsyncResponse, NotModified
+from mainframe.exchange.management.clients import ECB, FetchExchangeRatesException
+from mainframe.exchange.models import ExchangeRate
+
+ECB_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gesmes:Envelope xmlns:gesmes="http://www.gesmes.org/xml/2002-08-01"
+    xmlns="http://www.ecb.int/vocabulary/2002-08-01/eurofxref">
+  <gesmes:Sender><gesmes:name>European Central Bank</gesmes:name></gesmes:Sender>
+  <Cube>
+    <Cube time="2026-02-06">
+      <Cube currency="USD" rate="1.0812"/>
+      <Cube currency="RON" rate="4.9771"/>
+    </Cube>
+  </Cube>
+</gesmes:Envelope>"""
+
+
+def ecb_response(etag):
+    return AsyncResponse(ECB.url, 200, ECB_XML, headers=CIMultiDict(ETag=etag))
+
+
+def fetch_many(*results):
+    return mock.patch(
+        "mainframe.exchange.management.clients.fetch_many",
+        new=mock.AsyncMock(return_value=list(results)),
+    )
+
+
+@pytest.mark.django_db
+class TestFetch:
+    def test_rates_are_saved(self):
+        with fetch_many((AsyncResponse(ECB.url, 200, ECB_XML), None)) as fetch:
+            assert ECB(mock.Mock()).fetch(full=False) == 2  # noqa: PLR2004
+
+        assert fetch.call_args_list == [
+            mock.call(
+                [(ECB.url, {"validators": None})], soup=False, timeout=20, retries=1
+            )
+        ]
+        assert sorted(ExchangeRate.objects.values_list("symbol", "value")) == [
+            ("RONEUR", Decimal("4.9771")),
+            ("USDEUR", Decimal("1.0812")),
+        ]
+
+    def test_not_modified(self):
+        logger = mock.Mock()
+        with fetch_many((None, NotModified(ECB.url))):
+            assert ECB(logger).fetch(full=False) == 0
+        assert logger.info.call_args_list[1] == mock.call(
+            "Rates not modified", url=ECB.url
+        )
+        assert not ExchangeRate.objects.exists()
+
+    def test_error(self):
+        with (
+            fetch_many((None, ValueError("boom"))),
+            pytest.raises(FetchExchangeRatesException),
+        ):
+            ECB(mock.Mock()).fetch(full=False)
+
+    def test_validators_are_cached_once_the_rates_are_saved(self):
+        with fetch_many((ecb_response('"v1"'), None)):
+            ECB(mock.Mock()).fetch(full=False)
+        with fetch_many((None, NotModified(ECB.url))) as fetch:
+            ECB(mock.Mock()).fetch(full=False)
+
+        assert fetch.call_args.args[0] == [(ECB.url, {"validators": {"ETag": '"v1"'}})]
+
+    def test_failed_saves_keep_the_validators(self):
+        with (
+            fetch_many((ecb_response('"v1"'), None)),
+            mock.patch.object(
+                ExchangeRate.objects, "bulk_create", side_effect=ValueError
+            ),
+            pytest.raises(ValueError),
+        ):
+            ECB(mock.Mock()).fetch(full=False)
+        assert cache.get(ECB.get_validators_key(ECB.url)) is None
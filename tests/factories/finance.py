@@ -4,7 +4,15 @@ import factory
 from django.conf import settings
 from django.utils import timezone
 
-from mainframe.finance.models import Account, Category, Credit, Payment, Transaction
+from mainframe.finance.models import (
+    Account,
+    Category,
+    CategoryRule,
+    Credit,
+    Payment,
+    Timetable,
+    Transaction,
+)
 
 
 class AccountFactory(factory.django.DjangoModelFactory):
@@ -24,6 +32,14 @@ class CategoryFactory(factory.django.DjangoModelFactory):
     id = factory.Sequence(lambda n: f"id-{n}")
 
 
+class CategoryRuleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CategoryRule
+
+    category = factory.SubFactory("tests.factories.finance.CategoryFactory")
+    pattern = factory.Sequence(lambda n: f"pattern-{n}")
+
+
 class CreditFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Credit
@@ -45,6 +61,17 @@ class PaymentFactory(factory.django.DjangoModelFactory):
     remaining = 0
 
 
+class TimetableFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Timetable
+
+    amortization_table = factory.LazyFunction(list)
+    credit = factory.SubFactory("tests.factories.finance.CreditFactory")
+    date = "2000-01-01"
+    ircc = 0
+    margin = 0
+
+
 class TransactionFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Transaction
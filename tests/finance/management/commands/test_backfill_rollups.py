@@ -0,0 +1,46 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from mainframe.finance.models import MonthlyRollup
+from tests.factories.finance import AccountFactory, CategoryFactory, TransactionFactory
+
+
+@pytest.mark.django_db
+class TestBackfillRollupsCommand:
+    def test_rebuilds_the_rollups(self):
+        food = CategoryFactory(id="food")
+        account, other = AccountFactory.create_batch(2)
+        for account_ in (account, other):
+            TransactionFactory(
+                account=account_,
+                amount=-3,
+                category=food,
+                currency="RON",
+                started_at="2026-05-10T10:00:00Z",
+            )
+        MonthlyRollup.objects.all().delete()
+        MonthlyRollup.objects.create(
+            account=account,
+            amount=-1,
+            category=food,
+            count=1,
+            currency="RON",
+            month=date(2020, 1, 1),
+        )
+
+        call_command("backfill_rollups", account=account.id)
+
+        assert list(
+            MonthlyRollup.objects.values_list("account", "month", "amount", "count")
+        ) == [(account.id, date(2026, 5, 1), Decimal(-3), 1)]
+
+        call_command("backfill_rollups")
+        assert sorted(
+            MonthlyRollup.objects.values_list("account", "month", "amount", "count")
+        ) == [
+            (account.id, date(2026, 5, 1), Decimal(-3), 1),
+            (other.id, date(2026, 5, 1), Decimal(-3), 1),
+        ]
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from mainframe.finance.models import Category, Transaction
+from tests.factories.finance import (
+    AccountFactory,
+    CategoryFactory,
+    TransactionFactory,
+)
+
+
+def explain(queryset) -> str:
+    """The plan of the queryset, with sequential scans discouraged"""
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+class TestTransactionIndexes:
+    @pytest.fixture(autouse=True)
+    def transactions(self):
+        """A few years of transactions, so the planner has statistics to go by"""
+        # bulk_create, since Category.save lowercases the id
+        categories = Category.objects.bulk_create(
+            CategoryFactory.build(id=category)
+            for category in ("food", "fuel", "rent", Category.UNIDENTIFIED)
+        )
+        accounts = AccountFactory.create_batch(10)
+        start = datetime(2021, 1, 1, tzinfo=timezone.get_current_timezone())
+        Transaction.objects.bulk_create(
+            TransactionFactory.build(
+                account=accounts[i % len(accounts)],
+                amount=-i if i % 2 else i,
+                category=categories[i % len(categories)],
+                confirmed_by=i % 3,
+                description=f"description {i % 300}",
+                started_at=start + timedelta(days=i),
+            )
+            for i in range(1200)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Transaction._meta.db_table}")
+        return accounts
+
+    def test_started_in_is_a_range(self):
+        tz = timezone.get_current_timezone()
+        queryset = Transaction.objects.started_in(2025, 12)
+        assert "EXTRACT" not in str(queryset.query)
+        assert str(queryset.query) == str(
+            Transaction.objects.filter(
+                started_at__gte=datetime(2025, 12, 1, tzinfo=tz),
+                started_at__lt=datetime(2026, 1, 1, tzinfo=tz),
+            ).query
+        )
+
+    def test_list(self):
+        queryset = Transaction.objects.order_by("-started_at")
+        assert "transaction_started_idx" in explain(queryset[:25])
+
+    def test_list_by_account(self, transactions):
+        queryset = (
+            Transaction.objects.filter(account=transactions[0])
+            .started_in(2022, 1)
+            .order_by("-started_at")
+        )
+        assert "transaction_account_idx" in explain(queryset[:25])
+
+    def test_account_expenses(self, transactions):
+        queryset = (
+            Transaction.objects.expenses()
+            .filter(account=transactions[1])
+            .started_in(2022)
+            .values("started_at", "category", "amount")
+            .order_by()
+        )
+        assert "transaction_expenses_idx" in explain(queryset)
+
+    def test_expenses_by_category(self):
+        queryset = Transaction.objects.expenses().filter(
+            category="food", confirmed_by=Transaction.CONFIRMED_BY_ML
+        )
+        assert "transaction_category_idx" in explain(queryset)
+
+    def test_unidentified(self):
+        queryset = Transaction.objects.expenses().filter(
+            category=Category.UNIDENTIFIED,
+            confirmed_by=Transaction.CONFIRMED_BY_UNCONFIRMED,
+            description__in=["description 1", "description 3"],
+        )
+        assert "transaction_unidentified_idx" in explain(queryset)
@@ -0,0 +1,185 @@
+from datetime import date
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from mainframe.finance.models import (
+    Category,
+    MonthlyRollup,
+    Transaction,
+    deferred_rollups,
+    refresh_rollups,
+)
+from tests.factories.finance import AccountFactory, CategoryFactory, TransactionFactory
+
+
+def get_rollups():
+    return list(
+        MonthlyRollup.objects.order_by("account", "month", "category").values_list(
+            "month", "category", "currency", "amount", "count"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestMonthlyRollups:
+    @pytest.fixture
+    def account(self):
+        return AccountFactory()
+
+    @pytest.fixture
+    def food(self):
+        return CategoryFactory(id="food")
+
+    def test_save(self, account, food):
+        kwargs = {"account": account, "category": food, "currency": "RON"}
+        transaction = TransactionFactory(
+            amount=-10, started_at="2026-01-31T22:30:00Z", **kwargs
+        )
+        TransactionFactory(amount=-5, started_at="2026-02-10T10:00:00Z", **kwargs)
+        TransactionFactory(amount=100, started_at="2026-02-11T10:00:00Z", **kwargs)
+        # the month is in the current timezone, Europe/Bucharest
+        assert get_rollups() == [
+            (date(2026, 2, 1), food.id, "RON", Decimal(-15), 2),
+        ]
+
+        transaction.started_at = "2026-01-01T10:00:00Z"
+        transaction.save()
+        assert get_rollups() == [
+            (date(2026, 1, 1), food.id, "RON", Decimal(-10), 1),
+            (date(2026, 2, 1), food.id, "RON", Decimal(-5), 1),
+        ]
+
+        transaction.delete()
+        assert get_rollups() == [
+            (date(2026, 2, 1), food.id, "RON", Decimal(-5), 1),
+        ]
+
+    def test_save_without_rollup_fields(self, account, food):
+        transaction = TransactionFactory(account=account, amount=-1, category=food)
+        with mock.patch(
+            "mainframe.finance.models.transaction.refresh_rollups"
+        ) as refresh_rollups:
+            transaction.description = "lidl"
+            transaction.save(update_fields=["description"])
+        assert refresh_rollups.call_args_list == []
+
+    def test_categorize_and_delete(self, account, food):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        started_at = "2026-03-10T10:00:00Z"
+        Transaction.objects.bulk_create(
+            TransactionFactory.build(
+                account=account,
+                amount=-amount,
+                category=unidentified,
+                currency="RON",
+                description=description,
+                started_at=started_at,
+            )
+            for amount, description in ((1, "lidl"), (2, "lidl"), (3, "omv"))
+        )
+        assert get_rollups() == [
+            (date(2026, 3, 1), unidentified.id, "RON", Decimal(-6), 3),
+        ]
+
+        Transaction.objects.categorize({"lidl": food.id})
+        assert get_rollups() == [
+            (date(2026, 3, 1), unidentified.id, "RON", Decimal(-3), 1),
+            (date(2026, 3, 1), food.id, "RON", Decimal(-3), 2),
+        ]
+
+        Transaction.objects.filter(description="omv").delete()
+        assert get_rollups() == [
+            (date(2026, 3, 1), food.id, "RON", Decimal(-3), 2),
+        ]
+
+    def test_category_delete(self, account, food):
+        Category.objects.bulk_create([CategoryFactory.build(id=Category.UNIDENTIFIED)])
+        TransactionFactory(
+            account=account,
+            amount=-7,
+            category=food,
+            currency="RON",
+            started_at="2026-03-10T10:00:00Z",
+        )
+        food.delete()
+        assert get_rollups() == [
+            (date(2026, 3, 1), Category.UNIDENTIFIED, "RON", Decimal(-7), 1),
+        ]
+
+    def test_deferred(self, account, food):
+        with (
+            mock.patch(
+                "mainframe.finance.models.transaction.MonthlyRollup.objects.bulk_create"
+            ) as bulk_create,
+            deferred_rollups(),
+        ):
+            for started_at in ("2026-01-10T10:00:00Z", "2026-04-10T10:00:00Z"):
+                TransactionFactory(
+                    account=account, amount=-1, category=food, started_at=started_at
+                )
+            assert bulk_create.call_args_list == []
+
+        [call] = bulk_create.call_args_list
+        assert [r.month for r in call.args[0]] == [date(2026, 1, 1), date(2026, 4, 1)]
+
+    def test_refresh_over_existing_rollups(self, account, food):
+        TransactionFactory(
+            account=account,
+            amount=-4,
+            category=food,
+            currency="RON",
+            started_at="2026-06-10T10:00:00Z",
+        )
+        ranges = {account.id: (date(2026, 6, 1), date(2026, 6, 1))}
+
+        with CaptureQueriesContext(connection) as queries:
+            refresh_rollups(ranges)
+            refresh_rollups(ranges)
+
+        assert get_rollups() == [
+            (date(2026, 6, 1), food.id, "RON", Decimal(-4), 1),
+        ]
+        locks = [q["sql"] for q in queries if q["sql"].endswith("FOR UPDATE")]
+        assert len(locks) == 2  # noqa: PLR2004
+        assert all('FROM "finance_account"' in sql for sql in locks)
+
+
+@pytest.mark.django_db
+class TestBackfillMigration:
+    def test_backfills_the_expenses(self):
+        food = CategoryFactory(id="food")
+        account, other = AccountFactory.create_batch(2)
+        for account_, amount, started_at in (
+            (account, -2, "2026-01-31T22:30:00Z"),
+            (account, -3, "2026-02-10T10:00:00Z"),
+            (account, 50, "2026-02-11T10:00:00Z"),
+            (other, -4, "2026-02-12T10:00:00Z"),
+        ):
+            TransactionFactory(
+                account=account_,
+                amount=amount,
+                category=food,
+                currency="RON",
+                started_at=started_at,
+            )
+        MonthlyRollup.objects.all().delete()
+
+        migration = import_module(
+            "mainframe.finance.migrations.0075_backfill_monthly_rollups"
+        )
+        migration.backfill_monthly_rollups(apps, None)
+
+        assert sorted(
+            MonthlyRollup.objects.values_list("account", "month", "amount", "count")
+        ) == [
+            (account.id, date(2026, 2, 1), Decimal(-5), 2),
+            (other.id, date(2026, 2, 1), Decimal(-4), 1),
+        ]
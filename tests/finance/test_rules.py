@@ -0,0 +1,109 @@
+from unittest import mock
+
+import pytest
+
+from mainframe.finance.models import CategoryRule, Transaction
+from mainframe.finance.rules import RuleCache, RuleIndex
+from tests.factories.finance import CategoryRuleFactory
+
+
+class TestRuleIndex:
+    def test_first_match_in_the_description_wins(self):
+        index = RuleIndex(
+            [
+                CategoryRule(category_id="food", pattern="lidl"),
+                CategoryRule(category_id="fuel", pattern="OMV"),
+            ]
+        )
+        assert index.match("Lidl near OMV").category_id == "food"
+        assert index.match("lidl").category_id == "food"
+        assert index.match("omv LIDL").category_id == "fuel"
+        assert index.match("kaufland") is None
+
+    def test_highest_priority_wins_anywhere(self):
+        index = RuleIndex(
+            [
+                CategoryRule(category_id="food", pattern="lidl"),
+                CategoryRule(category_id="refunds", pattern="refund", priority=10),
+            ]
+        )
+        assert index.match("LIDL REFUND").category_id == "refunds"
+        assert index.match("REFUND LIDL").category_id == "refunds"
+        assert index.match("LIDL").category_id == "food"
+
+    def test_same_position_by_priority_then_length(self):
+        index = RuleIndex(
+            [
+                CategoryRule(category_id="a", pattern="uber"),
+                CategoryRule(category_id="b", pattern="uber eats"),
+                CategoryRule(category_id="c", pattern="uber trip", priority=1),
+            ]
+        )
+        assert index.match("UBER EATS").category_id == "b"
+        assert index.match("uber trip").category_id == "c"
+        assert index.match("uber").category_id == "a"
+
+    def test_patterns_are_not_regexes(self):
+        index = RuleIndex([CategoryRule(category_id="shop", pattern="emag.ro (")])
+        assert index.match("EMAG.RO (1/3)").category_id == "shop"
+        assert index.match("emagxro (") is None
+
+    def test_no_rules(self):
+        index = RuleIndex([])
+        assert index.match("lidl") is None
+        assert index.categories(["lidl"]) == {}
+
+    def test_categories_skip_type_only_rules(self):
+        index = RuleIndex(
+            [
+                CategoryRule(category_id="food", pattern="lidl"),
+                CategoryRule(pattern="atm", type=Transaction.TYPE_ATM),
+            ]
+        )
+        assert index.categories(["lidl", "atm", "omv"]) == {"lidl": "food"}
+
+    def test_apply(self):
+        index = RuleIndex(
+            [
+                CategoryRule(category_id="food", pattern="lidl"),
+                CategoryRule(pattern="revolut", type=Transaction.TYPE_TRANSFER),
+            ]
+        )
+        lidl, revolut, other = (
+            Transaction(description="LIDL", type=Transaction.TYPE_CARD_PAYMENT),
+            Transaction(description="Revolut**1234", type=Transaction.TYPE_TOPUP),
+            Transaction(description="other"),
+        )
+
+        assert index.apply([lidl, revolut, other]) == 2  # noqa: PLR2004
+        assert (lidl.category_id, lidl.confirmed_by, lidl.type) == (
+            "food",
+            Transaction.CONFIRMED_BY_RULE,
+            Transaction.TYPE_CARD_PAYMENT,
+        )
+        assert (revolut.confirmed_by, revolut.type) == (
+            Transaction.CONFIRMED_BY_UNCONFIRMED,
+            Transaction.TYPE_TRANSFER,
+        )
+        assert other.confirmed_by == Transaction.CONFIRMED_BY_UNCONFIRMED
+
+
+@pytest.mark.django_db
+class TestRuleCache:
+    def test_compiled_again_only_after_changes(self):
+        cache = RuleCache()
+        rule = CategoryRuleFactory(pattern="lidl")
+        with mock.patch(
+            "mainframe.finance.rules.RuleIndex", wraps=RuleIndex
+        ) as rule_index:
+            index = cache.get()
+            assert cache.get() is index
+            assert index.match("lidl") == rule
+
+            rule.pattern = "kaufland"
+            rule.save()
+            assert cache.get().match("kaufland") == rule
+
+            rule.delete()
+            assert cache.get().match("kaufland") is None
+        assert len(rule_index.call_args_list) == 3  # noqa: PLR2004
@@ -0,0 +1,123 @@
+from unittest import mock
+
+import pytest
+
+from mainframe.finance.models import Category, Transaction
+from mainframe.finance.rules import rules
+from mainframe.finance.tasks import predict, train
+from tests.factories.finance import (
+    AccountFactory,
+    CategoryFactory,
+    CategoryRuleFactory,
+    TransactionFactory,
+)
+
+
+@pytest.mark.django_db
+@mock.patch("mainframe.finance.tasks.log_status")
+class TestPredict:
+    @pytest.fixture(autouse=True)
+    def clear_rules(self):
+        rules.clear()
+
+    def test_each_description_is_predicted_once(self, _, django_assert_num_queries):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        food, fuel = CategoryFactory(id="food"), CategoryFactory(id="fuel")
+        kwargs = {"account": AccountFactory(), "amount": -1, "category": unidentified}
+        lidl = TransactionFactory.create_batch(3, description="lidl", **kwargs)
+        omv = TransactionFactory(description="omv", **kwargs)
+        confirmed = TransactionFactory(
+            confirmed_by=Transaction.CONFIRMED_BY_HUMAN, description="omv", **kwargs
+        )
+
+        with (
+            mock.patch(
+                "mainframe.clients.prediction.SKLearn.predict",
+                return_value=["food", "fuel"],
+            ) as sklearn_predict,
+            # the rules' version and the rules, one update per category
+            django_assert_num_queries(4),
+        ):
+            counts = predict.call_local(["lidl", "omv"], mock.Mock())
+
+        assert counts == {"food": 3, "fuel": 1}
+        assert sklearn_predict.call_args_list == [mock.call(["lidl", "omv"])]
+        for transaction in [*lidl, omv, confirmed]:
+            transaction.refresh_from_db()
+        assert {t.category_suggestion_id for t in lidl} == {food.id}
+        assert omv.category_suggestion_id == fuel.id
+        assert confirmed.category_suggestion_id is None
+        assert {t.category_id for t in [*lidl, omv]} == {unidentified.id}
+
+    def test_rules_are_applied_before_the_model(self, _):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        food, fuel = CategoryFactory(id="food"), CategoryFactory(id="fuel")
+        CategoryRuleFactory(category=fuel, pattern="OMV ")
+        kwargs = {"account": AccountFactory(), "amount": -1, "category": unidentified}
+        lidl = TransactionFactory(description="lidl", **kwargs)
+        omv = TransactionFactory(description="omv petrom", **kwargs)
+
+        with mock.patch(
+            "mainframe.clients.prediction.SKLearn.predict", return_value=["food"]
+        ) as sklearn_predict:
+            counts = predict.call_local(["lidl", "omv petrom"], mock.Mock())
+
+        assert counts == {"food": 1}
+        assert sklearn_predict.call_args_list == [mock.call(["lidl"])]
+        lidl.refresh_from_db()
+        omv.refresh_from_db()
+        assert (lidl.category_id, lidl.category_suggestion_id) == (
+            unidentified.id,
+            food.id,
+        )
+        assert (omv.category_id, omv.confirmed_by) == (
+            fuel.id,
+            Transaction.CONFIRMED_BY_RULE,
+        )
+
+    def test_all_covered_by_rules(self, _):
+        Category.objects.bulk_create([CategoryFactory.build(id=Category.UNIDENTIFIED)])
+        CategoryRuleFactory(pattern="lidl")
+
+        with mock.patch(
+            "mainframe.clients.prediction.SKLearn.predict"
+        ) as sklearn_predict:
+            assert predict.call_local(["lidl"], mock.Mock()) == {}
+        assert sklearn_predict.call_args_list == []
+
+
+@pytest.mark.django_db
+class TestTrain:
+    @mock.patch("mainframe.clients.prediction.SKLearn.train_incremental")
+    def test_incremental(self, train_incremental):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        food, fuel = CategoryFactory(id="food"), CategoryFactory(id="fuel")
+        kwargs = {"account": AccountFactory(), "amount": -1}
+        confirmed = TransactionFactory(
+            category=fuel, confirmed_by=Transaction.CONFIRMED_BY_ML, **kwargs
+        )
+        TransactionFactory(category=food, **kwargs)
+        TransactionFactory(
+            category=unidentified, confirmed_by=Transaction.CONFIRMED_BY_ML, **kwargs
+        )
+        logger = mock.Mock()
+
+        train.call_local(logger, incremental=True)
+
+        [call] = train_incremental.call_args_list
+        queryset, classes, call_logger = call.args
+        assert list(queryset) == [confirmed]
+        assert (classes, call_logger) == (["food", "fuel"], logger)
+
+    def test_update_sets_updated_at(self):
+        transaction = TransactionFactory()
+        updated_at = transaction.updated_at
+        Transaction.objects.filter(id=transaction.id).update(description="foo")
+        transaction.refresh_from_db()
+        assert transaction.updated_at > updated_at
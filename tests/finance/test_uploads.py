@@ -0,0 +1,167 @@
+from unittest import mock
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from huey.signals import SIGNAL_COMPLETE, SIGNAL_ERROR, SIGNAL_EXECUTING
+
+from mainframe.finance.models import Category, Transaction
+from mainframe.finance.uploads import UPLOAD_STATUS_TTL, run_upload, start_upload
+from tests.clients.finance.test_statement import raiffeisen_row, raiffeisen_statement
+from tests.factories.finance import CategoryFactory
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@mock.patch("mainframe.finance.uploads.process_upload")
+@mock.patch("mainframe.finance.uploads.log_status", return_value={"history": []})
+@mock.patch("mainframe.finance.uploads.uuid4", return_value=mock.Mock(hex="abc"))
+class TestStartUpload:
+    def test_stores_the_file_and_enqueues_the_job(
+        self, _, log_status, process_upload, media_root
+    ):
+        file = SimpleUploadedFile("statement.csv", b"foo")
+        assert start_upload("statement", file) == {"job_id": "abc", "history": []}
+
+        assert (media_root / "uploads/abc/statement.csv").read_bytes() == b"foo"
+        assert log_status.call_args_list == [
+            mock.call(
+                "upload.abc", kind="statement", name="statement.csv", status="initial"
+            )
+        ]
+        assert process_upload.call_args_list == [
+            mock.call("abc", "statement", "uploads/abc/statement.csv", "statement.csv")
+        ]
+
+    def test_unknown_kind(self, _, log_status, process_upload):
+        with pytest.raises(ValueError, match="Unknown upload kind: foo"):
+            start_upload("foo", SimpleUploadedFile("foo.csv", b"foo"))
+        assert log_status.call_args_list == process_upload.call_args_list == []
+
+
+@pytest.mark.django_db
+@mock.patch("mainframe.finance.uploads.expire_status")
+@mock.patch("mainframe.finance.uploads.log_status")
+@mock.patch("mainframe.clients.finance.statement.backup_finance_model")
+class TestRunUpload:
+    @pytest.fixture(autouse=True)
+    def unidentified(self):
+        # bulk_create, since Category.save lowercases the id
+        Category.objects.bulk_create([CategoryFactory.build(id=Category.UNIDENTIFIED)])
+
+    def test_statement(self, _, log_status, expire_status):
+        path = default_storage.save(
+            "uploads/abc/statement.xlsx",
+            raiffeisen_statement(
+                raiffeisen_row("02/02/2026", 1, None, "Lidl"),
+                raiffeisen_row("03/02/2026", 2, None, "Coffee"),
+            ),
+        )
+        with mock.patch("mainframe.clients.finance.statement.IMPORT_BATCH_SIZE", 1):
+            result = run_upload("abc", "statement", path, "statement.xlsx")
+
+        assert result == {
+            "message": "Imported 2 transactions, skipped 0 already imported",
+            "skipped": 0,
+            "transactions": 2,
+        }
+        assert Transaction.objects.count() == 2  # noqa: PLR2004
+        details = {"kind": "statement", "name": "statement.xlsx"}
+        assert log_status.call_args_list == [
+            mock.call("upload.abc", **details, status=SIGNAL_EXECUTING),
+            mock.call(
+                "upload.abc",
+                **details,
+                status=SIGNAL_EXECUTING,
+                skipped=0,
+                transactions=1,
+            ),
+            mock.call(
+                "upload.abc",
+                **details,
+                status=SIGNAL_EXECUTING,
+                skipped=0,
+                transactions=2,
+            ),
+            mock.call("upload.abc", **details, status=SIGNAL_COMPLETE, **result),
+        ]
+        assert not default_storage.exists(path)
+        assert expire_status.call_args_list == [
+            mock.call("upload.abc", UPLOAD_STATUS_TTL)
+        ]
+
+    def test_invalid_file(self, _, log_status, expire_status):
+        path = default_storage.save(
+            "uploads/abc/statement.xlsx",
+            raiffeisen_statement(raiffeisen_row("31/02/2026", 1, None, "Lidl")),
+        )
+        assert run_upload("abc", "statement", path, "statement.xlsx") is None
+
+        assert not Transaction.objects.exists()
+        assert log_status.call_args_list[-1].kwargs["status"] == SIGNAL_ERROR
+        assert (
+            log_status.call_args_list[-1]
+            .kwargs["error"]
+            .startswith("Invalid file: statement.xlsx")
+        )
+        assert not default_storage.exists(path)
+        assert expire_status.call_args_list == [
+            mock.call("upload.abc", UPLOAD_STATUS_TTL)
+        ]
+
+
+@pytest.mark.django_db
+class TestUploadViews:
+    @pytest.mark.parametrize(
+        ("url", "kind"),
+        [
+            ("finance:crypto-list", "crypto"),
+            ("finance:crypto-pnl", "crypto-pnl"),
+            ("finance:payments-list", "payments"),
+            ("finance:stocks-list", "stocks"),
+            ("finance:stocks-pnl", "stocks-pnl"),
+            ("finance:timetables-list", "timetable"),
+            ("finance:transactions-upload", "statement"),
+        ],
+    )
+    @mock.patch("mainframe.finance.uploads.process_upload")
+    @mock.patch("mainframe.finance.uploads.log_status", return_value={"history": []})
+    def test_upload_is_accepted(
+        self, _, process_upload, client, kind, staff_session, url
+    ):
+        response = client.post(
+            reverse(url),
+            {"file": SimpleUploadedFile("file.csv", b"foo")},
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert process_upload.call_args_list == [
+            mock.call(job_id, kind, f"uploads/{job_id}/file.csv", "file.csv")
+        ]
+
+    @mock.patch("mainframe.finance.viewsets.upload.get_status")
+    def test_status(self, get_status, client, staff_session):
+        get_status.return_value = {"history": [{"status": "complete"}]}
+        response = client.get(
+            reverse("finance:uploads-detail", args=("abc",)),
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.json() == {
+            "job_id": "abc",
+            "history": [{"status": "complete"}],
+        }
+        assert get_status.call_args_list == [mock.call("upload.abc", 1, 1000)]
+
+    @mock.patch("mainframe.finance.viewsets.upload.get_status", return_value={})
+    def test_status_not_found(self, _, client, staff_session):
+        response = client.get(
+            reverse("finance:uploads-detail", args=("abc",)),
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.status_code == 404
@@ -1,6 +1,9 @@
+from unittest import mock
+
 import pytest
 from django.urls import reverse
 
+from mainframe.finance.models import Account, Category, CategoryRule, Transaction
 from tests.factories.finance import (
     AccountFactory,
     CategoryFactory,
@@ -63,6 +66,37 @@ class TestAccounts:
         }
 
 
+@pytest.mark.django_db
+class TestCategoryRules:
+    url = reverse("finance:category-rules-list")
+
+    def test_create(self, client, staff_session):
+        food = CategoryFactory(id="food")
+        response = client.post(
+            self.url,
+            {"category": food.id, "pattern": "lidl"},
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.status_code == 201
+        rule = CategoryRule.objects.get()
+        assert (rule.category, rule.pattern, rule.priority, rule.type) == (
+            food,
+            "lidl",
+            0,
+            "",
+        )
+
+    def test_category_or_type_required(self, client, staff_session):
+        response = client.post(
+            self.url, {"pattern": "lidl"}, HTTP_AUTHORIZATION=staff_session.token
+        )
+        assert response.status_code == 400
+        assert response.json() == {
+            "non_field_errors": ["A category or a type is required"]
+        }
+        assert not CategoryRule.objects.exists()
+
+
 @pytest.mark.django_db
 class TestCredit:
     def test_list(self, client, django_assert_num_queries, staff_session):
@@ -90,3 +124,308 @@ class TestPayments:
                 reverse("finance:payments-list"), HTTP_AUTHORIZATION=staff_session.token
             )
         assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestTransactions:
+    def test_list(self, client, django_assert_num_queries, staff_session):
+        account = AccountFactory(bank="foo")
+        # bulk_create, since Category.save lowercases the id
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        TransactionFactory(account=account, amount=-10, category=unidentified)
+        TransactionFactory(account=account, amount=-5, type=Transaction.TYPE_ATM)
+        TransactionFactory(account=account, amount=30)
+        url = reverse("finance:transactions-list") + "?only_expenses=true"
+
+        with django_assert_num_queries(8):
+            response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert data["page_amount"] == -15
+        assert data["types"] == [Transaction.TYPE_ATM, Transaction.TYPE_UNIDENTIFIED]
+        assert data["accounts"] == [
+            {"id": account.id, "bank": "foo", "type": Account.TYPE_CURRENT}
+        ]
+        assert data["unidentified_count"] == 1
+
+        with django_assert_num_queries(4):  # session, user, count, results
+            response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.json()["page_amount"] == -15
+        assert response.json()["unidentified_count"] == 1
+
+    def test_filters_are_cleared_on_changes(
+        self, client, django_capture_on_commit_callbacks, staff_session
+    ):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        url = reverse("finance:transactions-list")
+        response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.json()["accounts"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            account = AccountFactory()
+        response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert [a["id"] for a in response.json()["accounts"]] == [account.id]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Transaction.objects.bulk_create(
+                TransactionFactory.build(
+                    account=account, category=unidentified, amount=-1
+                )
+                for _ in range(2)
+            )
+        response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.json()["unidentified_count"] == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Transaction.objects.update(category=CategoryFactory(id="food"))
+        response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.json()["unidentified_count"] == 0
+        assert response.json()["categories"] == [Category.UNIDENTIFIED, "food"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            transaction = TransactionFactory(
+                account=account, category=unidentified, amount=-1
+            )
+        response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.json()["unidentified_count"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.delete(
+                reverse("finance:transactions-detail", args=(transaction.id,)),
+                HTTP_AUTHORIZATION=staff_session.token,
+            )
+        assert response.status_code == 204
+        response = client.get(url, HTTP_AUTHORIZATION=staff_session.token)
+        assert response.json()["unidentified_count"] == 0
+
+    def test_search(self, client, staff_session):
+        account = AccountFactory()
+        lidl = TransactionFactory(
+            account=account,
+            description="Lidl Cluj",
+            started_at="2024-01-02 23:00:00+00:00",
+        )
+        lidl_twice = TransactionFactory(
+            account=account,
+            description="Lidl Lidl",
+            started_at="2024-03-02 10:00:00+00:00",
+        )
+        TransactionFactory(account=account, description="Kaufland")
+        url = reverse("finance:transactions-list")
+
+        def search(term):
+            response = client.get(
+                url, {"search_term": term}, HTTP_AUTHORIZATION=staff_session.token
+            )
+            assert response.status_code == 200
+            return [t["id"] for t in response.json()["results"]]
+
+        assert search("lid") == [lidl_twice.id, lidl.id]
+        assert search("lidl clu") == [lidl.id]
+        assert search("2024-01-02") == [lidl.id]
+        assert search("aldi") == []
+        assert search("'") == []
+
+    def test_bulk_update(self, client, django_assert_num_queries, staff_session):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        food, fuel = CategoryFactory(id="food"), CategoryFactory(id="fuel")
+        account = AccountFactory()
+        kwargs = {"account": account, "amount": -1, "category": unidentified}
+        lidl = TransactionFactory.create_batch(2, description="lidl", **kwargs)
+        kaufland = TransactionFactory(description="kaufland", **kwargs)
+        omv = TransactionFactory(description="omv", **kwargs)
+        confirmed = TransactionFactory(
+            description="omv",
+            confirmed_by=Transaction.CONFIRMED_BY_HUMAN,
+            **kwargs,
+        )
+        income = TransactionFactory(
+            account=account, amount=1, category=unidentified, description="lidl"
+        )
+        url = reverse("finance:transactions-bulk-update")
+        data = [
+            {"description": "lidl", "category": "food"},
+            {"description": "kaufland", "category": "food"},
+            {"description": "omv", "category": "fuel"},
+        ]
+
+        # session, user, categories, savepoint, the months and one update per
+        # category, the rollups refresh (savepoint, account lock, select,
+        # delete, sum, insert, release), release
+        with django_assert_num_queries(16):
+            response = client.put(
+                url,
+                data,
+                content_type="application/json",
+                HTTP_AUTHORIZATION=staff_session.token,
+            )
+        assert response.status_code == 200
+        assert response.json() == {
+            "counts": {"food": 3, "fuel": 1},
+            "msg": {"message": "Successfully updated 4 transaction categories"},
+        }
+        for transaction in [*lidl, kaufland, omv, confirmed, income]:
+            transaction.refresh_from_db()
+        assert {t.category_id for t in [*lidl, kaufland]} == {food.id}
+        assert (omv.category_id, omv.confirmed_by) == (
+            fuel.id,
+            Transaction.CONFIRMED_BY_ML,
+        )
+        assert confirmed.category_id == income.category_id == unidentified.id
+
+        response = client.put(
+            f"{url}?list=true",
+            data,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.json()["counts"] == {"food": 0, "fuel": 0}
+        assert response.json()["count"] == 6
+
+    @pytest.mark.parametrize(
+        "data, error",
+        [
+            (
+                [{"description": "lidl"}],
+                "Expected a list of descriptions and categories",
+            ),
+            (["lidl"], "Expected a list of descriptions and categories"),
+            ([{"description": "lidl", "category": "nope"}], "Unknown categories: nope"),
+        ],
+    )
+    def test_bulk_update_invalid(self, client, data, error, staff_session):
+        response = client.put(
+            reverse("finance:transactions-bulk-update"),
+            data,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.status_code == 400
+        assert response.json() == {"detail": error}
+
+    def test_year_and_month(self, client, staff_session):
+        account = AccountFactory()
+        january = TransactionFactory(
+            account=account,
+            started_at="2024-01-31 22:30:00+00:00",  # 1st Feb local
+        )
+        february = TransactionFactory(
+            account=account, started_at="2024-02-29 21:00:00+00:00"
+        )
+        TransactionFactory(account=account, started_at="2025-02-10 10:00:00+00:00")
+        url = reverse("finance:transactions-list")
+
+        def filter_by(**params):
+            response = client.get(url, params, HTTP_AUTHORIZATION=staff_session.token)
+            results = response.json().get("results", [])
+            return response.status_code, [t["id"] for t in results]
+
+        assert filter_by(year=2024) == (200, [february.id, january.id])
+        assert filter_by(year=2024, month=2) == (200, [february.id, january.id])
+        assert filter_by(year=2024, month=1) == (200, [])
+        assert filter_by(year="x") == (400, [])
+        assert filter_by(year=2024, month=13) == (400, [])
+
+
+@pytest.mark.django_db
+class TestPrediction:
+    @pytest.fixture(autouse=True)
+    def log_status(self):
+        with (
+            mock.patch(
+                "mainframe.finance.viewsets.prediction.get_status", return_value={}
+            ),
+            mock.patch("mainframe.core.tasks.get_status", return_value={}),
+            mock.patch("mainframe.finance.viewsets.prediction.clear_status"),
+            mock.patch(
+                "mainframe.finance.viewsets.prediction.log_status", return_value={}
+            ) as log_status,
+        ):
+            yield log_status
+
+    @mock.patch("mainframe.finance.viewsets.prediction.predict")
+    def test_start_prediction(self, predict, client, staff_session):
+        (unidentified,) = Category.objects.bulk_create(
+            [CategoryFactory.build(id=Category.UNIDENTIFIED)]
+        )
+        kwargs = {"account": AccountFactory(), "amount": -1, "category": unidentified}
+        for description in ("omv", "lidl", "omv", "lidl", "mega"):
+            TransactionFactory(description=description, **kwargs)
+        TransactionFactory(
+            account=kwargs["account"], amount=1, category=unidentified, description="x"
+        )
+
+        response = client.put(
+            reverse("finance:prediction-start-prediction"),
+            ["lidl", "omv"],
+            content_type="application/json",
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.status_code == 200
+        assert predict.call_args_list == [mock.call(["lidl", "omv"], mock.ANY)]
+
+    @pytest.mark.parametrize("data", [{}, {"mode": "full"}])
+    @mock.patch("mainframe.finance.viewsets.prediction.train")
+    def test_start_training(self, train, client, data, log_status, staff_session):
+        response = client.put(
+            reverse("finance:prediction-start-training"),
+            data,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=staff_session.token,
+        )
+        assert response.status_code == 200
+        mode = data.get("mode", "incremental")
+        assert train.call_args_list == [
+            mock.call(mock.ANY, incremental=mode == "incremental")
+        ]
+        assert log_status.call_args_list == [
+            mock.call("train", mode=mode, status="initial")
+        ]
+
+    @pytest.mark.parametrize(
+        ("name", "key"),
+        [("prediction", "predict"), ("training", "train")],
+    )
+    def test_already_running(self, client, name, key, staff_session):
+        history = [{"count": 5000}, {"status": "executing"}, {"status": "initial"}]
+        with (
+            mock.patch(
+                "mainframe.core.tasks.get_status",
+                return_value={"count": 3, "errors": [], "history": history},
+            ) as get_status,
+            mock.patch("mainframe.finance.viewsets.prediction.predict") as predict,
+            mock.patch("mainframe.finance.viewsets.prediction.train") as train,
+        ):
+            response = client.put(
+                reverse(f"finance:prediction-start-{name}"),
+                {},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=staff_session.token,
+            )
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": f"{name} - executing"}
+        assert get_status.call_args_list == [mock.call(key)]
+        assert predict.call_args_list == train.call_args_list == []
+
+    @mock.patch("mainframe.finance.viewsets.prediction.train")
+    def test_start_training_after_a_failed_one(self, train, client, staff_session):
+        history = [{"status": "error"}, {"accuracy": "0.50"}, {"status": "executing"}]
+        with mock.patch(
+            "mainframe.core.tasks.get_status", return_value={"history": history}
+        ):
+            response = client.put(
+                reverse("finance:prediction-start-training"),
+                {},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=staff_session.token,
+            )
+        assert response.status_code == 200
+        assert len(train.call_args_list) == 1
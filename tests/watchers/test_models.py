@@ -6,12 +6,15 @@ from factory.django import mute_signals
 from freezegun import freeze_time
 
 from mainframe.watchers.models import (
+    MAX_NEW_RESULTS,
+    SEEN_MAXSIZE,
     Watcher,
     WatcherElementsNotFound,
     WatcherError,
     extract,
     fetch_api,
     fetch_web,
+    fingerprint,
 )
 from tests.factories.watchers import WatcherFactory
 
@@ -192,6 +195,43 @@ class TestWatcherRun:
         )
 
 
+class TestGetNewResults:
+    @staticmethod
+    def links(*ids):
+        return [{"title": f"title {i}", "url": f"http://u/{i}"} for i in ids]
+
+    def test_first_run_marks_everything_seen(self):
+        w = Watcher(name="w")
+        assert w.get_new_results(self.links(1, 2)) == self.links(1, 2)
+        assert w.seen == [fingerprint(link) for link in self.links(1, 2)]
+
+    def test_falls_back_to_latest_url(self):
+        w = Watcher(
+            name="w",
+            latest={"title": "title 2", "url": "http://u/2", "timestamp": "t"},
+        )
+        assert w.get_new_results(self.links(1, 2, 3)) == self.links(1)
+        assert len(w.seen) == 3
+
+    def test_only_unseen_items(self):
+        w = Watcher(name="w", seen=[fingerprint(link) for link in self.links(2, 3)])
+        # item 3 dropped off the page, item 4 got reordered in between
+        assert w.get_new_results(self.links(1, 2, 4)) == self.links(1, 4)
+        assert w.get_new_results(self.links(1, 2, 4)) == []
+
+    def test_changed_title_is_new(self):
+        w = Watcher(name="w", seen=[fingerprint(link) for link in self.links(1)])
+        changed = [{"title": "updated", "url": "http://u/1"}]
+        assert w.get_new_results(changed) == changed
+
+    def test_caps(self):
+        w = Watcher(name="w", seen=["old"])
+        results = self.links(*range(SEEN_MAXSIZE + 1))
+        assert w.get_new_results(results) == results[:MAX_NEW_RESULTS]
+        assert len(w.seen) == SEEN_MAXSIZE
+        assert w.seen[0] == fingerprint(results[0])
+
+
 class DummyResponse:
     def __init__(self, payload):
         self._payload = payload
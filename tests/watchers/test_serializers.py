@@ -6,7 +6,7 @@ from mainframe.watchers.serializers import WatcherSerializer
 from tests.factories.watchers import WatcherFactory
 
 
-@mock.patch("mainframe.watchers.serializers.get_redis_client", return_value={})
+@mock.patch("mainframe.watchers.serializers.get_status", return_value={})
 @mock.patch("mainframe.watchers.models.schedule_task", return_value="{}")
 @pytest.mark.django_db
 class TestWatcherSerializer:
@@ -0,0 +1,273 @@
+import json
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from freezegun import freeze_time
+from multidict import CIMultiDict
+
+from mainframe.clients.scraper import AsyncResponse, NotModified
+from mainframe.watchers.models import Watcher
+from mainframe.watchers.parsers import parse
+from mainframe.watchers.tasks import dispatch, get_due_watchers
+from tests.factories.watchers import WatcherFactory
+
+HTML = b"<a class='item' href='/1'>one</a><a class='item' href='/2'>two</a>"
+
+
+def serve(pages):
+    """Patch fetch_many to answer like a server: {url: (body, etag)}"""
+
+    async def fetch_many(urls, **_):
+        results = []
+        for url, options in urls:
+            body, etag = pages[url]
+            if options["validators"].get("ETag") == etag:
+                results.append((None, NotModified(url)))
+            else:
+                results.append((response(url, body, etag), None))
+        return results
+
+    return mock.patch("mainframe.watchers.tasks.fetch_many", side_effect=fetch_many)
+
+
+def response(url, content, etag=None):
+    return AsyncResponse(
+        url=url,
+        status_code=200,
+        content=content,
+        elapsed=0.1,
+        headers=CIMultiDict({"ETag": etag} if etag else {}),
+    )
+
+
+class TestParse:
+    def test_web(self):
+        links, error, duration = parse(HTML, False, "http://a.com", ".item", "a")
+        assert links == [
+            {"title": "one", "url": "http://a.com/1"},
+            {"title": "two", "url": "http://a.com/2"},
+        ]
+        assert error is None
+        assert duration >= 0
+
+    def test_api(self):
+        content = json.dumps({"items": [{"t": "one", "u": "http://a.com/1"}]})
+        links, error, _ = parse(content.encode(), True, "", "items t u", "a")
+        assert links == [{"title": "one", "url": "http://a.com/1"}]
+        assert error is None
+
+    def test_errors_are_returned(self):
+        assert parse(HTML, False, "http://a.com", ".missing", "a")[:2] == (
+            [],
+            "[a] No elements found",
+        )
+        assert parse(b"not json", True, "", "items t u", "a")[0] == []
+
+
+@pytest.mark.django_db
+@mock.patch("mainframe.watchers.tasks.PARSE_WORKERS", 0)
+@mock.patch("mainframe.watchers.tasks.log_status")
+@freeze_time("2026-02-06 00:14:00")
+class TestRunWatchers:
+    def test_due_watchers(self, _):
+        due = WatcherFactory(is_active=True, cron="14 * * * *")
+        WatcherFactory(is_active=True, cron="15 * * * *")
+        WatcherFactory(is_active=False, cron="14 * * * *")
+        WatcherFactory(is_active=True, cron="")
+        assert get_due_watchers(timezone.now()) == [due]
+
+    def test_no_watchers(self, log_status):
+        with mock.patch("mainframe.watchers.tasks.fetch_many") as fetch_many:
+            assert dispatch([]) == 0
+        fetch_many.assert_not_called()
+        log_status.assert_not_called()
+
+    def test_run(self, log_status):
+        first = WatcherFactory(
+            is_active=True, cron="14 * * * *", url="http://a.com", selector=".item"
+        )
+        second = WatcherFactory(
+            is_active=True,
+            cron="*/2 * * * *",
+            url="http://b.com",
+            selector=".item",
+            pending_data=[{"title": "old", "url": "http://b.com/0"}],
+        )
+        unchanged = WatcherFactory(
+            is_active=True, cron="* * * * *", url="http://c.com", selector=".item"
+        )
+        unchanged.set_validators(response(unchanged.url, HTML, etag='"c"'))
+        failing = WatcherFactory(
+            is_active=True, cron="* * * * *", url="http://d.com", selector=".item"
+        )
+        responses = [
+            (response(first.url, HTML), None),
+            (response(second.url, HTML), None),
+            (None, NotModified(unchanged.url)),
+            (None, ValueError("boom")),
+        ]
+        with (
+            mock.patch(
+                "mainframe.watchers.tasks.fetch_many",
+                new=mock.AsyncMock(return_value=responses),
+            ) as fetch_many,
+            mock.patch.object(
+                Watcher, "notification", side_effect=lambda *_: mock.AsyncMock()()
+            ) as notification,
+        ):
+            assert dispatch([first, second, unchanged, failing]) == 4
+
+        assert fetch_many.call_args.args[0] == [
+            (first.url, {"validators": {}}),
+            (second.url, {"validators": {}}),
+            (unchanged.url, {"validators": {"ETag": '"c"'}}),
+            (failing.url, {"validators": {}}),
+        ]
+        assert notification.call_count == 3
+
+        first.refresh_from_db()
+        assert first.latest["url"] == "http://a.com/1"
+        second.refresh_from_db()
+        assert second.pending_data == []
+        assert second.latest["url"] == "http://b.com/1"
+        unchanged.refresh_from_db()
+        assert unchanged.latest == {}
+
+        statuses = {c.args[0]: c.kwargs for c in log_status.call_args_list}
+        assert statuses[first.name]["new_items"] == 2
+        assert statuses[first.name]["fetch_duration"] == "0.100"
+        assert statuses[unchanged.name]["error"] is None
+        assert statuses[failing.name]["error"] == "boom"
+        assert statuses[failing.name]["status"] == "error"
+
+    def test_unchanged_body_is_not_parsed_nor_saved(self, log_status):
+        watcher = WatcherFactory(
+            is_active=True, cron="* * * * *", url="http://a.com", selector=".item"
+        )
+        Watcher.objects.filter(id=watcher.id).update(digest=watcher.get_digest(HTML))
+        watcher.refresh_from_db()
+        updated_at = watcher.updated_at
+        with (
+            mock.patch(
+                "mainframe.watchers.tasks.fetch_many",
+                new=mock.AsyncMock(return_value=[(response(watcher.url, HTML), None)]),
+            ),
+            mock.patch("mainframe.watchers.tasks.pool_map") as pool_map,
+        ):
+            assert dispatch([watcher]) == 1
+
+        pool_map.assert_not_called()
+        watcher.refresh_from_db()
+        assert watcher.updated_at == updated_at
+        assert watcher.seen == []
+        assert log_status.call_args.kwargs["parse_duration"] is None
+
+    def test_digest_is_stored_after_parsing(self, _):
+        ok = WatcherFactory(url="http://a.com", selector=".item")
+        broken = WatcherFactory(url="http://b.com", selector=".missing")
+        responses = [
+            (response(ok.url, HTML, etag='"ok"'), None),
+            (response(broken.url, HTML, etag='"broken"'), None),
+        ]
+        with (
+            mock.patch(
+                "mainframe.watchers.tasks.fetch_many",
+                new=mock.AsyncMock(return_value=responses),
+            ),
+            mock.patch.object(Watcher, "notification", return_value=None),
+        ):
+            dispatch([ok, broken])
+
+        ok.refresh_from_db()
+        assert ok.digest == ok.get_digest(HTML)
+        assert ok.get_validators() == {"ETag": '"ok"'}
+        broken.refresh_from_db()
+        assert broken.digest == ""
+        assert broken.validators == {}
+
+    def test_unchanged_body_updates_the_validators(self, _):
+        watcher = WatcherFactory(url="http://a.com", selector=".item")
+        watcher.set_validators(response(watcher.url, HTML, etag='"v1"'))
+        Watcher.objects.filter(id=watcher.id).update(
+            digest=watcher.get_digest(HTML), validators=watcher.validators
+        )
+        watcher.refresh_from_db()
+        with mock.patch(
+            "mainframe.watchers.tasks.fetch_many",
+            new=mock.AsyncMock(
+                return_value=[(response(watcher.url, HTML, etag='"v2"'), None)]
+            ),
+        ):
+            dispatch([watcher])
+
+        watcher.refresh_from_db()
+        assert watcher.get_validators() == {"ETag": '"v2"'}
+
+    def test_config_changes_reparse_an_unchanged_body(self, _):
+        watcher = WatcherFactory(url="http://a.com", selector=".item")
+        # parsed before the selector was fixed
+        before = Watcher(selector=".missing", type=watcher.type, url=watcher.url)
+        Watcher.objects.filter(id=watcher.id).update(digest=before.get_digest(HTML))
+        watcher.refresh_from_db()
+        with (
+            mock.patch(
+                "mainframe.watchers.tasks.fetch_many",
+                new=mock.AsyncMock(return_value=[(response(watcher.url, HTML), None)]),
+            ),
+            mock.patch.object(Watcher, "notification", return_value=None),
+        ):
+            dispatch([watcher])
+
+        watcher.refresh_from_db()
+        assert watcher.latest["url"] == "http://a.com/1"
+        assert watcher.digest == watcher.get_digest(HTML)
+
+    def test_failed_pages_keep_failing_until_fixed(self, log_status):
+        watcher = WatcherFactory(url="http://a.com", selector=".item")
+        pages = {watcher.url: (HTML, '"v1"')}
+        statuses = []
+        with (
+            serve(pages) as fetch_many,
+            mock.patch.object(Watcher, "notification", return_value=None),
+        ):
+            dispatch([watcher])
+            pages[watcher.url] = (b"<p>maintenance</p>", '"v2"')
+            for _ in range(2):
+                watcher.refresh_from_db()
+                dispatch([watcher])
+                statuses.append(log_status.call_args.kwargs["status"])
+
+        # the validators of the last page parsed successfully, never of v2
+        assert [c.args[0][0][1]["validators"] for c in fetch_many.call_args_list] == [
+            {},
+            {"ETag": '"v1"'},
+            {"ETag": '"v1"'},
+        ]
+        assert statuses == ["error", "error"]
+        assert log_status.call_args.kwargs["error"] == (
+            f"[{watcher.name}] No elements found"
+        )
+
+    def test_config_changes_skip_the_validators(self, log_status):
+        watcher = WatcherFactory(url="http://a.com", selector=".item")
+        with (
+            serve({watcher.url: (HTML, '"v1"')}) as fetch_many,
+            mock.patch.object(Watcher, "notification", return_value=None),
+        ):
+            dispatch([watcher])
+            watcher.refresh_from_db()
+            dispatch([watcher])
+            Watcher.objects.filter(id=watcher.id).update(selector="a[href='/2']")
+            watcher.refresh_from_db()
+            dispatch([watcher])
+
+        assert [c.args[0][0][1]["validators"] for c in fetch_many.call_args_list] == [
+            {},
+            {"ETag": '"v1"'},
+            {},
+        ]
+        watcher.refresh_from_db()
+        assert watcher.digest == watcher.get_digest(HTML)
+        assert watcher.get_validators() == {"ETag": '"v1"'}
+        assert log_status.call_args.kwargs["parse_duration"] is not None
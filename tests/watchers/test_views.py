@@ -7,7 +7,7 @@ from tests.factories.watchers import WatcherFactory
 
 
 @mock.patch("mainframe.watchers.models.schedule_task", return_value="{}")
-@mock.patch("mainframe.watchers.serializers.get_redis_client", return_value={})
+@mock.patch("mainframe.watchers.serializers.get_status", return_value={})
 @pytest.mark.django_db
 class TestWatcherViews:
     def test_create(self, _, __, client, staff_session):